@@ -0,0 +1,78 @@
+"""
+Cron bookkeeping cost with many reminder-style `at` jobs.
+
+Measures, for a store of N jobs: finding the next wakeup (heap head vs a
+full scan, as _get_next_wake_ms used to do), persisting one changed job
+(journal append vs rewriting the whole indented jobs.json), and
+computing the next time of a cron expression (cached croniter vs
+parsing it on every call).
+
+Usage:
+    python benchmarks/bench_cron.py [--jobs 5000] [--iterations 200]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from chasingclaw.cron.schedule import next_run_ms
+from chasingclaw.cron.service import CronService, _job_to_dict
+from chasingclaw.cron.types import CronSchedule
+
+
+def _bench(label: str, func, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<32} {per_call:10.1f} us/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    logger.disable("chasingclaw")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "jobs.json"
+        service = CronService(store_path)
+        service.SNAPSHOT_EVERY = 10**9  # measure appends only
+        now_ms = int(time.time() * 1000)
+        for i in range(args.jobs):
+            service.add_job(f"reminder {i}", CronSchedule(kind="at", at_ms=now_ms + (i + 1) * 1000), "ping")
+        jobs = service.list_jobs()
+        job = jobs[len(jobs) // 2]
+
+        def _scan_wake() -> None:
+            min(j.state.next_run_at_ms for j in jobs if j.enabled and j.state.next_run_at_ms)
+
+        def _full_rewrite() -> None:
+            data = {"version": 1, "jobs": [_job_to_dict(j) for j in jobs]}
+            store_path.write_text(json.dumps(data, indent=2))
+
+        def _journal_append() -> None:
+            service._touch(job)
+            service._save_store()
+
+        def _parse_each_time() -> None:
+            from croniter import croniter
+            croniter("*/5 9-17 * * 1-5", time.time()).get_next()
+
+        schedule = CronSchedule(kind="cron", expr="*/5 9-17 * * 1-5")
+
+        _bench("scan next wake", _scan_wake, args.iterations)
+        _bench("heap next wake", service._get_next_wake_ms, args.iterations)
+        _bench("rewrite jobs.json (indent=2)", _full_rewrite, max(1, args.iterations // 10))
+        _bench("journal one job", _journal_append, args.iterations)
+        _bench("parse croniter per call", _parse_each_time, args.iterations)
+        _bench("cached croniter", lambda: next_run_ms(schedule, now_ms), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Import-time benchmark for the main entry points.
+
+Runs each entry point in a fresh interpreter with ``-X importtime`` and
+reports the cumulative import time and the slowest modules.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--budget-ms 800] [--top 5]
+
+Exits non-zero if an entry point exceeds the budget (median of runs).
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = {
+    "cli": "import chasingclaw.cli.commands",
+    "agent": "import chasingclaw.agent.loop",
+    "channels": "import chasingclaw.channels.manager",
+    "cron": "import chasingclaw.cron.service",
+    "webui": "import chasingclaw.webui.server",
+}
+
+
+def measure(code: str) -> tuple[float, list[tuple[float, str]]]:
+    """Return (total cumulative ms, [(cumulative ms, module), ...]) for one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, raw_name = line.split("|")
+        cumulative_us = cumulative_us.strip()
+        if not cumulative_us.isdigit():
+            continue  # Header line
+        # Nested imports are indented; only top-level ones add up to the total.
+        if not raw_name.startswith("  "):
+            total_us += int(cumulative_us)
+        rows.append((int(cumulative_us) / 1000, raw_name.strip()))
+    rows.sort(reverse=True)
+    return total_us / 1000, rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=0, help="Fail if an entry point exceeds this (0 = no budget)")
+    parser.add_argument("--top", type=int, default=5, help="Show the N slowest chasingclaw modules")
+    args = parser.parse_args()
+
+    failed = False
+    for label, code in ENTRY_POINTS.items():
+        totals = []
+        rows: list[tuple[float, str]] = []
+        for _ in range(args.runs):
+            total, rows = measure(code)
+            totals.append(total)
+        median = statistics.median(totals)
+        over = args.budget_ms and median > args.budget_ms
+        failed = failed or bool(over)
+        print(f"{label:<10} median {median:8.1f} ms  min {min(totals):8.1f} ms{'  OVER BUDGET' if over else ''}")
+        own = [r for r in rows if r[1].startswith("chasingclaw")][: args.top]
+        for ms, name in own:
+            print(f"    {ms:8.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
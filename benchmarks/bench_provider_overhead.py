@@ -0,0 +1,102 @@
+"""
+Per-request client-side overhead: LiteLLMProvider vs OpenAICompatProvider.
+
+Neither backend touches the network: the HTTP provider talks to an
+httpx.MockTransport and LiteLLM is driven with ``mock_response``, so the
+numbers are the CPU cost of building, sending and parsing one request.
+
+Usage:
+    python benchmarks/bench_provider_overhead.py [--requests 200]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+import httpx
+
+from chasingclaw.providers.http_provider import OpenAICompatProvider
+from chasingclaw.providers.litellm_provider import LiteLLMProvider
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant. " * 50},
+    {"role": "user", "content": "Summarize the release notes."},
+]
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": f"tool_{i}",
+            "description": "Example tool",
+            "parameters": {"type": "object", "properties": {"path": {"type": "string"}}},
+        },
+    }
+    for i in range(10)
+]
+REPLY = {
+    "id": "cmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "qwen-72b",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 100, "completion_tokens": 1, "total_tokens": 101},
+}
+
+
+class _MockedLiteLLM(LiteLLMProvider):
+    async def _acompletion(self, **kwargs):
+        kwargs["mock_response"] = "ok"
+        return await super()._acompletion(**kwargs)
+
+
+def _http_provider() -> OpenAICompatProvider:
+    return OpenAICompatProvider(
+        api_key="sk-bench",
+        api_base="http://llm.internal/v1",
+        default_model="openai/qwen-72b",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=REPLY)),
+    )
+
+
+def _litellm_provider() -> LiteLLMProvider:
+    return _MockedLiteLLM(
+        api_key="sk-bench",
+        api_base="http://llm.internal/v1",
+        default_model="openai/qwen-72b",
+        provider_name="openai",
+    )
+
+
+async def _run(provider, requests: int) -> tuple[list[float], int]:
+    await provider.chat(MESSAGES, tools=TOOLS)  # warm up (imports, client pool)
+    tracemalloc.start()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await provider.chat(MESSAGES, tools=TOOLS)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.finish_reason != "error", response.content
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    for label, factory in (("http", _http_provider), ("litellm", _litellm_provider)):
+        timings, peak = asyncio.run(_run(factory(), args.requests))
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(
+            f"{label:<8} median {statistics.median(timings):7.3f} ms  "
+            f"p95 {p95:7.3f} ms  peak alloc {peak / 1024:8.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-request provider resolution cost: linear registry scans vs the
+precomputed/memoized lookups in providers/registry.py.
+
+"scan" reimplements the original lookups (walk PROVIDERS with substring
+checks on every call); "cached" calls the registry functions and the
+provider's memoized _resolve_model, as chat()/chat_stream() do.
+
+Usage:
+    python benchmarks/bench_registry.py [--iterations 100000]
+"""
+
+import argparse
+import time
+
+from chasingclaw.providers.litellm_provider import LiteLLMProvider
+from chasingclaw.providers.registry import PROVIDERS, find_by_model, find_model_overrides
+
+MODELS = [
+    "anthropic/claude-opus-4-5",
+    "deepseek-chat",
+    "moonshot/kimi-k2.5",
+    "qwen-max",
+    "gemini/gemini-2.0-flash",
+    "unknown-local-model",
+]
+
+
+def _scan_by_model(model: str):
+    model_lower = model.lower()
+    for spec in PROVIDERS:
+        if spec.is_gateway or spec.is_local:
+            continue
+        if any(kw in model_lower for kw in spec.keywords):
+            return spec
+    return None
+
+
+def _scan_overrides(model: str) -> dict:
+    spec = _scan_by_model(model)
+    if spec:
+        model_lower = model.lower()
+        for pattern, overrides in spec.model_overrides:
+            if pattern in model_lower:
+                return dict(overrides)
+    return {}
+
+
+def _bench(label: str, func, iterations: int) -> None:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(MODELS[i % len(MODELS)])
+    per_call = (time.perf_counter() - start) / iterations * 1e9
+    print(f"{label:<28} {per_call:8.0f} ns/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    provider = LiteLLMProvider(default_model=MODELS[0])
+
+    def _scan_request(model: str) -> None:
+        # What chat() used to do per request: resolve + overrides, both scanning.
+        _scan_by_model(model)
+        _scan_overrides(model)
+
+    def _cached_request(model: str) -> None:
+        provider._resolve_model(model)
+        find_model_overrides(model)
+
+    _bench("scan find_by_model", _scan_by_model, args.iterations)
+    _bench("cached find_by_model", find_by_model, args.iterations)
+    _bench("scan per-request resolve", _scan_request, args.iterations)
+    _bench("cached per-request resolve", _cached_request, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
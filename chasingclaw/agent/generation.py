@@ -0,0 +1,166 @@
+"""Generation parameters (max_tokens / temperature) for agent LLM calls."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Mapping
+
+from loguru import logger
+
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import AgentDefaults
+
+CONTINUE_PROMPT = "Your reply was cut off. Continue exactly where it stopped, without repeating anything."
+
+# Accepted keys in metadata["generation"] / per-channel overrides.
+_OVERRIDE_KEYS = {
+    "max_tokens": ("maxTokens", "max_tokens"),
+    "temperature": ("temperature",),
+    "planning_max_tokens": ("planningMaxTokens", "planning_max_tokens"),
+}
+
+
+@dataclass(frozen=True)
+class GenerationSettings:
+    """
+    Sampling settings for one agent turn.
+
+    Iterations that offer tools use planning_max_tokens (when set and
+    smaller than max_tokens). A tool call cut off by that budget is
+    retried once with the full max_tokens; a text answer cut off by it is
+    kept and continued with the rest of max_tokens instead of being
+    generated again.
+    """
+    max_tokens: int = 8192
+    temperature: float = 0.7
+    planning_max_tokens: int = 0  # 0 = use max_tokens for every iteration
+    per_channel: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, defaults: "AgentDefaults | None") -> "GenerationSettings":
+        if defaults is None:
+            return cls()
+        return cls(
+            max_tokens=defaults.max_tokens,
+            temperature=defaults.temperature,
+            planning_max_tokens=defaults.planning_max_tokens,
+            per_channel={
+                name: override.model_dump(exclude_none=True)
+                for name, override in defaults.channel_overrides.items()
+            },
+        )
+
+    def with_overrides(self, overrides: Mapping[str, Any] | None) -> "GenerationSettings":
+        """Return a copy with valid override values applied (unknown keys are ignored)."""
+        if not overrides:
+            return self
+        changes: dict[str, Any] = {}
+        for attr, keys in _OVERRIDE_KEYS.items():
+            value = next((overrides[k] for k in keys if overrides.get(k) is not None), None)
+            if value is None:
+                continue
+            try:
+                value = float(value) if attr == "temperature" else int(value)
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring invalid generation override {attr}={value!r}")
+                continue
+            if attr != "temperature" and value < 0:
+                continue
+            changes[attr] = value
+        return replace(self, **changes) if changes else self
+
+    def resolve(self, channel: str | None, metadata: Mapping[str, Any] | None = None) -> "GenerationSettings":
+        """Apply the channel override, then the per-call metadata["generation"] override."""
+        settings = self.with_overrides(self.per_channel.get(channel or ""))
+        generation = (metadata or {}).get("generation")
+        return settings.with_overrides(generation if isinstance(generation, Mapping) else None)
+
+    def budget(self, with_tools: bool) -> int:
+        """max_tokens for an iteration; tool-planning iterations get the smaller budget."""
+        if with_tools and 0 < self.planning_max_tokens < self.max_tokens:
+            return self.planning_max_tokens
+        return self.max_tokens
+
+    def cut_by_budget(self, response: LLMResponse, budget: int) -> bool:
+        """Whether a reply was truncated by a planning budget rather than by max_tokens."""
+        return response.finish_reason == "length" and budget < self.max_tokens
+
+
+async def chat_with_budget(
+    provider: LLMProvider,
+    settings: GenerationSettings,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    model: str,
+) -> LLMResponse:
+    """
+    Call provider.chat with the iteration budget. If the planning budget
+    truncated the reply, a text answer is continued with the remaining
+    tokens and a tool call is retried at the full max_tokens.
+    """
+    budget = settings.budget(bool(tools))
+    response = await provider.chat(
+        messages=messages,
+        tools=tools,
+        model=model,
+        max_tokens=budget,
+        temperature=settings.temperature,
+    )
+    if not settings.cut_by_budget(response, budget):
+        return response
+    truncated = response
+    if is_answer(truncated):
+        logger.debug(f"Answer hit planning budget ({budget} tokens), continuing it")
+        rest = await provider.chat(
+            messages=continuation_messages(messages, truncated),
+            tools=tools,
+            model=model,
+            max_tokens=settings.max_tokens - budget,
+            temperature=settings.temperature,
+        )
+        return join_continuation(truncated, rest)
+    logger.debug(f"Tool call hit planning budget ({budget} tokens), retrying with {settings.max_tokens}")
+    response = await provider.chat(
+        messages=messages,
+        tools=tools,
+        model=model,
+        max_tokens=settings.max_tokens,
+        temperature=settings.temperature,
+    )
+    merge_attempt(response, truncated)
+    return response
+
+
+def is_answer(response: LLMResponse) -> bool:
+    """Whether a truncated reply is plain text (worth continuing) rather than a tool call."""
+    return bool(response.content) and not response.tool_calls
+
+
+def continuation_messages(messages: list[dict[str, Any]], partial: LLMResponse) -> list[dict[str, Any]]:
+    """Messages that ask the model to finish a truncated answer."""
+    return [
+        *messages,
+        {"role": "assistant", "content": partial.content},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+
+
+def join_continuation(partial: LLMResponse, rest: LLMResponse) -> LLMResponse:
+    """Append a continuation to the truncated answer it finishes."""
+    if rest.finish_reason == "error":
+        logger.warning(f"Continuing a truncated answer failed: {rest.content}")
+        merge_attempt(partial, rest)
+        return partial
+    rest.content = (partial.content or "") + (rest.content or "")
+    rest.reasoning_content = partial.reasoning_content or rest.reasoning_content
+    merge_attempt(rest, partial)
+    return rest
+
+
+def merge_attempt(response: LLMResponse, earlier: LLMResponse) -> None:
+    """Carry queue wait and token usage of a discarded attempt over to its retry."""
+    response.queue_wait_s += earlier.queue_wait_s
+    for key, value in earlier.usage.items():
+        response.usage[key] = response.usage.get(key, 0) + value
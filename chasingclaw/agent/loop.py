@@ -3,24 +3,38 @@
 import asyncio
 import datetime
 import json
+import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
 from chasingclaw.bus.events import InboundMessage, OutboundMessage
-from chasingclaw.bus.queue import MessageBus
-from chasingclaw.providers.base import LLMProvider
+from chasingclaw.bus.queue import MessageBus, QueueClosedError
+from chasingclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 from chasingclaw.agent.context import ContextBuilder
+from chasingclaw.agent.generation import (
+    GenerationSettings,
+    chat_with_budget,
+    continuation_messages,
+    is_answer,
+    join_continuation,
+    merge_attempt,
+)
 from chasingclaw.agent.tools.registry import ToolRegistry
 from chasingclaw.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
 from chasingclaw.agent.tools.shell import ExecTool
-from chasingclaw.agent.tools.web import WebSearchTool, WebFetchTool
+from chasingclaw.agent.tools.web import WebFetchTool, WebSearchTool, close_http_client
 from chasingclaw.agent.tools.message import MessageTool
 from chasingclaw.agent.tools.spawn import SpawnTool
 from chasingclaw.agent.tools.cron import CronTool
+from chasingclaw.agent.tools.memory import MemorySearchTool, MemoryWriteTool
 from chasingclaw.agent.subagent import SubagentManager
-from chasingclaw.session.manager import SessionManager
+from chasingclaw.session.manager import Session, SessionManager
+from chasingclaw.session.usage import UsageLedger, UsageTurn
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import MemoryConfig, SubagentsConfig
 
 
 class AgentLoop:
@@ -47,6 +61,10 @@ class AgentLoop:
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        generation: GenerationSettings | None = None,
+        usage_ledger: UsageLedger | None = None,
+        subagent_config: "SubagentsConfig | None" = None,
+        memory_config: "MemoryConfig | None" = None,
     ):
         from chasingclaw.config.schema import ExecToolConfig
         from chasingclaw.cron.service import CronService
@@ -59,8 +77,10 @@ class AgentLoop:
         self.exec_config = exec_config or ExecToolConfig()
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
+        self.generation = generation or GenerationSettings()
+        self.usage_ledger = usage_ledger
         
-        self.context = ContextBuilder(workspace)
+        self.context = ContextBuilder(workspace, memory_config)
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -71,6 +91,9 @@ class AgentLoop:
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
             restrict_to_workspace=restrict_to_workspace,
+            generation=self.generation,
+            usage_ledger=usage_ledger,
+            config=subagent_config,
         )
         
         self._running = False
@@ -81,8 +104,8 @@ class AgentLoop:
         # File tools (restrict to workspace if configured)
         allowed_dir = self.workspace if self.restrict_to_workspace else None
         self.tools.register(ReadFileTool(allowed_dir=allowed_dir))
-        self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
-        self.tools.register(EditFileTool(allowed_dir=allowed_dir))
+        self.tools.register(WriteFileTool(allowed_dir=allowed_dir, memory=self.context.memory))
+        self.tools.register(EditFileTool(allowed_dir=allowed_dir, memory=self.context.memory))
         self.tools.register(ListDirTool(allowed_dir=allowed_dir))
         
         # Shell tool
@@ -100,6 +123,10 @@ class AgentLoop:
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
         self.tools.register(message_tool)
         
+        # Memory tools (recalling older notes, saving new ones)
+        self.tools.register(MemorySearchTool(self.context.memory))
+        self.tools.register(MemoryWriteTool(self.context.memory))
+
         # Spawn tool (for subagents)
         spawn_tool = SpawnTool(manager=self.subagents)
         self.tools.register(spawn_tool)
@@ -108,6 +135,45 @@ class AgentLoop:
         if self.cron_service:
             self.tools.register(CronTool(self.cron_service))
 
+    def _record_queue_wait(self, trace_events: list[dict[str, Any]], iteration: int, response: LLMResponse) -> None:
+        """Add a trace event when the call noticeably waited on the provider rate limiter."""
+        if response.queue_wait_s < 1.0:
+            return
+        trace_events.append(
+            {
+                "type": "rate_limit_wait",
+                "iteration": iteration,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "waitSeconds": round(response.queue_wait_s, 2),
+                "summary": f"第 {iteration} 轮：模型限流排队 {response.queue_wait_s:.1f} 秒",
+            }
+        )
+
+    def _start_early_tool(
+        self, call: ToolCallRequest, early: dict[str, asyncio.Task[str]], blocked: bool
+    ) -> bool:
+        """
+        Start a parallel-safe tool while the model is still streaming the remaining calls.
+
+        Calls arrive in order; once one is not parallel-safe (blocked), later
+        calls wait for it, the same barrier rule as ToolRegistry.execute_many.
+
+        Returns:
+            Whether later calls of this response are blocked.
+        """
+        if blocked or not self.tools.is_parallel_safe(call.name):
+            return True
+        if call.id and call.id not in early:
+            logger.debug(f"Starting {call.name} early ({call.id})")
+            early[call.id] = asyncio.create_task(self.tools.execute(call.name, call.arguments))
+        return False
+
+    @staticmethod
+    def _cancel_early_tools(early: dict[str, asyncio.Task[str]]) -> None:
+        for task in early.values():
+            task.cancel()
+        early.clear()
+
     def _clip_trace_text(self, value: Any, limit: int = 1200) -> str:
         text = str(value).strip()
         if len(text) <= limit:
@@ -120,33 +186,39 @@ class AgentLoop:
         logger.info("Agent loop started")
         
         while self._running:
+            # Wait for next message (stop() closes the queue to wake us up)
             try:
-                # Wait for next message
-                msg = await asyncio.wait_for(
-                    self.bus.consume_inbound(),
-                    timeout=1.0
-                )
-                
-                # Process it
-                try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
+                msg = await self.bus.consume_inbound()
+            except QueueClosedError:
+                break
+
+            # Process it
+            try:
+                response = await self._process_message(msg)
+                if response:
+                    await self.bus.publish_outbound(response)
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                # Send error response
+                await self.bus.publish_outbound(OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=f"Sorry, I encountered an error: {str(e)}"
+                ))
+
+        if self.bus.inbound_size:
+            logger.warning(f"Agent loop stopped with {self.bus.inbound_size} unprocessed inbound messages")
+        logger.info("Agent loop stopped")
     
     def stop(self) -> None:
-        """Stop the agent loop."""
+        """Stop the agent loop after the message currently being processed."""
         self._running = False
+        self.bus.close_inbound()
         logger.info("Agent loop stopping")
+
+    async def close(self) -> None:
+        """Close the HTTP connections the tools opened on the running event loop."""
+        await close_http_client()
     
     async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
         """
@@ -182,8 +254,14 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(msg.channel, msg.chat_id)
         
-        # Build initial messages (use get_history for LLM-formatted messages)
-        messages = self.context.build_messages(
+        memory_tool = self.tools.get("memory_write")
+        if isinstance(memory_tool, MemoryWriteTool):
+            memory_tool.set_context(msg.channel, msg.chat_id)
+
+        # Build initial messages (use get_history for LLM-formatted messages).
+        # Off the event loop: memory retrieval may load and run an embedding model.
+        messages = await asyncio.to_thread(
+            self.context.build_messages,
             history=session.get_history(),
             current_message=msg.content,
             media=msg.media if msg.media else None,
@@ -195,16 +273,19 @@ class AgentLoop:
         iteration = 0
         final_content = None
         trace_events: list[dict[str, Any]] = []
+        generation = self.generation.resolve(msg.channel, msg.metadata)
+        usage = UsageTurn(self.usage_ledger, msg.session_key, msg.channel, self.model)
         
         while iteration < self.max_iterations:
             iteration += 1
             
             # Call LLM
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
+            started = time.monotonic()
+            response = await chat_with_budget(
+                self.provider, generation, messages, self.tools.get_definitions(), self.model
             )
+            usage.add(iteration, response.usage, time.monotonic() - started, response.model)
+            self._record_queue_wait(trace_events, iteration, response)
             
             # Handle tool calls
             if response.has_tool_calls:
@@ -285,19 +366,12 @@ class AgentLoop:
         preview = final_content[:120] + "..." if len(final_content) > 120 else final_content
         logger.info(f"Response to {msg.channel}:{msg.sender_id}: {preview}")
         
-        # Save to session. For Web UI, allow a shorter display message while keeping
-        # full prompt payload in LLM context.
-        display_content = str(msg.metadata.get("displayContent") or msg.content)
+        self._save_turn(session, msg.content, msg.metadata, final_content, trace_events)
         attachments = msg.metadata.get("attachments")
-        user_kwargs: dict[str, Any] = {}
-        if isinstance(attachments, list) and attachments:
-            user_kwargs["attachments"] = attachments
-        session.add_message("user", display_content, **user_kwargs)
-        session.add_message("assistant", final_content, trace=trace_events)
-        self.sessions.save(session)
         
         outbound_metadata = dict(msg.metadata or {})
         outbound_metadata["trace"] = trace_events
+        outbound_metadata["usage"] = usage.summary()
         if attachments:
             outbound_metadata["attachments"] = attachments
 
@@ -307,6 +381,30 @@ class AgentLoop:
             content=final_content,
             metadata=outbound_metadata,  # Keep channel metadata and tool execution trace.
         )
+
+    def _save_turn(
+        self,
+        session: Session,
+        content: str,
+        metadata: dict[str, Any],
+        final_content: str,
+        trace_events: list[dict[str, Any]],
+    ) -> None:
+        """Save a user/assistant exchange; the tool trace goes to the trace store."""
+        # For Web UI, allow a shorter display message while keeping
+        # full prompt payload in LLM context.
+        display_content = str(metadata.get("displayContent") or content)
+        attachments = metadata.get("attachments")
+        user_kwargs: dict[str, Any] = {}
+        if isinstance(attachments, list) and attachments:
+            user_kwargs["attachments"] = attachments
+        assistant_kwargs: dict[str, Any] = {}
+        trace_ref = self.sessions.save_trace(session.key, trace_events)
+        if trace_ref:
+            assistant_kwargs["trace_ref"] = trace_ref
+        session.add_message("user", display_content, **user_kwargs)
+        session.add_message("assistant", final_content, **assistant_kwargs)
+        self.sessions.save(session)
     
     async def _process_system_message(self, msg: InboundMessage) -> OutboundMessage | None:
         """
@@ -344,9 +442,20 @@ class AgentLoop:
         if isinstance(cron_tool, CronTool):
             cron_tool.set_context(origin_channel, origin_chat_id)
         
+        memory_tool = self.tools.get("memory_write")
+        if isinstance(memory_tool, MemoryWriteTool):
+            memory_tool.set_context(origin_channel, origin_chat_id)
+
+        # Subagent results can be summarized by a cheaper model: one call,
+        # no tools, recent history only.
+        sub_cfg = self.subagents.config
+        summarize_only = msg.sender_id == "subagent" and bool(sub_cfg.announce_model)
+        model = sub_cfg.announce_model if summarize_only else self.model
+
         # Build messages with the announce content
-        messages = self.context.build_messages(
-            history=session.get_history(),
+        messages = await asyncio.to_thread(
+            self.context.build_messages,
+            history=session.get_history(sub_cfg.announce_history) if summarize_only else session.get_history(),
             current_message=msg.content,
             channel=origin_channel,
             chat_id=origin_chat_id,
@@ -355,15 +464,18 @@ class AgentLoop:
         # Agent loop (limited for announce handling)
         iteration = 0
         final_content = None
+        generation = self.generation.resolve(origin_channel, msg.metadata)
+        usage = UsageTurn(self.usage_ledger, session_key, origin_channel, model)
+        tool_defs = None if summarize_only else self.tools.get_definitions()
         
         while iteration < self.max_iterations:
             iteration += 1
             
-            response = await self.provider.chat(
-                messages=messages,
-                tools=self.tools.get_definitions(),
-                model=self.model
+            started = time.monotonic()
+            response = await chat_with_budget(
+                self.provider, generation, messages, tool_defs, model
             )
+            usage.add(iteration, response.usage, time.monotonic() - started, response.model)
             
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -480,6 +592,7 @@ class AgentLoop:
           {"type": "tool_call",   "tool": ..., "callId": ..., "arguments": ...}
           {"type": "tool_result", "tool": ..., "callId": ..., "status": "ok"|"error", "result": ...}
           {"type": "token",       "text": ...}
+          {"type": "retry",       "discard": n}  (drop the last n streamed UTF-16 units; reply is regenerated)
           {"type": "done",        "reply": ..., "trace": [...]}
         """
         if session_key and ":" in session_key:
@@ -494,6 +607,7 @@ class AgentLoop:
             ("message", channel, chat_id),
             ("spawn", channel, chat_id),
             ("cron", channel, chat_id),
+            ("memory_write", channel, chat_id),
         ]:
             t = self.tools.get(tool_name)
             if t and hasattr(t, "set_context"):
@@ -507,7 +621,8 @@ class AgentLoop:
             metadata=metadata or {},
         )
 
-        messages = self.context.build_messages(
+        messages = await asyncio.to_thread(
+            self.context.build_messages,
             history=session.get_history(),
             current_message=msg.content,
             media=msg.media if hasattr(msg, "media") and msg.media else None,
@@ -519,35 +634,66 @@ class AgentLoop:
         final_content = None
         trace_events: list[dict[str, Any]] = []
         has_stream = hasattr(self.provider, "chat_stream")
+        generation = self.generation.resolve(channel, msg.metadata)
+        usage = UsageTurn(self.usage_ledger, session_key, channel, self.model)
 
         while iteration < self.max_iterations:
             iteration += 1
+            tools = self.tools.get_definitions()
+            started = time.monotonic()
+            early_tools: dict[str, asyncio.Task[str]] = {}
 
             if has_stream:
                 # --- streaming call ---
-                llm_response: LLMResponse | None = None
-                content_buf: list[str] = []
-
-                async for item in self.provider.chat_stream(
-                    messages=messages,
-                    tools=self.tools.get_definitions(),
-                    model=self.model,
-                ):
-                    if isinstance(item, str):
-                        content_buf.append(item)
-                        yield {"type": "token", "text": item}
-                    else:
-                        llm_response = item
+                budget = generation.budget(bool(tools))
+                truncated: LLMResponse | None = None
+                continuing = False
+                while True:
+                    llm_response: LLMResponse | None = None
+                    content_buf: list[str] = []
+                    early_blocked = False
 
-                if llm_response is None:
-                    llm_response = LLMResponse(content="".join(content_buf) or None)
+                    async for item in self.provider.chat_stream(
+                        messages=continuation_messages(messages, truncated) if continuing else messages,
+                        tools=tools,
+                        model=self.model,
+                        max_tokens=budget,
+                        temperature=generation.temperature,
+                    ):
+                        if isinstance(item, str):
+                            content_buf.append(item)
+                            yield {"type": "token", "text": item}
+                        elif isinstance(item, ToolCallRequest):
+                            early_blocked = self._start_early_tool(item, early_tools, early_blocked)
+                        else:
+                            llm_response = item
+
+                    if llm_response is None:
+                        llm_response = LLMResponse(content="".join(content_buf) or None)
+                    if continuing:
+                        llm_response = join_continuation(truncated, llm_response)
+                    elif truncated:
+                        merge_attempt(llm_response, truncated)
+                    if truncated or not generation.cut_by_budget(llm_response, budget):
+                        break
+                    truncated = llm_response
+                    if is_answer(llm_response) and not early_tools:
+                        # An answer cut off by the planning budget: keep what was
+                        # streamed and ask for the rest.
+                        continuing = True
+                        budget = generation.max_tokens - budget
+                        continue
+                    # A tool call cut off by the planning budget: drop it and retry in full.
+                    self._cancel_early_tools(early_tools)
+                    budget = generation.max_tokens
+                    yield {"type": "retry", "discard": len("".join(content_buf).encode("utf-16-le")) // 2}
             else:
                 # Fallback: non-streaming
-                llm_response = await self.provider.chat(
-                    messages=messages,
-                    tools=self.tools.get_definitions(),
-                    model=self.model,
+                llm_response = await chat_with_budget(
+                    self.provider, generation, messages, tools, self.model
                 )
+            usage.add(iteration, llm_response.usage, time.monotonic() - started, llm_response.model)
+            self._record_queue_wait(trace_events, iteration, llm_response)
 
             if llm_response.has_tool_calls:
                 trace_events.append({
@@ -593,7 +739,11 @@ class AgentLoop:
                     }
 
                     logger.info(f"Tool call: {tool_call.name}({args_str[:200]})")
-                    result = await self.tools.execute(tool_call.name, tool_call.arguments)
+                    early_task = early_tools.pop(tool_call.id, None)
+                    if early_task is not None:
+                        result = await early_task
+                    else:
+                        result = await self.tools.execute(tool_call.name, tool_call.arguments)
                     is_error = str(result).startswith("Error")
 
                     result_event = {
@@ -625,20 +775,14 @@ class AgentLoop:
                     "summary": f"第 {iteration} 轮：模型直接返回最终回答",
                 })
                 final_content = llm_response.content
+                self._cancel_early_tools(early_tools)
                 break
+            self._cancel_early_tools(early_tools)
 
         if final_content is None:
             final_content = "I've completed processing but have no response to give."
 
-        # Save session
-        display_content = str((metadata or {}).get("displayContent") or content)
-        attachments = (metadata or {}).get("attachments")
-        user_kwargs: dict[str, Any] = {}
-        if isinstance(attachments, list) and attachments:
-            user_kwargs["attachments"] = attachments
-        session.add_message("user", display_content, **user_kwargs)
-        session.add_message("assistant", final_content, trace=trace_events)
-        self.sessions.save(session)
+        self._save_turn(session, content, metadata or {}, final_content, trace_events)
 
-        yield {"type": "done", "reply": final_content, "trace": trace_events}
+        yield {"type": "done", "reply": final_content, "trace": trace_events, "usage": usage.summary()}
 
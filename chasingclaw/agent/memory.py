@@ -1,22 +1,116 @@
 """Memory system for persistent agent memory."""
 
-from pathlib import Path
+import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterator
 
+from chasingclaw.agent.memory_index import MemoryEntry, MemoryHit, MemoryIndex, read_entries
 from chasingclaw.utils.helpers import ensure_dir, today_date
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import MemoryConfig
+
+# In-process guards for MEMORY.md, by path (several stores may share a workspace)
+_long_term_locks: dict[Path, threading.Lock] = {}
+_long_term_locks_guard = threading.Lock()
+
+
+def _append_to_file(path: Path, text: str, header: str = "") -> None:
+    """
+    Append with a single O_APPEND write, so concurrent writers never
+    interleave or lose each other's lines. `header` is written first when
+    this call creates the file.
+    """
+    data = text
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+        data = header + text
+    except FileExistsError:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        if os.fstat(fd).st_size:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = "\n" + text  # edited by hand without a trailing newline
+    try:
+        payload = data.encode("utf-8")
+        while payload:
+            payload = payload[os.write(fd, payload):]
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path: Path, content: str) -> None:
+    """Replace a file's content via fsynced temp file + rename."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return  # e.g. Windows: directories cannot be opened
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
 
 class MemoryStore:
     """
     Memory system for the agent.
     
     Supports daily notes (memory/YYYY-MM-DD.md) and long-term memory (MEMORY.md).
+    Once they outgrow the prompt, only the chunks relevant to the current
+    message are injected, found through a local search index.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, config: "MemoryConfig | None" = None):
+        from chasingclaw.config.schema import MemoryConfig
         self.workspace = workspace
+        self.config = config or MemoryConfig()
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
+        self._index: MemoryIndex | None = None
+        # Searches run in worker threads; the index itself is not thread-safe
+        self._index_lock = threading.RLock()
+
+    @property
+    def index(self) -> MemoryIndex:
+        """Search index over the memory files (built on first use)."""
+        with self._index_lock:
+            if self._index is None:
+                self._index = MemoryIndex(
+                    self.memory_dir,
+                    chunk_chars=self.config.chunk_chars,
+                    embedding_model=self.config.embedding_model,
+                )
+            return self._index
+
+    def search(self, query: str, k: int | None = None) -> list[MemoryHit]:
+        """
+        Search all memory files (long-term and every daily note).
+
+        Args:
+            query: Free text to match.
+            k: Maximum number of hits (default: config top_k).
+
+        Returns:
+            Matching chunks, best first.
+        """
+        with self._index_lock:
+            self.index.refresh()
+            return self.index.search(query, k or self.config.top_k)
     
     def get_today_file(self) -> Path:
         """Get path to today's memory file."""
@@ -29,19 +123,37 @@ class MemoryStore:
             return today_file.read_text(encoding="utf-8")
         return ""
     
-    def append_today(self, content: str) -> None:
-        """Append content to today's memory notes."""
+    def append_today(
+        self,
+        content: str,
+        session: str | None = None,
+        tags: list[str] | None = None,
+    ) -> MemoryEntry:
+        """
+        Append a note to today's memory.
+
+        The structured entry goes to memory/YYYY-MM-DD.jsonl (what the
+        search index reads) and its markdown bullet to YYYY-MM-DD.md; both
+        are single appends, so concurrent sessions never lose notes.
+
+        Args:
+            content: The note.
+            session: Session key of the writer, e.g. "telegram:42".
+            tags: Optional tags.
+
+        Returns:
+            The stored entry.
+        """
+        entry = MemoryEntry(text=content, session=session, tags=list(tags or []))
         today_file = self.get_today_file()
-        
-        if today_file.exists():
-            existing = today_file.read_text(encoding="utf-8")
-            content = existing + "\n" + content
-        else:
-            # Add header for new day
-            header = f"# {today_date()}\n\n"
-            content = header + content
-        
-        today_file.write_text(content, encoding="utf-8")
+        _append_to_file(today_file.with_suffix(".jsonl"), entry.to_json() + "\n")
+        _append_to_file(today_file, entry.to_markdown() + "\n", header=f"# {today_date()}\n\n")
+        return entry
+
+    def read_entries(self, date: str | None = None) -> list[MemoryEntry]:
+        """Structured entries of a day (YYYY-MM-DD, default today)."""
+        path = self.memory_dir / f"{date or today_date()}.jsonl"
+        return [entry for _, entry in read_entries(path)]
     
     def read_long_term(self) -> str:
         """Read long-term memory (MEMORY.md)."""
@@ -50,8 +162,44 @@ class MemoryStore:
         return ""
     
     def write_long_term(self, content: str) -> None:
-        """Write to long-term memory (MEMORY.md)."""
-        self.memory_file.write_text(content, encoding="utf-8")
+        """Write to long-term memory (MEMORY.md), atomically."""
+        with self._long_term_lock():
+            _atomic_write(self.memory_file, content)
+
+    def update_long_term(self, update: Callable[[str], str]) -> str:
+        """
+        Read-modify-write MEMORY.md while holding its lock, so concurrent
+        sessions editing long-term memory do not overwrite each other.
+
+        Args:
+            update: Gets the current content, returns the new content.
+
+        Returns:
+            The new content.
+        """
+        with self._long_term_lock():
+            content = update(self.read_long_term())
+            _atomic_write(self.memory_file, content)
+        return content
+
+    @contextmanager
+    def _long_term_lock(self) -> Iterator[None]:
+        """Exclusive access to MEMORY.md across threads and (on POSIX) processes."""
+        with _long_term_locks_guard:
+            lock = _long_term_locks.setdefault(self.memory_file.resolve(), threading.Lock())
+        with lock:
+            try:
+                import fcntl
+            except ImportError:
+                yield
+                return
+            lock_path = self.memory_file.with_name(f".{self.memory_file.name}.lock")
+            with open(lock_path, "a") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
     
     def get_recent_memories(self, days: int = 7) -> str:
         """
@@ -87,23 +235,45 @@ class MemoryStore:
         files = list(self.memory_dir.glob("????-??-??.md"))
         return sorted(files, reverse=True)
     
-    def get_memory_context(self) -> str:
+    def get_memory_context(self, query: str | None = None) -> str:
         """
         Get memory context for the agent.
-        
+
+        Blocking: a search may load and run the embedding model, so async
+        callers should run this in a worker thread.
+
+        Args:
+            query: The current message. When memory is longer than
+                inline_max_chars characters, only chunks matching it are
+                returned.
+
         Returns:
             Formatted memory context including long-term and recent memories.
         """
+        long_term = self.read_long_term()
+        today = self.read_today()
+        if query and self.config.retrieval and len(long_term) + len(today) > self.config.inline_max_chars:
+            return self._get_relevant_context(query)
+
         parts = []
-        
+
         # Long-term memory
-        long_term = self.read_long_term()
         if long_term:
             parts.append("## Long-term Memory\n" + long_term)
-        
+
         # Today's notes
-        today = self.read_today()
         if today:
             parts.append("## Today's Notes\n" + today)
         
         return "\n\n".join(parts) if parts else ""
+
+    def _get_relevant_context(self, query: str) -> str:
+        hits = self.search(query)
+        if not hits:
+            return ""
+        parts = [f"### {hit.source} (line {hit.line})\n{hit.text}" for hit in hits]
+        return (
+            "## Relevant Memories\n"
+            "Excerpts matching this message; use memory_search to look up more.\n\n"
+            + "\n\n".join(parts)
+        )
@@ -0,0 +1,338 @@
+"""Local retrieval index over the memory files: BM25, optionally blended with embeddings."""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+
+# ASCII words, or runs of CJK characters (which have no spaces between words)
+_TOKEN = re.compile(r"[a-z0-9_]+|[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased words; CJK runs become single characters plus bigrams."""
+    tokens: list[str] = []
+    for match in _TOKEN.finditer(text.lower()):
+        run = match.group()
+        if run.isascii():
+            if len(run) > 1 or run.isdigit():
+                tokens.append(run)
+        else:
+            tokens.extend(run)
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def chunk_markdown(text: str, max_chars: int = 800) -> list[tuple[int, str]]:
+    """
+    Split markdown into chunks of at most about `max_chars`.
+
+    A heading starts a new chunk so it stays with the text under it.
+    Chunks made only of headings are dropped.
+
+    Returns:
+        (first line number, chunk text) pairs.
+    """
+    chunks: list[tuple[int, str]] = []
+    buf: list[str] = []
+    start = size = 0
+
+    def flush() -> None:
+        if any(line.strip() and not line.lstrip().startswith("#") for line in buf):
+            chunks.append((start, "\n".join(buf).strip()))
+        buf.clear()
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if line.lstrip().startswith("#") or (buf and size + len(line) > max_chars):
+            flush()
+            size = 0
+        if not buf:
+            if not line.strip():
+                continue
+            start = lineno
+        buf.append(line)
+        size += len(line) + 1
+    flush()
+    return chunks
+
+
+@dataclass
+class MemoryEntry:
+    """
+    One structured note, stored as a JSON line in memory/YYYY-MM-DD.jsonl
+    (next to its markdown rendering in YYYY-MM-DD.md).
+    """
+    text: str
+    ts: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    session: str | None = None  # Session key that wrote it, e.g. "telegram:42"
+    tags: list[str] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        data = {"ts": self.ts, "text": self.text, "session": self.session, "tags": self.tags}
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> "MemoryEntry":
+        data = json.loads(line)
+        return cls(
+            text=str(data["text"]),
+            ts=str(data.get("ts") or ""),
+            session=data.get("session"),
+            tags=[str(t) for t in data.get("tags") or []],
+        )
+
+    def to_markdown(self) -> str:
+        """Bullet for the daily note: time, text (continuation lines indented), tags."""
+        line = f"- {self.ts[11:16]} " + self.text.strip().replace("\n", "\n  ")
+        if self.tags:
+            line += " " + " ".join(f"#{t}" for t in self.tags)
+        return line
+
+
+def read_entries(path: Path) -> list[tuple[int, MemoryEntry]]:
+    """Entries of a .jsonl file with their line numbers; malformed lines are skipped."""
+    entries = []
+    if not path.exists():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entries.append((lineno, MemoryEntry.from_json(line)))
+            except (ValueError, KeyError, TypeError):
+                continue
+    return entries
+
+
+@dataclass
+class MemoryHit:
+    """A chunk of a memory file matching a query."""
+    source: str  # File name, e.g. "MEMORY.md" or "2024-05-01.md"
+    line: int
+    text: str
+    score: float
+    ts: str = ""  # Set for structured entries
+    tags: list[str] = field(default_factory=list)
+
+
+@dataclass
+class _Chunk:
+    source: str
+    line: int
+    text: str
+    terms: Counter
+    length: int
+    key: str  # Content hash, for the embedding cache
+    ts: str = ""
+    tags: list[str] = field(default_factory=list)
+
+
+class _Embedder:
+    """CPU-local sentence embeddings via fastembed (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from fastembed import TextEmbedding
+        self._model = TextEmbedding(model_name)
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for v in self._model.embed(texts):
+            v = [float(x) for x in v]
+            norm = math.sqrt(sum(x * x for x in v)) or 1.0
+            vectors.append([x / norm for x in v])
+        return vectors
+
+
+class MemoryIndex:
+    """
+    Search index over memory/*.md and memory/*.jsonl, kept in memory.
+
+    refresh() re-reads only files whose mtime or size changed, so calling
+    it before every search is cheap. Structured entries are indexed one
+    per chunk from the .jsonl files; their bullets in the daily .md are
+    skipped so they are not indexed twice. Scores are BM25; with an
+    embedding model they are blended half and half with cosine similarity.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, memory_dir: Path, chunk_chars: int = 800, embedding_model: str = ""):
+        self.memory_dir = memory_dir
+        self.chunk_chars = chunk_chars
+        self._files: dict[Path, tuple[tuple[int, ...], list[_Chunk]]] = {}
+        self._df: Counter = Counter()
+        self._total_length = 0
+        self._chunk_count = 0
+        self._embedder: _Embedder | None = None
+        self._vectors: dict[str, list[float]] = {}
+        if embedding_model:
+            try:
+                self._embedder = _Embedder(embedding_model)
+            except ImportError:
+                logger.warning("Memory embeddings need fastembed (pip install chasingclaw[memory-embeddings]); using BM25 only")
+            except Exception as e:
+                logger.warning(f"Memory embedding model {embedding_model} failed to load ({e}); using BM25 only")
+
+    def _source_files(self) -> list[Path]:
+        if not self.memory_dir.exists():
+            return []
+        return sorted([*self.memory_dir.glob("*.md"), *self.memory_dir.glob("*.jsonl")])
+
+    @staticmethod
+    def _signature(path: Path) -> tuple[int, ...]:
+        st = path.stat()
+        signature = (st.st_mtime_ns, st.st_size)
+        entries_path = path.with_suffix(".jsonl")
+        if path.suffix == ".md" and entries_path.exists():
+            # The note's chunks depend on which bullets are structured entries
+            est = entries_path.stat()
+            signature += (est.st_mtime_ns, est.st_size)
+        return signature
+
+    def _read_chunks(self, path: Path) -> list[tuple[int, str, str, list[str]]]:
+        """(line, text, timestamp, tags) for each chunk of a file."""
+        if path.suffix == ".jsonl":
+            return [
+                (lineno, " ".join([e.text, *(f"#{t}" for t in e.tags)]), e.ts, e.tags)
+                for lineno, e in read_entries(path)
+            ]
+        lines = path.read_text(encoding="utf-8").splitlines()
+        structured = {
+            line
+            for _, e in read_entries(path.with_suffix(".jsonl"))
+            for line in e.to_markdown().splitlines()
+        }
+        if structured:
+            # Blank (not drop) them so line numbers stay right
+            lines = ["" if line in structured else line for line in lines]
+        return [(line, text, "", []) for line, text in chunk_markdown("\n".join(lines), self.chunk_chars)]
+
+    def refresh(self) -> int:
+        """
+        Bring the index up to date with the memory directory.
+
+        Returns:
+            Number of files (re)indexed or dropped.
+        """
+        seen: set[Path] = set()
+        changed = 0
+        for path in self._source_files():
+            seen.add(path)
+            try:
+                signature = self._signature(path)
+            except OSError:
+                continue
+            indexed = self._files.get(path)
+            if indexed and indexed[0] == signature:
+                continue
+            try:
+                pieces = self._read_chunks(path)
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Memory index: cannot read {path.name}: {e}")
+                continue
+            self._drop(path)
+            self._add(path, signature, pieces)
+            changed += 1
+        for path in [p for p in self._files if p not in seen]:
+            self._drop(path)
+            changed += 1
+        if changed and self._embedder:
+            self._embed_missing()
+        return changed
+
+    def _add(self, path: Path, signature: tuple[int, ...], pieces: list[tuple[int, str, str, list[str]]]) -> None:
+        chunks = []
+        for line, text, ts, tags in pieces:
+            terms = Counter(tokenize(text))
+            key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            chunks.append(_Chunk(path.name, line, text, terms, sum(terms.values()), key, ts, tags))
+            self._df.update(terms.keys())
+            self._total_length += chunks[-1].length
+        self._chunk_count += len(chunks)
+        self._files[path] = (signature, chunks)
+
+    def _drop(self, path: Path) -> None:
+        indexed = self._files.pop(path, None)
+        if not indexed:
+            return
+        for chunk in indexed[1]:
+            self._df.subtract(chunk.terms.keys())
+            self._total_length -= chunk.length
+        self._chunk_count -= len(indexed[1])
+        self._df += Counter()  # drop zero counts
+
+    def _chunks(self) -> list[_Chunk]:
+        return [c for _, chunks in self._files.values() for c in chunks]
+
+    def _embed_missing(self) -> None:
+        chunks = self._chunks()
+        live = {c.key for c in chunks}
+        self._vectors = {k: v for k, v in self._vectors.items() if k in live}
+        missing = {c.key: c.text for c in chunks if c.key not in self._vectors}
+        if not missing:
+            return
+        try:
+            vectors = self._embedder.embed(list(missing.values()))
+        except Exception as e:
+            logger.warning(f"Memory embedding failed: {e}")
+            return
+        self._vectors.update(zip(missing.keys(), vectors))
+
+    def _bm25(self, query_terms: list[str], chunk: _Chunk) -> float:
+        avg_length = self._total_length / self._chunk_count if self._chunk_count else 0.0
+        score = 0.0
+        for term in query_terms:
+            tf = chunk.terms.get(term)
+            if not tf:
+                continue
+            df = self._df[term]
+            idf = math.log(1 + (self._chunk_count - df + 0.5) / (df + 0.5))
+            norm = self.K1 * (1 - self.B + self.B * chunk.length / (avg_length or 1))
+            score += idf * tf * (self.K1 + 1) / (tf + norm)
+        return score
+
+    def search(self, query: str, k: int = 5) -> list[MemoryHit]:
+        """
+        Best-matching chunks for a query (call refresh() first).
+
+        Args:
+            query: Free text, e.g. the user's message.
+            k: Maximum number of hits.
+
+        Returns:
+            Hits, best first; empty when nothing matches.
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        chunks = self._chunks()
+        if not chunks or k <= 0:
+            return []
+        scores = [self._bm25(query_terms, c) for c in chunks]
+        best = max(scores, default=0.0)
+        if best > 0:
+            scores = [s / best for s in scores]
+
+        if self._embedder and self._vectors:
+            try:
+                q = self._embedder.embed([query])[0]
+            except Exception as e:
+                logger.warning(f"Memory embedding failed: {e}")
+            else:
+                for i, chunk in enumerate(chunks):
+                    v = self._vectors.get(chunk.key)
+                    cosine = sum(a * b for a, b in zip(q, v)) if v else 0.0
+                    scores[i] = 0.5 * scores[i] + 0.5 * max(cosine, 0.0)
+
+        ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+        return [
+            MemoryHit(chunks[i].source, chunks[i].line, chunks[i].text, scores[i], chunks[i].ts, chunks[i].tags)
+            for i in ranked[:k]
+            if scores[i] > 0
+        ]
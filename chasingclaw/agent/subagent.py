@@ -1,21 +1,103 @@
 """Subagent manager for background task execution."""
 
 import asyncio
+import heapq
+import itertools
 import json
+import time
 import uuid
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, TYPE_CHECKING
 
 from loguru import logger
 
 from chasingclaw.bus.events import InboundMessage
 from chasingclaw.bus.queue import MessageBus
 from chasingclaw.providers.base import LLMProvider
+from chasingclaw.agent.generation import GenerationSettings, chat_with_budget
+from chasingclaw.agent.memory import MemoryStore
+from chasingclaw.session.usage import UsageLedger, UsageTurn
 from chasingclaw.agent.tools.registry import ToolRegistry
 from chasingclaw.agent.tools.filesystem import ReadFileTool, WriteFileTool, ListDirTool
 from chasingclaw.agent.tools.shell import ExecTool
 from chasingclaw.agent.tools.web import WebSearchTool, WebFetchTool
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import ExecToolConfig, SubagentsConfig
+
+FINISHED = ("ok", "error", "cancelled", "timeout", "budget")
+
+_STATUS_TEXT = {
+    "ok": "completed successfully",
+    "error": "failed",
+    "timeout": "ran out of time",
+    "budget": "stopped at its token budget",
+}
+
+# Finished tasks kept for status queries.
+_KEEP_FINISHED = 50
+
+# Subagent tool registries by settings; the tools are stateless, so every
+# subagent (and every manager with the same settings) shares one instance.
+_TOOL_PROFILES: dict[tuple[Any, ...], ToolRegistry] = {}
+
+
+@dataclass
+class SubagentTask:
+    """One spawned subagent: its request, scheduling state and progress events."""
+    id: str
+    task: str
+    label: str
+    origin: dict[str, str]
+    priority: int = 0
+    token_budget: int = 0  # 0 = unlimited
+    time_budget_s: float = 0.0  # 0 = unlimited
+    status: str = "queued"  # queued, running, ok, error, cancelled, timeout, budget
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    iteration: int = 0
+    tokens: int = 0
+    result: str | None = None
+    events: deque = field(default_factory=lambda: deque(maxlen=50))
+    handle: asyncio.Task | None = field(default=None, repr=False)
+    _seq: int = 0
+
+    @property
+    def origin_key(self) -> str:
+        return f"{self.origin['channel']}:{self.origin['chat_id']}"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def emit(self, kind: str, summary: str) -> None:
+        """Append a progress event (polled through status())."""
+        self._seq += 1
+        self.events.append({"seq": self._seq, "ts": round(time.time(), 3), "type": kind, "summary": summary})
+
+    def to_dict(self, since: int = 0) -> dict[str, Any]:
+        """Status snapshot with the progress events newer than `since`."""
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "priority": self.priority,
+            "origin": self.origin_key,
+            "iteration": self.iteration,
+            "tokens": self.tokens,
+            "elapsedS": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "result": self.result,
+            "events": [e for e in self.events if e["seq"] > since],
+        }
+
+
+class _BudgetExhaustedError(Exception):
+    pass
+
 
 class SubagentManager:
     """
@@ -24,6 +106,9 @@ class SubagentManager:
     Subagents are lightweight agent instances that run in the background
     to handle specific tasks. They share the same LLM provider but have
     isolated context and a focused system prompt.
+
+    Spawned tasks wait in a priority queue (FIFO within a priority) and
+    start when both the global and the per-origin concurrency caps allow.
     """
     
     def __init__(
@@ -35,8 +120,11 @@ class SubagentManager:
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
         restrict_to_workspace: bool = False,
+        generation: GenerationSettings | None = None,
+        usage_ledger: UsageLedger | None = None,
+        config: "SubagentsConfig | None" = None,
     ):
-        from chasingclaw.config.schema import ExecToolConfig
+        from chasingclaw.config.schema import ExecToolConfig, SubagentsConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -44,7 +132,15 @@ class SubagentManager:
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
         self.restrict_to_workspace = restrict_to_workspace
+        self.generation = generation or GenerationSettings()
+        self.usage_ledger = usage_ledger
+        self.config = config or SubagentsConfig()
+        self._tasks: dict[str, SubagentTask] = {}
+        self._waiting: list[tuple[int, int, str]] = []  # (-priority, seq, task_id)
+        self._seq = itertools.count()
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
+        self._pending_announcements: dict[str, list[dict[str, str]]] = {}
+        self._announce_timers: dict[str, asyncio.Task[None]] = {}
     
     async def spawn(
         self,
@@ -52,129 +148,266 @@ class SubagentManager:
         label: str | None = None,
         origin_channel: str = "cli",
         origin_chat_id: str = "direct",
+        priority: int = 0,
+        token_budget: int | None = None,
+        time_budget_s: float | None = None,
     ) -> str:
         """
-        Spawn a subagent to execute a task in the background.
+        Queue a subagent to execute a task in the background.
         
         Args:
             task: The task description for the subagent.
             label: Optional human-readable label for the task.
             origin_channel: The channel to announce results to.
             origin_chat_id: The chat ID to announce results to.
+            priority: Higher runs first when tasks are waiting for a slot.
+            token_budget: Total tokens the subagent may use (capped by config).
+            time_budget_s: Wall-clock seconds the subagent may run (capped by config).
         
         Returns:
-            Status message indicating the subagent was started.
+            Status message indicating the subagent was started or queued.
         """
+        cfg = self.config
+        if cfg.max_queued > 0 and len(self._waiting) >= cfg.max_queued:
+            return f"Error: too many subagents waiting ({len(self._waiting)}), try again later"
+
         task_id = str(uuid.uuid4())[:8]
         display_label = label or task[:30] + ("..." if len(task) > 30 else "")
-        
-        origin = {
-            "channel": origin_channel,
-            "chat_id": origin_chat_id,
-        }
-        
-        # Create background task
-        bg_task = asyncio.create_task(
-            self._run_subagent(task_id, task, display_label, origin)
+        sub = SubagentTask(
+            id=task_id,
+            task=task,
+            label=display_label,
+            origin={"channel": origin_channel, "chat_id": origin_chat_id},
+            priority=priority,
+            token_budget=_cap(token_budget, cfg.token_budget),
+            time_budget_s=_cap(time_budget_s, cfg.time_budget_s),
         )
-        self._running_tasks[task_id] = bg_task
-        
-        # Cleanup when done
-        bg_task.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
-        
-        logger.info(f"Spawned subagent [{task_id}]: {display_label}")
-        return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        self._tasks[task_id] = sub
+        sub.emit("status", "queued")
+        heapq.heappush(self._waiting, (-priority, next(self._seq), task_id))
+        self._pump()
+
+        if sub.status == "running":
+            logger.info(f"Spawned subagent [{task_id}]: {display_label}")
+            return f"Subagent [{display_label}] started (id: {task_id}). I'll notify you when it completes."
+        position = sum(1 for *_, tid in self._waiting if self._tasks[tid].priority >= priority)
+        logger.info(f"Queued subagent [{task_id}] at position {position}: {display_label}")
+        return (
+            f"Subagent [{display_label}] queued (id: {task_id}, position {position}); "
+            "it starts when a slot frees up. I'll notify you when it completes."
+        )
+
+    def _origin_running(self, origin_key: str) -> int:
+        return sum(1 for tid in self._running_tasks if self._tasks[tid].origin_key == origin_key)
+
+    def _pump(self) -> None:
+        """Start waiting tasks, highest priority first, while the caps allow."""
+        cfg = self.config
+        deferred: list[tuple[int, int, str]] = []
+        while self._waiting and (cfg.max_concurrent <= 0 or len(self._running_tasks) < cfg.max_concurrent):
+            entry = heapq.heappop(self._waiting)
+            sub = self._tasks.get(entry[2])
+            if sub is None or sub.status != "queued":
+                continue
+            if 0 < cfg.max_per_origin <= self._origin_running(sub.origin_key):
+                deferred.append(entry)
+                continue
+            self._start(sub)
+        for entry in deferred:
+            heapq.heappush(self._waiting, entry)
+
+    def _start(self, sub: SubagentTask) -> None:
+        sub.status = "running"
+        sub.started_at = time.time()
+        sub.emit("status", "running")
+        sub.handle = asyncio.create_task(self._run_subagent(sub))
+        self._running_tasks[sub.id] = sub.handle
+        sub.handle.add_done_callback(lambda _: self._on_done(sub))
+
+    def _on_done(self, sub: SubagentTask) -> None:
+        self._running_tasks.pop(sub.id, None)
+        if not sub.finished:
+            sub.status = "cancelled"
+        sub.finished_at = sub.finished_at or time.time()
+        self._prune_finished()
+        self._pump()
+
+    def _prune_finished(self) -> None:
+        finished = [tid for tid, t in self._tasks.items() if t.finished]
+        for tid in finished[:-_KEEP_FINISHED]:
+            del self._tasks[tid]
+
+    def cancel(self, task_id: str) -> str:
+        """Cancel a queued or running subagent."""
+        sub = self._tasks.get(task_id)
+        if sub is None:
+            return f"Subagent {task_id} not found"
+        if sub.finished:
+            return f"Subagent {task_id} already finished ({sub.status})"
+        if sub.status == "queued":
+            sub.status = "cancelled"
+            sub.finished_at = time.time()
+            sub.emit("status", "cancelled")
+            self._waiting = [e for e in self._waiting if e[2] != task_id]
+            heapq.heapify(self._waiting)
+        elif sub.handle:
+            sub.handle.cancel()
+        logger.info(f"Cancelled subagent [{task_id}]")
+        return f"Cancelled subagent [{sub.label}] (id: {task_id})"
+
+    def get_task(self, task_id: str) -> SubagentTask | None:
+        return self._tasks.get(task_id)
+
+    def list_tasks(self, origin_key: str | None = None, include_finished: bool = True) -> list[SubagentTask]:
+        """Known subagents, oldest first, optionally only those of one origin."""
+        return [
+            t for t in self._tasks.values()
+            if (origin_key is None or t.origin_key == origin_key) and (include_finished or not t.finished)
+        ]
+
+    def status(self, task_id: str | None = None, since: int = 0) -> list[dict[str, Any]]:
+        """Status snapshots (all known tasks, or one) with events newer than `since`."""
+        tasks = [self._tasks[task_id]] if task_id in self._tasks else ([] if task_id else self.list_tasks())
+        return [t.to_dict(since) for t in tasks]
     
-    async def _run_subagent(
-        self,
-        task_id: str,
-        task: str,
-        label: str,
-        origin: dict[str, str],
-    ) -> None:
+    def _get_tools(self) -> ToolRegistry:
+        """Shared subagent tool registry for this manager's settings."""
+        key = (
+            str(self.workspace),
+            self.restrict_to_workspace,
+            self.exec_config.timeout,
+            self.brave_api_key,
+        )
+        tools = _TOOL_PROFILES.get(key)
+        if tools is None:
+            tools = _TOOL_PROFILES[key] = self._build_tools()
+        return tools
+
+    def _build_tools(self) -> ToolRegistry:
+        """Build subagent tools (no message tool, no spawn tool)."""
+        tools = ToolRegistry()
+        allowed_dir = self.workspace if self.restrict_to_workspace else None
+        tools.register(ReadFileTool(allowed_dir=allowed_dir))
+        tools.register(WriteFileTool(allowed_dir=allowed_dir, memory=MemoryStore(self.workspace)))
+        tools.register(ListDirTool(allowed_dir=allowed_dir))
+        tools.register(ExecTool(
+            working_dir=str(self.workspace),
+            timeout=self.exec_config.timeout,
+            restrict_to_workspace=self.restrict_to_workspace,
+        ))
+        tools.register(WebSearchTool(api_key=self.brave_api_key))
+        tools.register(WebFetchTool())
+        return tools
+
+    async def _run_subagent(self, sub: SubagentTask) -> None:
         """Execute the subagent task and announce the result."""
-        logger.info(f"Subagent [{task_id}] starting task: {label}")
+        logger.info(f"Subagent [{sub.id}] starting task: {sub.label}")
         
         try:
-            # Build subagent tools (no message tool, no spawn tool)
-            tools = ToolRegistry()
-            allowed_dir = self.workspace if self.restrict_to_workspace else None
-            tools.register(ReadFileTool(allowed_dir=allowed_dir))
-            tools.register(WriteFileTool(allowed_dir=allowed_dir))
-            tools.register(ListDirTool(allowed_dir=allowed_dir))
-            tools.register(ExecTool(
-                working_dir=str(self.workspace),
-                timeout=self.exec_config.timeout,
-                restrict_to_workspace=self.restrict_to_workspace,
-            ))
-            tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
-            
-            # Build messages with subagent-specific prompt
-            system_prompt = self._build_subagent_prompt(task)
-            messages: list[dict[str, Any]] = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": task},
-            ]
-            
-            # Run agent loop (limited iterations)
-            max_iterations = 15
-            iteration = 0
-            final_result: str | None = None
+            run = self._run_loop(sub)
+            if sub.time_budget_s > 0:
+                final_result = await asyncio.wait_for(run, timeout=sub.time_budget_s)
+            else:
+                final_result = await run
+            status = "ok"
+            logger.info(f"Subagent [{sub.id}] completed successfully")
+        except asyncio.TimeoutError:
+            status = "timeout"
+            final_result = f"Stopped after the {sub.time_budget_s:.0f}s time budget ({sub.iteration} iterations)."
+            logger.warning(f"Subagent [{sub.id}] timed out")
+        except _BudgetExhaustedError as e:
+            status = "budget"
+            final_result = str(e)
+            logger.warning(f"Subagent [{sub.id}] hit its token budget")
+        except asyncio.CancelledError:
+            sub.status = "cancelled"
+            sub.finished_at = time.time()
+            sub.emit("status", "cancelled")
+            raise
+        except Exception as e:
+            status = "error"
+            final_result = f"Error: {str(e)}"
+            logger.error(f"Subagent [{sub.id}] failed: {e}")
+
+        sub.status = status
+        sub.result = final_result
+        sub.finished_at = time.time()
+        sub.emit("status", status)
+        await self._announce_result(sub.id, sub.label, sub.task, final_result, sub.origin, status)
+
+    async def _run_loop(self, sub: SubagentTask) -> str:
+        """Tool-calling loop of one subagent; returns its final answer."""
+        tools = self._get_tools()
+
+        # Build messages with subagent-specific prompt
+        system_prompt = self._build_subagent_prompt(sub.task)
+        messages: list[dict[str, Any]] = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": sub.task},
+        ]
+
+        # Run agent loop (limited iterations)
+        max_iterations = self.config.max_iterations
+        generation = self.generation.resolve(sub.origin["channel"])
+        usage = UsageTurn(self.usage_ledger, f"subagent:{sub.id}", sub.origin["channel"], self.model)
+
+        while sub.iteration < max_iterations:
+            sub.iteration += 1
+            iteration = sub.iteration
+            sub.emit("iteration", f"iteration {iteration}")
             
-            while iteration < max_iterations:
-                iteration += 1
-                
-                response = await self.provider.chat(
-                    messages=messages,
-                    tools=tools.get_definitions(),
-                    model=self.model,
+            started = time.monotonic()
+            response = await chat_with_budget(
+                self.provider, generation, messages, tools.get_definitions(), self.model
+            )
+            usage.add(iteration, response.usage, time.monotonic() - started, response.model)
+            sub.tokens = usage.totals["prompt"] + usage.totals["completion"]
+
+            if not response.has_tool_calls:
+                return response.content or "Task completed but no final response was generated."
+            if sub.token_budget and sub.tokens >= sub.token_budget:
+                partial = f"\n\nLast notes:\n{response.content}" if response.content else ""
+                raise _BudgetExhaustedError(
+                    f"Stopped after using {sub.tokens} of {sub.token_budget} tokens "
+                    f"({iteration} iterations).{partial}"
                 )
-                
-                if response.has_tool_calls:
-                    # Add assistant message with tool calls
-                    tool_call_dicts = [
-                        {
-                            "id": tc.id,
-                            "type": "function",
-                            "function": {
-                                "name": tc.name,
-                                "arguments": json.dumps(tc.arguments),
-                            },
-                        }
-                        for tc in response.tool_calls
-                    ]
-                    messages.append({
-                        "role": "assistant",
-                        "content": response.content or "",
-                        "tool_calls": tool_call_dicts,
-                    })
-                    
-                    # Execute tools
-                    for tool_call in response.tool_calls:
-                        args_str = json.dumps(tool_call.arguments)
-                        logger.debug(f"Subagent [{task_id}] executing: {tool_call.name} with arguments: {args_str}")
-                        result = await tools.execute(tool_call.name, tool_call.arguments)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": tool_call.name,
-                            "content": result,
-                        })
-                else:
-                    final_result = response.content
-                    break
-            
-            if final_result is None:
-                final_result = "Task completed but no final response was generated."
-            
-            logger.info(f"Subagent [{task_id}] completed successfully")
-            await self._announce_result(task_id, label, task, final_result, origin, "ok")
+
+            # Add assistant message with tool calls
+            tool_call_dicts = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.name,
+                        "arguments": json.dumps(tc.arguments),
+                    },
+                }
+                for tc in response.tool_calls
+            ]
+            messages.append({
+                "role": "assistant",
+                "content": response.content or "",
+                "tool_calls": tool_call_dicts,
+            })
             
-        except Exception as e:
-            error_msg = f"Error: {str(e)}"
-            logger.error(f"Subagent [{task_id}] failed: {e}")
-            await self._announce_result(task_id, label, task, error_msg, origin, "error")
+            # Execute tools (independent read/search/fetch calls run concurrently)
+            for tool_call in response.tool_calls:
+                args_str = json.dumps(tool_call.arguments)
+                logger.debug(f"Subagent [{sub.id}] executing: {tool_call.name} with arguments: {args_str}")
+                sub.emit("tool", f"{tool_call.name} {args_str[:80]}")
+            results = await tools.execute_many(
+                [(tc.name, tc.arguments) for tc in response.tool_calls],
+                max_parallel=self.config.max_parallel_tools,
+            )
+            for tool_call, result in zip(response.tool_calls, results):
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "name": tool_call.name,
+                    "content": result,
+                })
+
+        return "Task completed but no final response was generated."
     
     async def _announce_result(
         self,
@@ -185,28 +418,76 @@ class SubagentManager:
         origin: dict[str, str],
         status: str,
     ) -> None:
-        """Announce the subagent result to the main agent via the message bus."""
-        status_text = "completed successfully" if status == "ok" else "failed"
-        
-        announce_content = f"""[Subagent '{label}' {status_text}]
+        """
+        Queue the subagent result for announcement to its origin session.
+
+        Results from the same origin that finish within announce_window_s
+        of each other are announced together in one system message, so the
+        main agent summarizes them in a single turn. The batch is sent
+        right away once no other subagent of that origin is queued or running.
+        """
+        origin_key = f"{origin['channel']}:{origin['chat_id']}"
+        self._pending_announcements.setdefault(origin_key, []).append({
+            "id": task_id,
+            "label": label,
+            "task": task,
+            "result": result,
+            "status": status,
+        })
 
-Task: {task}
+        window = self.config.announce_window_s
+        if window <= 0 or not self.list_tasks(origin_key, include_finished=False):
+            timer = self._announce_timers.pop(origin_key, None)
+            if timer and timer is not asyncio.current_task():
+                timer.cancel()
+            await self._flush_announcements(origin_key)
+        elif origin_key not in self._announce_timers:
+            self._announce_timers[origin_key] = asyncio.create_task(self._flush_after(origin_key, window))
+
+    async def _flush_after(self, origin_key: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._announce_timers.pop(origin_key, None)
+        await self._flush_announcements(origin_key)
+
+    async def _flush_announcements(self, origin_key: str) -> None:
+        """Publish the pending results of one origin as a single system message."""
+        results = self._pending_announcements.pop(origin_key, [])
+        if not results:
+            return
+
+        if len(results) == 1:
+            r = results[0]
+            announce_content = f"""[Subagent '{r['label']}' {_STATUS_TEXT.get(r['status'], 'failed')}]
+
+Task: {r['task']}
 
 Result:
-{result}
+{r['result']}
 
 Summarize this naturally for the user. Keep it brief (1-2 sentences). Do not mention technical details like "subagent" or task IDs."""
+        else:
+            sections = "\n\n".join(
+                f"### '{r['label']}' {_STATUS_TEXT.get(r['status'], 'failed')}\n\n"
+                f"Task: {r['task']}\n\nResult:\n{r['result']}"
+                for r in results
+            )
+            announce_content = f"""[{len(results)} subagents finished]
+
+{sections}
+
+Summarize these results naturally for the user in one short message (1-2 sentences per result). Do not mention technical details like "subagent" or task IDs."""
         
         # Inject as system message to trigger main agent
         msg = InboundMessage(
             channel="system",
             sender_id="subagent",
-            chat_id=f"{origin['channel']}:{origin['chat_id']}",
+            chat_id=origin_key,
             content=announce_content,
+            metadata={"subagent_ids": [r["id"] for r in results]},
         )
         
         await self.bus.publish_inbound(msg)
-        logger.debug(f"Subagent [{task_id}] announced result to {origin['channel']}:{origin['chat_id']}")
+        logger.debug(f"Announced {len(results)} subagent result(s) to {origin_key}")
     
     def _build_subagent_prompt(self, task: str) -> str:
         """Build a focused system prompt for the subagent."""
@@ -242,3 +523,10 @@ When you have completed the task, provide a clear summary of your findings or ac
     def get_running_count(self) -> int:
         """Return the number of currently running subagents."""
         return len(self._running_tasks)
+
+
+def _cap(requested: float | None, limit: float) -> Any:
+    """Requested budget bounded by the configured one (0 = unlimited)."""
+    if not requested or requested <= 0:
+        return limit
+    return min(requested, limit) if limit > 0 else requested
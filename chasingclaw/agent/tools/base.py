@@ -21,6 +21,10 @@ class Tool(ABC):
         "object": dict,
     }
     
+    # Read-only tools without side effects may run concurrently with other
+    # tool calls (e.g. while the model is still streaming the next ones).
+    parallel_safe: bool = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -1,10 +1,14 @@
 """File system tools: read, write, edit."""
 
+import asyncio
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from chasingclaw.agent.tools.base import Tool
 
+if TYPE_CHECKING:
+    from chasingclaw.agent.memory import MemoryStore
+
 
 def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     """Resolve path and optionally enforce directory restriction."""
@@ -14,8 +18,19 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
     return resolved
 
 
+def _is_long_term_memory(path: Path, memory: "MemoryStore | None") -> bool:
+    """Whether path is MEMORY.md, which must be written under the store's lock."""
+    return memory is not None and path == memory.memory_file.resolve()
+
+
+class _EditError(Exception):
+    """Aborts an edit; the message is returned to the model as is."""
+
+
 class ReadFileTool(Tool):
     """Tool to read file contents."""
+
+    parallel_safe = True
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -60,8 +75,9 @@ class ReadFileTool(Tool):
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(self, allowed_dir: Path | None = None, memory: "MemoryStore | None" = None):
         self._allowed_dir = allowed_dir
+        self._memory = memory
 
     @property
     def name(self) -> str:
@@ -91,6 +107,9 @@ class WriteFileTool(Tool):
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
         try:
             file_path = _resolve_path(path, self._allowed_dir)
+            if _is_long_term_memory(file_path, self._memory):
+                await asyncio.to_thread(self._memory.write_long_term, content)
+                return f"Successfully wrote {len(content)} bytes to {path}"
             file_path.parent.mkdir(parents=True, exist_ok=True)
             file_path.write_text(content, encoding="utf-8")
             return f"Successfully wrote {len(content)} bytes to {path}"
@@ -103,8 +122,9 @@ class WriteFileTool(Tool):
 class EditFileTool(Tool):
     """Tool to edit a file by replacing text."""
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(self, allowed_dir: Path | None = None, memory: "MemoryStore | None" = None):
         self._allowed_dir = allowed_dir
+        self._memory = memory
 
     @property
     def name(self) -> str:
@@ -141,20 +161,27 @@ class EditFileTool(Tool):
             if not file_path.exists():
                 return f"Error: File not found: {path}"
             
-            content = file_path.read_text(encoding="utf-8")
-            
-            if old_text not in content:
-                return f"Error: old_text not found in file. Make sure it matches exactly."
-            
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
+            def edit(content: str) -> str:
+                if old_text not in content:
+                    raise _EditError("Error: old_text not found in file. Make sure it matches exactly.")
+
+                # Count occurrences
+                count = content.count(old_text)
+                if count > 1:
+                    raise _EditError(
+                        f"Warning: old_text appears {count} times. Please provide more context to make it unique."
+                    )
+                return content.replace(old_text, new_text, 1)
             
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
+            # MEMORY.md is read, edited and replaced under its lock
+            if _is_long_term_memory(file_path, self._memory):
+                await asyncio.to_thread(self._memory.update_long_term, edit)
+            else:
+                file_path.write_text(edit(file_path.read_text(encoding="utf-8")), encoding="utf-8")
             
             return f"Successfully edited {path}"
+        except _EditError as e:
+            return str(e)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
@@ -163,6 +190,8 @@ class EditFileTool(Tool):
 
 class ListDirTool(Tool):
     """Tool to list directory contents."""
+
+    parallel_safe = True
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -0,0 +1,131 @@
+"""Memory tools: explicit recall and writes through the memory store."""
+
+import asyncio
+from typing import Any
+
+from chasingclaw.agent.memory import MemoryStore
+from chasingclaw.agent.tools.base import Tool
+
+
+class MemorySearchTool(Tool):
+    """Tool to search long-term memory and all daily notes."""
+
+    parallel_safe = True
+
+    def __init__(self, store: MemoryStore):
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return "memory_search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search your memory (MEMORY.md and all daily notes, including old ones) "
+            "by keywords. Returns the best-matching excerpts with file and line."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "What to look for, e.g. 'user birthday' or '项目截止日期'"
+                },
+                "k": {
+                    "type": "integer",
+                    "description": "Maximum number of excerpts (default 5)",
+                    "minimum": 1,
+                    "maximum": 20
+                }
+            },
+            "required": ["query"]
+        }
+
+    async def execute(self, query: str, k: int | None = None, **kwargs: Any) -> str:
+        hits = await asyncio.to_thread(self._store.search, query, k)
+        if not hits:
+            return f"No memories match: {query}"
+        return "\n\n".join(
+            f"[{hit.source}:{hit.line}{' ' + hit.ts if hit.ts else ''}]\n{hit.text}" for hit in hits
+        )
+
+
+class MemoryWriteTool(Tool):
+    """Tool to save a note to daily notes or long-term memory."""
+
+    def __init__(self, store: MemoryStore):
+        self._store = store
+        self._session: str | None = None
+
+    def set_context(self, channel: str, chat_id: str) -> None:
+        """Set the session that notes are attributed to."""
+        self._session = f"{channel}:{chat_id}"
+
+    @property
+    def name(self) -> str:
+        return "memory_write"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Save something to memory. target 'daily' (default) appends a note to today's "
+            "notes; 'long_term' adds it to MEMORY.md, or replaces old_text there when given. "
+            "Use this instead of editing the memory files directly."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "content": {
+                    "type": "string",
+                    "description": "The note, or the replacement text when old_text is given"
+                },
+                "target": {
+                    "type": "string",
+                    "enum": ["daily", "long_term"],
+                    "description": "Where to save it (default daily)"
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Optional tags for a daily note, e.g. ['todo']"
+                },
+                "old_text": {
+                    "type": "string",
+                    "description": "long_term only: exact text in MEMORY.md to replace"
+                }
+            },
+            "required": ["content"]
+        }
+
+    async def execute(
+        self,
+        content: str,
+        target: str = "daily",
+        tags: list[str] | None = None,
+        old_text: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if target != "long_term":
+            await asyncio.to_thread(self._store.append_today, content, session=self._session, tags=tags)
+            return f"Saved to today's notes ({self._store.get_today_file().name})"
+
+        def update(current: str) -> str:
+            if old_text is None:
+                return f"{current.rstrip()}\n{content.strip()}\n".lstrip()
+            count = current.count(old_text)
+            if count != 1:
+                raise ValueError(f"old_text appears {count} times in MEMORY.md; it must appear exactly once")
+            return current.replace(old_text, content, 1)
+
+        try:
+            await asyncio.to_thread(self._store.update_long_term, update)
+        except ValueError as e:
+            return f"Error: {e}"
+        return "Updated MEMORY.md" if old_text is not None else "Saved to MEMORY.md"
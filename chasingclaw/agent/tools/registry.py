@@ -1,5 +1,6 @@
 """Tool registry for dynamic tool management."""
 
+import asyncio
 from typing import Any
 
 from chasingclaw.agent.tools.base import Tool
@@ -31,6 +32,11 @@ class ToolRegistry:
         """Check if a tool is registered."""
         return name in self._tools
     
+    def is_parallel_safe(self, name: str) -> bool:
+        """Check if a tool may run concurrently with other tool calls."""
+        tool = self._tools.get(name)
+        return bool(tool and tool.parallel_safe)
+
     def get_definitions(self) -> list[dict[str, Any]]:
         """Get all tool definitions in OpenAI format."""
         return [tool.to_schema() for tool in self._tools.values()]
@@ -61,6 +67,44 @@ class ToolRegistry:
         except Exception as e:
             return f"Error executing {name}: {str(e)}"
     
+    async def execute_many(
+        self,
+        calls: list[tuple[str, dict[str, Any]]],
+        max_parallel: int = 4,
+    ) -> list[str]:
+        """
+        Execute several tool calls, running runs of parallel-safe calls concurrently.
+
+        Calls to tools that are not parallel-safe act as barriers: they run
+        alone, after everything before them and before everything after.
+
+        Args:
+            calls: (name, params) pairs in the order the model issued them.
+            max_parallel: Max concurrent calls within a parallel run.
+
+        Returns:
+            Results in the same order as `calls`.
+        """
+        results: list[str] = [""] * len(calls)
+        semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+        async def _run(i: int) -> None:
+            async with semaphore:
+                results[i] = await self.execute(*calls[i])
+
+        batch: list[int] = []
+        for i, (name, params) in enumerate(calls):
+            if self.is_parallel_safe(name):
+                batch.append(i)
+                continue
+            if batch:
+                await asyncio.gather(*(_run(j) for j in batch))
+                batch = []
+            results[i] = await self.execute(name, params)
+        if batch:
+            await asyncio.gather(*(_run(j) for j in batch))
+        return results
+
     @property
     def tool_names(self) -> list[str]:
         """Get list of registered tool names."""
@@ -35,7 +35,8 @@ class SpawnTool(Tool):
         return (
             "Spawn a subagent to handle a task in the background. "
             "Use this for complex or time-consuming tasks that can run independently. "
-            "The subagent will complete the task and report back when done."
+            "The subagent will complete the task and report back when done. "
+            "Actions: spawn (default), status (progress of this chat's subagents), cancel."
         )
     
     @property
@@ -43,23 +44,92 @@ class SpawnTool(Tool):
         return {
             "type": "object",
             "properties": {
+                "action": {
+                    "type": "string",
+                    "enum": ["spawn", "status", "cancel"],
+                    "description": "Action to perform (default: spawn)",
+                },
                 "task": {
                     "type": "string",
-                    "description": "The task for the subagent to complete",
+                    "description": "The task for the subagent to complete (for spawn)",
                 },
                 "label": {
                     "type": "string",
                     "description": "Optional short label for the task (for display)",
                 },
+                "priority": {
+                    "type": "integer",
+                    "description": "Higher starts first when subagents are queued (for spawn, default 0)",
+                },
+                "token_budget": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Optional max tokens the subagent may use (for spawn)",
+                },
+                "time_budget_s": {
+                    "type": "integer",
+                    "minimum": 0,
+                    "description": "Optional max seconds the subagent may run (for spawn)",
+                },
+                "task_id": {
+                    "type": "string",
+                    "description": "Subagent ID (for cancel; optional for status)",
+                },
             },
-            "required": ["task"],
         }
     
-    async def execute(self, task: str, label: str | None = None, **kwargs: Any) -> str:
-        """Spawn a subagent to execute the given task."""
-        return await self._manager.spawn(
-            task=task,
-            label=label,
-            origin_channel=self._origin_channel,
-            origin_chat_id=self._origin_chat_id,
-        )
+    async def execute(
+        self,
+        action: str = "spawn",
+        task: str | None = None,
+        label: str | None = None,
+        priority: int = 0,
+        token_budget: int | None = None,
+        time_budget_s: int | None = None,
+        task_id: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        """Spawn, inspect or cancel subagents."""
+        if action == "spawn":
+            if not task:
+                return "Error: task is required for spawn"
+            return await self._manager.spawn(
+                task=task,
+                label=label,
+                origin_channel=self._origin_channel,
+                origin_chat_id=self._origin_chat_id,
+                priority=priority,
+                token_budget=token_budget,
+                time_budget_s=time_budget_s,
+            )
+        if action == "status":
+            return self._status(task_id)
+        if action == "cancel":
+            if not task_id:
+                return "Error: task_id is required for cancel"
+            sub = self._manager.get_task(task_id)
+            if sub is None or sub.origin_key != self._origin_key:
+                return f"Subagent {task_id} not found"
+            return self._manager.cancel(task_id)
+        return f"Unknown action: {action}"
+
+    @property
+    def _origin_key(self) -> str:
+        return f"{self._origin_channel}:{self._origin_chat_id}"
+
+    def _status(self, task_id: str | None) -> str:
+        tasks = self._manager.list_tasks(self._origin_key)
+        if task_id:
+            tasks = [t for t in tasks if t.id == task_id]
+            if not tasks:
+                return f"Subagent {task_id} not found"
+        if not tasks:
+            return "No subagents."
+        lines = []
+        for t in tasks:
+            info = t.to_dict()
+            line = f"- {t.label} (id: {t.id}, {t.status}, iteration {t.iteration}, {t.tokens} tokens, {info['elapsedS']}s)"
+            if task_id and t.events:
+                line += "\n" + "\n".join(f"  {e['seq']}. [{e['type']}] {e['summary']}" for e in t.events)
+            lines.append(line)
+        return "Subagents:\n" + "\n".join(lines)
@@ -1,9 +1,11 @@
 """Web tools: web_search and web_fetch."""
 
+import asyncio
 import html
 import json
 import os
 import re
+import weakref
 from typing import Any
 from urllib.parse import urlparse
 
@@ -15,6 +17,30 @@ from chasingclaw.agent.tools.base import Tool
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
 MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
 
+# One pooled client per event loop, shared by every web tool instance
+# (main agent and subagents), so repeated calls reuse connections.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            max_redirects=MAX_REDIRECTS,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the running event loop's shared client; call before the loop ends."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 
 def _strip_tags(text: str) -> str:
     """Remove HTML tags and decode entities."""
@@ -46,6 +72,7 @@ def _validate_url(url: str) -> tuple[bool, str]:
 class WebSearchTool(Tool):
     """Search the web using Brave Search API."""
     
+    parallel_safe = True
     name = "web_search"
     description = "Search the web. Returns titles, URLs, and snippets."
     parameters = {
@@ -67,14 +94,13 @@ class WebSearchTool(Tool):
         
         try:
             n = min(max(count or self.max_results, 1), 10)
-            async with httpx.AsyncClient() as client:
-                r = await client.get(
-                    "https://api.search.brave.com/res/v1/web/search",
-                    params={"q": query, "count": n},
-                    headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
-                    timeout=10.0
-                )
-                r.raise_for_status()
+            r = await get_http_client().get(
+                "https://api.search.brave.com/res/v1/web/search",
+                params={"q": query, "count": n},
+                headers={"Accept": "application/json", "X-Subscription-Token": self.api_key},
+                timeout=10.0
+            )
+            r.raise_for_status()
             
             results = r.json().get("web", {}).get("results", [])
             if not results:
@@ -93,6 +119,7 @@ class WebSearchTool(Tool):
 class WebFetchTool(Tool):
     """Fetch and extract content from a URL using Readability."""
     
+    parallel_safe = True
     name = "web_fetch"
     description = "Fetch URL and extract readable content (HTML → markdown/text)."
     parameters = {
@@ -119,13 +146,10 @@ class WebFetchTool(Tool):
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
+            r = await get_http_client().get(
+                url, headers={"User-Agent": USER_AGENT}, follow_redirects=True, timeout=30.0
+            )
+            r.raise_for_status()
             
             ctype = r.headers.get("content-type", "")
             
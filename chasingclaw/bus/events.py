@@ -1,5 +1,6 @@
 """Event types for the message bus."""
 
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
@@ -33,5 +34,4 @@ class OutboundMessage:
     reply_to: str | None = None
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
-
-
+    idempotency_key: str = field(default_factory=lambda: uuid.uuid4().hex)  # Stable across outbox replays
@@ -0,0 +1,188 @@
+"""Disk-backed outbox for at-least-once outbound delivery."""
+
+import asyncio
+import json
+import os
+import threading
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from chasingclaw.bus.events import OutboundMessage
+from chasingclaw.utils.helpers import ensure_dir
+
+
+class Outbox:
+    """
+    Append-only log of outbound messages.
+
+    Every message is recorded ("enqueue") before it is dispatched and
+    acknowledged ("ack") once a channel has sent it. Messages without an ack
+    are replayed on the next start, keyed by their idempotency key so a
+    message is never pending twice. Acknowledged records are removed by
+    periodic compaction.
+    """
+
+    def __init__(
+        self,
+        outbox_dir: Path,
+        fsync: bool = False,
+        max_replays: int = 3,
+        compact_interval_s: float = 300.0,
+    ):
+        self.outbox_dir = ensure_dir(outbox_dir)
+        self.path = self.outbox_dir / "outbox.jsonl"
+        self.fsync = fsync
+        self.max_replays = max_replays
+        self.compact_interval_s = compact_interval_s
+        self._lock = threading.Lock()
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._garbage = 0
+        self._compact_task: asyncio.Task | None = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Log operations
+    # ------------------------------------------------------------------
+
+    def record(self, msg: OutboundMessage) -> None:
+        """Persist a message before it is dispatched."""
+        key = msg.idempotency_key
+        if key in self._pending:
+            return
+        entry = {
+            "op": "enqueue",
+            "key": key,
+            "timestamp": datetime.now().isoformat(),
+            "replays": 0,
+            "msg": asdict(msg),
+        }
+        self._pending[key] = entry
+        self._append(entry)
+
+    def ack(self, key: str) -> None:
+        """Mark a message as delivered (or intentionally discarded)."""
+        if self._pending.pop(key, None) is None:
+            return
+        self._append({"op": "ack", "key": key})
+        self._garbage += 2
+
+    def replay(self) -> list[OutboundMessage]:
+        """
+        Return the messages that were recorded but never acknowledged.
+
+        Each call counts as a replay attempt; messages that exceeded
+        max_replays are dropped instead of being returned again.
+        """
+        messages = []
+        for key, entry in list(self._pending.items()):
+            if self.max_replays > 0 and entry.get("replays", 0) >= self.max_replays:
+                logger.warning(f"Outbox: giving up on message {key} after {entry['replays']} replays")
+                self.ack(key)
+                continue
+            entry["replays"] = entry.get("replays", 0) + 1
+            self._append({"op": "replay", "key": key})
+            self._garbage += 1
+            try:
+                messages.append(OutboundMessage(**entry["msg"]))
+            except TypeError as e:
+                logger.warning(f"Outbox: dropping unreadable message {key}: {e}")
+                self.ack(key)
+        return messages
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self) -> int:
+        """
+        Rewrite the log with only the pending messages.
+
+        Returns:
+            Number of log lines removed.
+        """
+        with self._lock:
+            removed = self._garbage
+            if not removed:
+                return 0
+            entries = list(self._pending.values())
+            tmp_path = self.path.with_suffix(".jsonl.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(self._dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            tmp_path.replace(self.path)
+            self._garbage = 0
+        logger.debug(f"Outbox compacted: removed {removed} records")
+        return removed
+
+    def start(self) -> None:
+        """Start background compaction."""
+        if self._compact_task is None and self.compact_interval_s > 0:
+            self._compact_task = asyncio.create_task(self._compact_loop())
+
+    def stop(self) -> None:
+        """Stop background compaction."""
+        if self._compact_task:
+            self._compact_task.cancel()
+            self._compact_task = None
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval_s)
+            if self._garbage:
+                try:
+                    await asyncio.to_thread(self.compact)
+                except Exception as e:
+                    logger.error(f"Outbox compaction failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _dumps(entry: dict[str, Any]) -> str:
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        line = self._dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def _load(self) -> None:
+        """Rebuild the pending set from the log."""
+        if not self.path.exists():
+            return
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write from a crash
+                op, key = entry.get("op"), entry.get("key")
+                if op == "enqueue" and key:
+                    self._pending.setdefault(key, entry)
+                elif op == "ack":
+                    self._pending.pop(key, None)
+                elif op == "replay" and key in self._pending:
+                    self._pending[key]["replays"] = self._pending[key].get("replays", 0) + 1
+        self._garbage = lines - len(self._pending)
+        if self._pending:
+            logger.info(f"Outbox: {len(self._pending)} undelivered messages from previous run")
@@ -1,80 +1,402 @@
 """Async message queue for decoupled channel-agent communication."""
 
 import asyncio
-from typing import Callable, Awaitable
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Generic, TypeVar
 
 from loguru import logger
 
 from chasingclaw.bus.events import InboundMessage, OutboundMessage
+from chasingclaw.bus.outbox import Outbox
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import BusConfig
+
+T = TypeVar("T")
+
+# Priority lanes, highest priority first.
+LANES = ("interactive", "system", "background")
+
+# Overflow policies for bounded queues.
+OVERFLOW_POLICIES = ("block", "drop_oldest", "reject")
+
+
+class QueueFullError(Exception):
+    """Raised by a LaneQueue with the "reject" policy when it is full."""
+
+
+class QueueClosedError(Exception):
+    """Raised when putting to a closed LaneQueue, or getting from a closed and drained one."""
+
+
+@dataclass
+class _Entry(Generic[T]):
+    item: T
+    lane: str
+    key: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class LaneStats:
+    """Counters for one priority lane."""
+    enqueued: int = 0
+    dequeued: int = 0
+    dropped: int = 0
+    rejected: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+
+class LaneQueue(Generic[T]):
+    """
+    Bounded queue with priority lanes and fair scheduling inside each lane.
+
+    Items are taken from the highest-priority non-empty lane. Within a lane,
+    items are grouped by a fairness key (e.g. "channel:chat_id") and served
+    round-robin, so one noisy chat cannot starve the others.
+    """
+
+    def __init__(self, maxsize: int = 0, overflow: str = "block", lanes: tuple[str, ...] = LANES):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.lanes = lanes
+        self._lanes: dict[str, OrderedDict[str, deque[_Entry[T]]]] = {
+            lane: OrderedDict() for lane in lanes
+        }
+        self._depth: dict[str, int] = {lane: 0 for lane in lanes}
+        self._size = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+        self._wake_tasks: set[asyncio.Task] = set()
+        self.stats: dict[str, LaneStats] = {lane: LaneStats() for lane in lanes}
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """
+        Close the queue.
+
+        Further puts raise QueueClosedError. Consumers keep receiving the items that
+        are already queued and get QueueClosedError once the queue is drained.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wake blocked getters/putters from synchronous code."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop, so nobody can be waiting
+        task = loop.create_task(self._notify_all())
+        self._wake_tasks.add(task)
+        task.add_done_callback(self._wake_tasks.discard)
+
+    async def _notify_all(self) -> None:
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def put(self, item: T, lane: str = LANES[0], key: str = "") -> T | None:
+        """
+        Enqueue an item, applying the overflow policy when the queue is full.
+
+        Returns:
+            The item that was dropped to make room (drop_oldest), or None.
+
+        Raises:
+            QueueFullError: If the queue is full and the policy is "reject".
+            QueueClosedError: If the queue has been closed.
+        """
+        if lane not in self._lanes:
+            lane = self.lanes[-1]
+        async with self._cond:
+            if self._closed:
+                raise QueueClosedError
+            dropped: _Entry[T] | None = None
+            if self.full():
+                if self.overflow == "block":
+                    await self._cond.wait_for(lambda: self._closed or not self.full())
+                    if self._closed:
+                        raise QueueClosedError
+                elif self.overflow == "reject":
+                    self.stats[lane].rejected += 1
+                    raise QueueFullError(f"queue full ({self._size}/{self.maxsize})")
+                else:
+                    dropped = self._drop_oldest(lane)
+                    if dropped is None:
+                        # Incoming item has the lowest priority: drop it instead.
+                        self.stats[lane].dropped += 1
+                        return item
+            self._push(_Entry(item=item, lane=lane, key=key))
+            self._cond.notify_all()
+            return dropped.item if dropped else None
+
+    async def get(self) -> T:
+        """
+        Remove and return the next item (blocks until available).
+
+        Raises:
+            QueueClosedError: If the queue is closed and has no items left.
+        """
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._size > 0 or self._closed)
+            if self._size == 0:
+                raise QueueClosedError
+            entry = self._pop()
+            self._cond.notify_all()
+        return entry.item
+
+    def get_nowait(self) -> T:
+        """Remove and return the next item, raising asyncio.QueueEmpty if none."""
+        if self._size == 0:
+            raise asyncio.QueueEmpty
+        entry = self._pop()
+        self._wake()
+        return entry.item
+
+    def put_nowait(self, item: T, lane: str = LANES[0], key: str = "") -> bool:
+        """Enqueue without waiting. Returns False if the queue is full."""
+        if lane not in self._lanes:
+            lane = self.lanes[-1]
+        if self._closed:
+            return False
+        if self.full():
+            self.stats[lane].rejected += 1
+            return False
+        self._push(_Entry(item=item, lane=lane, key=key))
+        self._wake()
+        return True
+
+    def depth(self) -> dict[str, int]:
+        """Number of pending items per lane."""
+        return dict(self._depth)
+
+    def _push(self, entry: _Entry[T]) -> None:
+        self._lanes[entry.lane].setdefault(entry.key, deque()).append(entry)
+        self._depth[entry.lane] += 1
+        self._size += 1
+        self.stats[entry.lane].enqueued += 1
+
+    def _pop(self) -> _Entry[T]:
+        for lane in self.lanes:
+            groups = self._lanes[lane]
+            if not groups:
+                continue
+            key = next(iter(groups))
+            items = groups[key]
+            entry = items.popleft()
+            if items:
+                groups.move_to_end(key)
+            else:
+                del groups[key]
+            self._depth[lane] -= 1
+            self._size -= 1
+
+            wait = time.monotonic() - entry.enqueued_at
+            stats = self.stats[lane]
+            stats.dequeued += 1
+            stats.wait_total_s += wait
+            stats.wait_max_s = max(stats.wait_max_s, wait)
+            return entry
+        raise asyncio.QueueEmpty
+
+    def _drop_oldest(self, incoming_lane: str) -> _Entry[T] | None:
+        """Drop the oldest item of the lowest-priority lane not below incoming_lane."""
+        incoming_rank = self.lanes.index(incoming_lane)
+        for rank in range(len(self.lanes) - 1, -1, -1):
+            lane = self.lanes[rank]
+            groups = self._lanes[lane]
+            if not groups:
+                continue
+            if rank < incoming_rank:
+                return None
+            key = min(groups, key=lambda k: groups[k][0].enqueued_at)
+            entry = groups[key].popleft()
+            if not groups[key]:
+                del groups[key]
+            self._depth[lane] -= 1
+            self._size -= 1
+            self.stats[lane].dropped += 1
+            return entry
+        return None
 
 
 class MessageBus:
     """
     Async message bus that decouples chat channels from the agent core.
-    
+
     Channels push messages to the inbound queue, and the agent processes
-    them and pushes responses to the outbound queue.
+    them and pushes responses to the outbound queue. Both queues are bounded
+    and split into priority lanes (interactive > system > background), with
+    round-robin scheduling across chats inside each lane.
+
+    When an Outbox is attached, outbound messages are persisted before they
+    are queued and acknowledged once delivered.
     """
-    
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+
+    def __init__(self, config: "BusConfig | None" = None, outbox: Outbox | None = None):
+        from chasingclaw.config.schema import BusConfig
+        self.config = config or BusConfig()
+        self.outbox = outbox
+        self.inbound: LaneQueue[InboundMessage] = LaneQueue(
+            maxsize=self.config.inbound_maxsize,
+            overflow=self.config.overflow_policy,
+        )
+        self.outbound: LaneQueue[OutboundMessage] = LaneQueue(
+            maxsize=self.config.outbound_maxsize,
+            overflow=self.config.overflow_policy,
+        )
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
-        self._running = False
-    
+
+    @staticmethod
+    def _lane_for(channel: str, metadata: dict[str, Any]) -> str:
+        """Pick the priority lane for a message from its source."""
+        lane = metadata.get("priority")
+        if lane in LANES:
+            return lane
+        if channel == "system":
+            return "system"
+        if channel in ("cron", "heartbeat"):
+            return "background"
+        return "interactive"
+
     async def publish_inbound(self, msg: InboundMessage) -> None:
         """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
-    
+        lane = self._lane_for(msg.channel, msg.metadata)
+        try:
+            dropped = await self.inbound.put(msg, lane=lane, key=msg.session_key)
+        except QueueClosedError:
+            logger.debug(f"Bus closed, ignoring inbound message from {msg.session_key}")
+            return
+        except QueueFullError:
+            logger.warning(f"Inbound queue full, rejected message from {msg.session_key}")
+            if msg.channel != "system" and self.config.reject_notice:
+                notice = OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=self.config.reject_notice,
+                )
+                if not self.outbound.put_nowait(notice, lane="interactive", key=msg.channel):
+                    logger.warning(f"Outbound queue full, busy notice to {msg.session_key} dropped")
+            return
+        if dropped is not None:
+            logger.warning(f"Inbound queue full, dropped message from {dropped.session_key}")
+
     async def consume_inbound(self) -> InboundMessage:
-        """Consume the next inbound message (blocks until available)."""
+        """Consume the next inbound message (raises QueueClosedError after close)."""
         return await self.inbound.get()
-    
+
     async def publish_outbound(self, msg: OutboundMessage) -> None:
         """Publish a response from the agent to channels."""
-        await self.outbound.put(msg)
-    
+        lane = self._lane_for(msg.channel, msg.metadata)
+        if self.outbox:
+            self.outbox.record(msg)
+        try:
+            dropped = await self.outbound.put(msg, lane=lane, key=msg.channel)
+        except QueueClosedError:
+            # Stays in the outbox (if any) and is replayed on the next start
+            logger.warning(f"Bus closed, dropping outbound message to {msg.channel}:{msg.chat_id}")
+            return
+        except QueueFullError:
+            # Never sent, so it stays in the outbox too
+            logger.warning(f"Outbound queue full, rejected message to {msg.channel}:{msg.chat_id}")
+            return
+        if dropped is not None:
+            logger.warning(f"Outbound queue full, dropped message to {dropped.channel}:{dropped.chat_id}")
+
+    def ack_outbound(self, msg: OutboundMessage) -> None:
+        """Mark an outbound message as done so it is not replayed from the outbox."""
+        if self.outbox:
+            self.outbox.ack(msg.idempotency_key)
+
     async def consume_outbound(self) -> OutboundMessage:
-        """Consume the next outbound message (blocks until available)."""
+        """Consume the next outbound message (raises QueueClosedError after close)."""
         return await self.outbound.get()
-    
+
     def subscribe_outbound(
-        self, 
-        channel: str, 
+        self,
+        channel: str,
         callback: Callable[[OutboundMessage], Awaitable[None]]
     ) -> None:
         """Subscribe to outbound messages for a specific channel."""
         if channel not in self._outbound_subscribers:
             self._outbound_subscribers[channel] = []
         self._outbound_subscribers[channel].append(callback)
-    
+
     async def dispatch_outbound(self) -> None:
         """
         Dispatch outbound messages to subscribed channels.
-        Run this as a background task.
+        Run this as a background task; it returns once stop() has been
+        called and every queued message has been delivered.
         """
-        self._running = True
-        while self._running:
+        while True:
             try:
-                msg = await asyncio.wait_for(self.outbound.get(), timeout=1.0)
-                subscribers = self._outbound_subscribers.get(msg.channel, [])
-                for callback in subscribers:
-                    try:
-                        await callback(msg)
-                    except Exception as e:
-                        logger.error(f"Error dispatching to {msg.channel}: {e}")
-            except asyncio.TimeoutError:
-                continue
-    
+                msg = await self.outbound.get()
+            except QueueClosedError:
+                break
+            subscribers = self._outbound_subscribers.get(msg.channel, [])
+            delivered = bool(subscribers)
+            for callback in subscribers:
+                try:
+                    await callback(msg)
+                except Exception as e:
+                    delivered = False
+                    logger.error(f"Error dispatching to {msg.channel}: {e}")
+            if delivered:
+                self.ack_outbound(msg)
+
     def stop(self) -> None:
-        """Stop the dispatcher loop."""
-        self._running = False
-    
+        """Stop the dispatcher loop after the pending outbound messages are sent."""
+        self.outbound.close()
+
+    def close_inbound(self) -> None:
+        """Stop accepting inbound messages; the agent loop exits once it sees the close."""
+        self.inbound.close()
+
+    def metrics(self) -> dict[str, Any]:
+        """Queue depth, drop/reject counters and wait times per lane."""
+        def _queue_metrics(queue: LaneQueue) -> dict[str, Any]:
+            lanes = {}
+            for lane, stats in queue.stats.items():
+                lanes[lane] = {
+                    "depth": queue.depth()[lane],
+                    "enqueued": stats.enqueued,
+                    "dequeued": stats.dequeued,
+                    "dropped": stats.dropped,
+                    "rejected": stats.rejected,
+                    "wait_avg_ms": round(stats.wait_total_s / stats.dequeued * 1000, 1) if stats.dequeued else 0.0,
+                    "wait_max_ms": round(stats.wait_max_s * 1000, 1),
+                }
+            return {"size": queue.qsize(), "maxsize": queue.maxsize, "lanes": lanes}
+
+        return {
+            "inbound": _queue_metrics(self.inbound),
+            "outbound": _queue_metrics(self.outbound),
+        }
+
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
         return self.inbound.qsize()
-    
+
     @property
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
@@ -1,6 +1,6 @@
 """Chat channels module with plugin architecture."""
 
-from chasingclaw.channels.base import BaseChannel
+from chasingclaw.channels.base import BaseChannel, PermanentSendError
 from chasingclaw.channels.manager import ChannelManager
 
-__all__ = ["BaseChannel", "ChannelManager"]
+__all__ = ["BaseChannel", "ChannelManager", "PermanentSendError"]
@@ -9,6 +9,10 @@ from chasingclaw.bus.events import InboundMessage, OutboundMessage
 from chasingclaw.bus.queue import MessageBus
 
 
+class PermanentSendError(Exception):
+    """Raised by send() for a message that can never be delivered (e.g. an invalid chat id)."""
+
+
 class BaseChannel(ABC):
     """
     Abstract base class for chat channel implementations.
@@ -55,6 +59,12 @@ class BaseChannel(ABC):
         
         Args:
             msg: The message to send.
+
+        Raises:
+            PermanentSendError: If the message can never be delivered; the
+                dispatcher drops it without retrying.
+            Exception: If the message was not delivered, so the dispatcher
+                can retry it and keep it in the outbox.
         """
         pass
     
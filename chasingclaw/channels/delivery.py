@@ -0,0 +1,263 @@
+"""Concurrent outbound delivery with per-channel (or per-chat) workers."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from chasingclaw.bus.events import OutboundMessage
+from chasingclaw.bus.outbox import Outbox
+from chasingclaw.channels.base import BaseChannel, PermanentSendError
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import DeliveryConfig, RetryPolicyConfig
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with jitter for failed sends."""
+    max_attempts: int = 3
+    base_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+
+    @classmethod
+    def from_config(cls, config: "RetryPolicyConfig") -> "RetryPolicy":
+        return cls(
+            max_attempts=max(1, config.max_attempts),
+            base_delay_s=config.base_delay_s,
+            max_delay_s=config.max_delay_s,
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retrying after the given (1-based) failed attempt."""
+        delay = min(self.max_delay_s, self.base_delay_s * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of send latencies."""
+
+    BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        """Approximate percentile (bucket upper bound), in milliseconds."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return float(self.BUCKETS_MS[i]) if i < len(self.BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> dict[str, Any]:
+        labels = [f"<={b}ms" for b in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+@dataclass
+class ChannelDeliveryStats:
+    """Delivery counters and latency for one channel."""
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    latency: LatencyHistogram | None = None
+
+    def __post_init__(self):
+        if self.latency is None:
+            self.latency = LatencyHistogram()
+
+
+class DeliveryWorker:
+    """Sends the messages of one channel (or one chat) strictly in order."""
+
+    def __init__(self, dispatcher: "DeliveryDispatcher", key: str, channel: BaseChannel):
+        self.dispatcher = dispatcher
+        self.key = key
+        self.channel = channel
+        self.queue: asyncio.Queue[OutboundMessage | None] = asyncio.Queue(dispatcher.worker_queue_size)
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        idle_timeout = self.dispatcher.idle_timeout_s if self.dispatcher.per_chat else None
+        while True:
+            try:
+                msg = await asyncio.wait_for(self.queue.get(), timeout=idle_timeout)
+            except asyncio.TimeoutError:
+                # Idle per-chat worker: retire unless something arrived meanwhile.
+                if self.queue.empty():
+                    self.dispatcher._retire(self)
+                    return
+                continue
+            if msg is None:
+                return
+            await self.dispatcher._send(self.channel, msg)
+
+
+class DeliveryDispatcher:
+    """
+    Fans outbound messages out to delivery workers.
+
+    Each channel gets its own worker and queue, so a slow or rate-limited
+    channel never delays the others. With per_chat enabled, each chat gets
+    its own worker instead (bounded per channel by chat_concurrency), which
+    keeps ordering within a chat while chats proceed independently.
+
+    Successful sends, and messages that can never be delivered (unknown
+    channel, PermanentSendError), are acknowledged in the outbox, if one
+    is given.
+    """
+
+    def __init__(
+        self,
+        channels: dict[str, BaseChannel],
+        config: "DeliveryConfig | None" = None,
+        outbox: Outbox | None = None,
+    ):
+        from chasingclaw.config.schema import DeliveryConfig
+        config = config or DeliveryConfig()
+        self.channels = channels
+        self.outbox = outbox
+        self.per_chat = config.per_chat
+        self.idle_timeout_s = config.idle_timeout_s
+        self.worker_queue_size = max(0, config.worker_queue_size)
+        self._default_retry = RetryPolicy.from_config(config.retry)
+        self._retry = {name: RetryPolicy.from_config(c) for name, c in config.channel_retry.items()}
+        self._chat_limits = {
+            name: asyncio.Semaphore(max(1, config.chat_concurrency)) for name in channels
+        } if config.per_chat else {}
+        self._workers: dict[str, DeliveryWorker] = {}
+        self.stats: dict[str, ChannelDeliveryStats] = {name: ChannelDeliveryStats() for name in channels}
+
+    def retry_policy(self, channel: str) -> RetryPolicy:
+        return self._retry.get(channel, self._default_retry)
+
+    async def submit(self, msg: OutboundMessage) -> bool:
+        """
+        Queue a message on its worker without waiting for delivery.
+
+        Only waits when that worker's queue is full, which pushes back on
+        the bus instead of buffering without bound.
+
+        Returns:
+            False if the message targets an unknown channel; it is dropped
+            from the outbox, since a replay could not deliver it either.
+        """
+        channel = self.channels.get(msg.channel)
+        if channel is None:
+            logger.warning(f"Unknown channel: {msg.channel}")
+            if self.outbox:
+                self.outbox.ack(msg.idempotency_key)
+            return False
+        key = f"{msg.channel}:{msg.chat_id}" if self.per_chat else msg.channel
+        worker = self._workers.get(key)
+        if worker is None:
+            worker = self._workers[key] = DeliveryWorker(self, key, channel)
+        await worker.queue.put(msg)
+        return True
+
+    async def close(self, timeout: float | None = None) -> None:
+        """Let every worker finish its queue, then stop it (cancel after timeout)."""
+        workers = list(self._workers.values())
+        if not workers:
+            return
+
+        async def _finish(worker: DeliveryWorker) -> None:
+            await worker.queue.put(None)
+            await worker.task
+
+        _, pending = await asyncio.wait([asyncio.create_task(_finish(w)) for w in workers], timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"{len(pending)} delivery workers cancelled before finishing")
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._workers.clear()
+
+    @property
+    def pending(self) -> int:
+        """Messages queued on workers but not yet sent."""
+        return sum(w.queue.qsize() for w in self._workers.values())
+
+    def metrics(self) -> dict[str, Any]:
+        """Per-channel send counters and latency histograms."""
+        return {
+            name: {
+                "sent": stats.sent,
+                "failed": stats.failed,
+                "retries": stats.retries,
+                "latency": stats.latency.snapshot(),
+            }
+            for name, stats in self.stats.items()
+        }
+
+    def _retire(self, worker: DeliveryWorker) -> None:
+        if self._workers.get(worker.key) is worker:
+            del self._workers[worker.key]
+
+    async def _send(self, channel: BaseChannel, msg: OutboundMessage) -> None:
+        limit = self._chat_limits.get(msg.channel)
+        if limit is None:
+            await self._send_with_retry(channel, msg)
+            return
+        async with limit:
+            await self._send_with_retry(channel, msg)
+
+    async def _send_with_retry(self, channel: BaseChannel, msg: OutboundMessage) -> None:
+        policy = self.retry_policy(msg.channel)
+        stats = self.stats.setdefault(msg.channel, ChannelDeliveryStats())
+        for attempt in range(1, policy.max_attempts + 1):
+            start = time.monotonic()
+            try:
+                if not channel.is_running:
+                    raise RuntimeError("channel not running")
+                await channel.send(msg)
+            except PermanentSendError as e:
+                stats.failed += 1
+                logger.error(f"Dropping message to {msg.channel}: {e}")
+                if self.outbox:
+                    self.outbox.ack(msg.idempotency_key)
+                return
+            except Exception as e:
+                if attempt >= policy.max_attempts:
+                    # Not acked: the outbox replays it on the next start
+                    stats.failed += 1
+                    logger.error(f"Error sending to {msg.channel} after {attempt} attempts: {e}")
+                    return
+                stats.retries += 1
+                delay = policy.delay(attempt)
+                logger.warning(f"Send to {msg.channel} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            stats.latency.record(time.monotonic() - start)
+            stats.sent += 1
+            if self.outbox:
+                self.outbox.ack(msg.idempotency_key)
+            return
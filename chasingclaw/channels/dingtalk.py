@@ -186,7 +186,7 @@ class DingTalkChannel(BaseChannel):
         """Send a message through DingTalk."""
         token = await self._get_access_token()
         if not token:
-            return
+            raise RuntimeError("DingTalk access token unavailable")
 
         # oToMessages/batchSend: sends to individual users (private chat)
         # https://open.dingtalk.com/document/orgapp/robot-batch-send-messages
@@ -205,17 +205,16 @@ class DingTalkChannel(BaseChannel):
         }
 
         if not self._http:
-            logger.warning("DingTalk HTTP client not initialized, cannot send")
-            return
+            raise RuntimeError("DingTalk HTTP client not initialized, cannot send")
 
         try:
             resp = await self._http.post(url, json=data, headers=headers)
             if resp.status_code != 200:
-                logger.error(f"DingTalk send failed: {resp.text}")
-            else:
-                logger.debug(f"DingTalk message sent to {msg.chat_id}")
+                raise RuntimeError(f"DingTalk send failed: {resp.text}")
+            logger.debug(f"DingTalk message sent to {msg.chat_id}")
         except Exception as e:
             logger.error(f"Error sending DingTalk message: {e}")
+            raise
 
     async def _on_message(self, content: str, sender_id: str, sender_name: str) -> None:
         """Handle incoming message (called by ChasingclawDingTalkHandler).
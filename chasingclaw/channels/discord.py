@@ -75,8 +75,7 @@ class DiscordChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Discord REST API."""
         if not self._http:
-            logger.warning("Discord HTTP client not initialized")
-            return
+            raise RuntimeError("Discord HTTP client not initialized")
 
         url = f"{DISCORD_API_BASE}/channels/{msg.chat_id}/messages"
         payload: dict[str, Any] = {"content": msg.content}
@@ -102,8 +101,9 @@ class DiscordChannel(BaseChannel):
                 except Exception as e:
                     if attempt == 2:
                         logger.error(f"Error sending Discord message: {e}")
-                    else:
-                        await asyncio.sleep(1)
+                        raise
+                    await asyncio.sleep(1)
+            raise RuntimeError("Discord rate limit persisted after 3 attempts")
         finally:
             await self._stop_typing(msg.chat_id)
 
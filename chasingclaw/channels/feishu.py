@@ -198,8 +198,7 @@ class FeishuChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Feishu."""
         if not self._client:
-            logger.warning("Feishu client not initialized")
-            return
+            raise RuntimeError("Feishu client not initialized")
         
         try:
             # Determine receive_id_type based on chat_id format
@@ -230,15 +229,14 @@ class FeishuChannel(BaseChannel):
             response = self._client.im.v1.message.create(request)
             
             if not response.success():
-                logger.error(
+                raise RuntimeError(
                     f"Failed to send Feishu message: code={response.code}, "
                     f"msg={response.msg}, log_id={response.get_log_id()}"
                 )
-            else:
-                logger.debug(f"Feishu message sent to {msg.chat_id}")
-                
+            logger.debug(f"Feishu message sent to {msg.chat_id}")
         except Exception as e:
             logger.error(f"Error sending Feishu message: {e}")
+            raise
     
     def _on_message_sync(self, data: "P2ImMessageReceiveV1") -> None:
         """
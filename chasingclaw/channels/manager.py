@@ -8,11 +8,13 @@ from typing import Any, TYPE_CHECKING
 from loguru import logger
 
 from chasingclaw.bus.events import OutboundMessage
-from chasingclaw.bus.queue import MessageBus
+from chasingclaw.bus.queue import MessageBus, QueueClosedError
 from chasingclaw.channels.base import BaseChannel
+from chasingclaw.channels.delivery import DeliveryDispatcher
 from chasingclaw.config.schema import Config
 
 if TYPE_CHECKING:
+    from chasingclaw.providers.transcription import TranscriptionService
     from chasingclaw.session.manager import SessionManager
 
 
@@ -32,8 +34,11 @@ class ChannelManager:
         self.session_manager = session_manager
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
+        self.transcriber: TranscriptionService | None = None
         
         self._init_channels()
+        self.delivery = DeliveryDispatcher(self.channels, config.channels.delivery, outbox=bus.outbox)
+        self._replay_task: asyncio.Task | None = None
     
     def _init_channels(self) -> None:
         """Initialize channels based on config."""
@@ -42,10 +47,14 @@ class ChannelManager:
         if self.config.channels.telegram.enabled:
             try:
                 from chasingclaw.channels.telegram import TelegramChannel
+                from chasingclaw.providers.transcription import TranscriptionService
+                self.transcriber = TranscriptionService.from_config(
+                    self.config.transcription, groq_api_key=self.config.providers.groq.api_key
+                )
                 self.channels["telegram"] = TelegramChannel(
                     self.config.channels.telegram,
                     self.bus,
-                    groq_api_key=self.config.providers.groq.api_key,
+                    transcriber=self.transcriber,
                     session_manager=self.session_manager,
                 )
                 logger.info("Telegram channel enabled")
@@ -157,6 +166,9 @@ class ChannelManager:
         
         # Start outbound dispatcher
         self._dispatch_task = asyncio.create_task(self._dispatch_outbound())
+        if self.bus.outbox:
+            self.bus.outbox.start()
+            self._replay_task = asyncio.create_task(self._replay_outbox())
         
         # Start channels
         tasks = []
@@ -167,17 +179,43 @@ class ChannelManager:
         # Wait for all to complete (they should run forever)
         await asyncio.gather(*tasks, return_exceptions=True)
     
-    async def stop_all(self) -> None:
-        """Stop all channels and the dispatcher."""
+    async def stop_all(self, drain: bool = True, drain_timeout: float = 10.0) -> None:
+        """
+        Stop all channels and the dispatcher.
+
+        Args:
+            drain: Deliver the messages still in the outbound queue before the
+                channels are stopped.
+            drain_timeout: Maximum seconds to wait for the drain.
+        """
         logger.info("Stopping all channels...")
         
-        # Stop dispatcher
+        # Stop dispatcher: closing the queue lets it hand off the pending messages
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + drain_timeout
+        self.bus.outbound.close()
         if self._dispatch_task:
+            if drain:
+                pending = self.bus.outbound_size + self.delivery.pending
+                if pending:
+                    logger.info(f"Flushing {pending} outbound messages...")
+                try:
+                    await asyncio.wait_for(asyncio.shield(self._dispatch_task), timeout=drain_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Outbound drain timed out, {self.bus.outbound_size} messages not sent")
             self._dispatch_task.cancel()
             try:
                 await self._dispatch_task
             except asyncio.CancelledError:
                 pass
+
+        # Wait for the delivery workers to send what they were handed
+        if self._replay_task:
+            self._replay_task.cancel()
+        await self.delivery.close(timeout=max(0.0, deadline - loop.time()) if drain else 0)
+        if self.bus.outbox:
+            self.bus.outbox.stop()
+            self.bus.outbox.compact()
         
         # Stop all channels
         for name, channel in self.channels.items():
@@ -186,6 +224,8 @@ class ChannelManager:
                 logger.info(f"Stopped {name} channel")
             except Exception as e:
                 logger.error(f"Error stopping {name}: {e}")
+        if self.transcriber:
+            await self.transcriber.close()
     
     async def _dispatch_outbound(self) -> None:
         """Dispatch outbound messages to the appropriate channel."""
@@ -193,24 +233,31 @@ class ChannelManager:
         
         while True:
             try:
-                msg = await asyncio.wait_for(
-                    self.bus.consume_outbound(),
-                    timeout=1.0
-                )
-                
-                channel = self.channels.get(msg.channel)
-                if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
-                else:
-                    logger.warning(f"Unknown channel: {msg.channel}")
-                    
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
+                msg = await self.bus.consume_outbound()
+            except QueueClosedError:
                 break
+
+            # Hand off to the channel's delivery worker so slow sends don't block other channels
+            await self.delivery.submit(msg)
+
+        logger.info("Outbound dispatcher stopped")
+
+    async def _replay_outbox(self, connect_timeout: float = 30.0) -> None:
+        """Re-send messages left undelivered by a previous run."""
+        messages = self.bus.outbox.replay()
+        if not messages:
+            return
+        logger.info(f"Replaying {len(messages)} undelivered outbound messages")
+
+        # Give channels a chance to connect before sending
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + connect_timeout
+        wanted = {m.channel for m in messages if m.channel in self.channels}
+        while loop.time() < deadline and not all(self.channels[c].is_running for c in wanted):
+            await asyncio.sleep(0.5)
+
+        for msg in messages:
+            await self.delivery.submit(msg)
     
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
@@ -218,10 +265,12 @@ class ChannelManager:
     
     def get_status(self) -> dict[str, Any]:
         """Get status of all channels."""
+        delivery = self.delivery.metrics()
         return {
             name: {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
+                "delivery": delivery.get(name, {}),
             }
             for name, channel in self.channels.items()
         }
@@ -323,6 +323,7 @@ class MochatChannel(BaseChannel):
                                      content, msg.reply_to)
         except Exception as e:
             logger.error(f"Failed to send Mochat message: {e}")
+            raise
 
     # ---- config / init helpers ---------------------------------------------
 
@@ -96,8 +96,7 @@ class QQChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through QQ."""
         if not self._client:
-            logger.warning("QQ client not initialized")
-            return
+            raise RuntimeError("QQ client not initialized")
         try:
             await self._client.api.post_c2c_message(
                 openid=msg.chat_id,
@@ -106,6 +105,7 @@ class QQChannel(BaseChannel):
             )
         except Exception as e:
             logger.error(f"Error sending QQ message: {e}")
+            raise
 
     async def _on_message(self, data: "C2CMessage") -> None:
         """Handle incoming message from QQ."""
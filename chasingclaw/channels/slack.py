@@ -74,8 +74,7 @@ class SlackChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Slack."""
         if not self._web_client:
-            logger.warning("Slack client not running")
-            return
+            raise RuntimeError("Slack client not running")
         try:
             slack_meta = msg.metadata.get("slack", {}) if msg.metadata else {}
             thread_ts = slack_meta.get("thread_ts")
@@ -89,6 +88,7 @@ class SlackChannel(BaseChannel):
             )
         except Exception as e:
             logger.error(f"Error sending Slack message: {e}")
+            raise
 
     async def _on_socket_request(
         self,
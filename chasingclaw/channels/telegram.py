@@ -12,10 +12,11 @@ from telegram.ext import Application, CommandHandler, MessageHandler, filters, C
 
 from chasingclaw.bus.events import OutboundMessage
 from chasingclaw.bus.queue import MessageBus
-from chasingclaw.channels.base import BaseChannel
+from chasingclaw.channels.base import BaseChannel, PermanentSendError
 from chasingclaw.config.schema import TelegramConfig
 
 if TYPE_CHECKING:
+    from chasingclaw.providers.transcription import TranscriptionService
     from chasingclaw.session.manager import SessionManager
 
 
@@ -104,10 +105,15 @@ class TelegramChannel(BaseChannel):
         bus: MessageBus,
         groq_api_key: str = "",
         session_manager: SessionManager | None = None,
+        transcriber: TranscriptionService | None = None,
     ):
         super().__init__(config, bus)
         self.config: TelegramConfig = config
         self.groq_api_key = groq_api_key
+        if transcriber is None and groq_api_key:
+            from chasingclaw.providers.transcription import TranscriptionService
+            transcriber = TranscriptionService.from_config(None, groq_api_key=groq_api_key)
+        self.transcriber = transcriber
         self.session_manager = session_manager
         self._app: Application | None = None
         self._chat_ids: dict[str, int] = {}  # Map sender_id to chat_id for replies
@@ -185,8 +191,7 @@ class TelegramChannel(BaseChannel):
     async def send(self, msg: OutboundMessage) -> None:
         """Send a message through Telegram."""
         if not self._app:
-            logger.warning("Telegram bot not running")
-            return
+            raise RuntimeError("Telegram bot not running")
         
         # Stop typing indicator for this chat
         self._stop_typing(msg.chat_id)
@@ -194,6 +199,11 @@ class TelegramChannel(BaseChannel):
         try:
             # chat_id should be the Telegram chat ID (integer)
             chat_id = int(msg.chat_id)
+        except ValueError as e:
+            logger.error(f"Invalid chat_id: {msg.chat_id}")
+            raise PermanentSendError(f"invalid Telegram chat_id: {msg.chat_id}") from e
+
+        try:
             # Convert markdown to Telegram HTML
             html_content = _markdown_to_telegram_html(msg.content)
             await self._app.bot.send_message(
@@ -201,18 +211,17 @@ class TelegramChannel(BaseChannel):
                 text=html_content,
                 parse_mode="HTML"
             )
-        except ValueError:
-            logger.error(f"Invalid chat_id: {msg.chat_id}")
         except Exception as e:
             # Fallback to plain text if HTML parsing fails
             logger.warning(f"HTML parse failed, falling back to plain text: {e}")
             try:
                 await self._app.bot.send_message(
-                    chat_id=int(msg.chat_id),
+                    chat_id=chat_id,
                     text=msg.content
                 )
             except Exception as e2:
                 logger.error(f"Error sending Telegram message: {e2}")
+                raise
     
     async def _on_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -322,10 +331,8 @@ class TelegramChannel(BaseChannel):
                 media_paths.append(str(file_path))
                 
                 # Handle voice transcription
-                if media_type == "voice" or media_type == "audio":
-                    from chasingclaw.providers.transcription import GroqTranscriptionProvider
-                    transcriber = GroqTranscriptionProvider(api_key=self.groq_api_key)
-                    transcription = await transcriber.transcribe(file_path)
+                if (media_type == "voice" or media_type == "audio") and self.transcriber:
+                    transcription = await self.transcriber.transcribe(file_path)
                     if transcription:
                         logger.info(f"Transcribed {media_type}: {transcription[:50]}...")
                         content_parts.append(f"[transcription: {transcription}]")
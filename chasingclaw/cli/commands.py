@@ -9,7 +9,6 @@ import sys
 
 import typer
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.table import Table
 from rich.text import Text
 
@@ -99,7 +98,11 @@ def _init_prompt_session() -> None:
 def _print_agent_response(response: str, render_markdown: bool) -> None:
     """Render assistant response with consistent terminal styling."""
     content = response or ""
-    body = Markdown(content) if render_markdown else Text(content)
+    if render_markdown:
+        from rich.markdown import Markdown
+        body = Markdown(content)
+    else:
+        body = Text(content)
     console.print()
     console.print(f"[cyan]{__logo__} chasingclaw[/cyan]")
     console.print(body)
@@ -111,6 +114,56 @@ def _is_exit_command(command: str) -> bool:
     return command.lower() in EXIT_COMMANDS
 
 
+def _handle_subagent_command(subagents, command: str) -> bool:
+    """
+    Handle /subagents [id] and /cancel <id> in interactive chat.
+
+    Returns:
+        True when the input was one of these commands.
+    """
+    from datetime import datetime
+
+    parts = command.split()
+    name = parts[0].lower()
+    if name == "/cancel":
+        if len(parts) < 2:
+            console.print("Usage: /cancel <subagent id>")
+        else:
+            console.print(subagents.cancel(parts[1]))
+        return True
+    if name != "/subagents":
+        return False
+
+    if len(parts) > 1:
+        task = subagents.get_task(parts[1])
+        if task is None:
+            console.print(f"Subagent {parts[1]} not found")
+            return True
+        console.print(f"[bold]{task.label}[/bold] ({task.id}) {task.status}")
+        for event in task.events:
+            ts = datetime.fromtimestamp(event["ts"]).strftime("%H:%M:%S")
+            console.print(f"  {ts} [{event['type']}] {event['summary']}", markup=False)
+        if task.result:
+            console.print(task.result, markup=False)
+        return True
+
+    tasks = subagents.list_tasks()
+    if not tasks:
+        console.print("No subagents.")
+        return True
+    table = Table(title="Subagents")
+    for column in ("ID", "Label", "Status", "Priority", "Iter", "Tokens", "Elapsed"):
+        table.add_column(column)
+    for task in tasks:
+        info = task.to_dict()
+        table.add_row(
+            task.id, task.label, task.status, str(task.priority),
+            str(task.iteration), str(task.tokens), f"{info['elapsedS']}s",
+        )
+    console.print(table)
+    return True
+
+
 async def _read_interactive_input_async() -> str:
     """Read user input using prompt_toolkit (handles paste, history, display).
 
@@ -264,22 +317,58 @@ This file stores important information that should persist across sessions.
     skills_dir.mkdir(exist_ok=True)
 
 
+async def _wait_for_stop(stop_event: asyncio.Event, tasks: dict[str, asyncio.Task]) -> BaseException | None:
+    """
+    Wait until stop_event is set or a gateway task dies.
+
+    Args:
+        stop_event: Set by the signal handlers.
+        tasks: Long-running tasks by name. "agent" must never finish on its
+            own; the others may return once started.
+
+    Returns:
+        The exception that killed a task, if any.
+    """
+    stop_task = asyncio.create_task(stop_event.wait())
+    pending = {stop_task, *tasks.values()}
+    names = {task: name for name, task in tasks.items()}
+    try:
+        while stop_task in pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done - {stop_task}:
+                if task.cancelled():
+                    continue
+                error = task.exception()
+                if error is not None:
+                    console.print(f"[red]Gateway {names[task]} failed: {error!r}[/red]")
+                    return error
+                if names[task] == "agent":
+                    console.print("[red]Agent loop exited unexpectedly[/red]")
+                    return RuntimeError("agent loop exited unexpectedly")
+        return None
+    finally:
+        stop_task.cancel()
+
+
 def _make_provider(config):
-    """Create LiteLLMProvider from config. Exits if no API key found."""
-    from chasingclaw.providers.litellm_provider import LiteLLMProvider
+    """Create the LLM provider from config. Exits if no API key found."""
+    from chasingclaw.providers.factory import create_provider, wrap_with_cache, wrap_with_fallbacks
     p = config.get_provider()
     model = config.agents.defaults.model
     if not (p and p.api_key) and not model.startswith("bedrock/"):
         console.print("[red]Error: No API key configured.[/red]")
         console.print("Set one in ~/.chasingclaw/config.json under providers section")
         raise typer.Exit(1)
-    return LiteLLMProvider(
+    primary = create_provider(
         api_key=p.api_key if p else None,
         api_base=config.get_api_base(),
         default_model=model,
         extra_headers=p.extra_headers if p else None,
         provider_name=config.get_provider_name(),
+        backend=p.backend if p else "litellm",
+        rate_limit=p.rate_limit if p else None,
     )
+    return wrap_with_cache(wrap_with_fallbacks(primary, config), config)
 
 
 # ============================================================================
@@ -296,6 +385,8 @@ def gateway(
     from chasingclaw.config.loader import load_config, get_data_dir
     from chasingclaw.bus.queue import MessageBus
     from chasingclaw.agent.loop import AgentLoop
+    from chasingclaw.agent.generation import GenerationSettings
+    from chasingclaw.session.usage import UsageLedger
     from chasingclaw.channels.manager import ChannelManager
     from chasingclaw.session.manager import SessionManager
     from chasingclaw.cron.service import CronService
@@ -309,13 +400,26 @@ def gateway(
     console.print(f"{__logo__} Starting chasingclaw gateway on port {port}...")
     
     config = load_config()
-    bus = MessageBus()
+    outbox = None
+    if config.bus.outbox.enabled:
+        from chasingclaw.bus.outbox import Outbox
+        outbox = Outbox(
+            get_data_dir() / "outbox",
+            fsync=config.bus.outbox.fsync,
+            max_replays=config.bus.outbox.max_replays,
+            compact_interval_s=config.bus.outbox.compact_interval_s,
+        )
+    bus = MessageBus(config.bus, outbox=outbox)
     provider = _make_provider(config)
-    session_manager = SessionManager(config.workspace_path)
+    session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
+    session_manager.traces.compact_all()
+    usage_ledger = UsageLedger.from_config(config.usage, get_data_dir() / "usage")
+    if usage_ledger:
+        usage_ledger.prune()
     
     # Create cron service first (callback set after agent creation)
     cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = CronService(cron_store_path, config=config.cron)
     
     # Create agent with cron service
     agent = AgentLoop(
@@ -329,17 +433,23 @@ def gateway(
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
+        generation=GenerationSettings.from_config(config.agents.defaults),
+        usage_ledger=usage_ledger,
+        subagent_config=config.agents.subagents,
+        memory_config=config.agents.memory,
     )
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
-            channel=job.payload.channel or "cli",
-            chat_id=job.payload.to or "direct",
-        )
+        from chasingclaw.providers.cache import response_cache
+        with response_cache(job.payload.cache):
+            response = await agent.process_direct(
+                job.payload.message,
+                session_key=f"cron:{job.id}",
+                channel=job.payload.channel or "cli",
+                chat_id=job.payload.to or "direct",
+            )
         if job.payload.deliver and job.payload.to:
             from chasingclaw.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
@@ -353,14 +463,12 @@ def gateway(
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
         """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        from chasingclaw.providers.cache import response_cache
+        # The prompt carries HEARTBEAT.md's revision, so edits never get a cached reply
+        with response_cache(True):
+            return await agent.process_direct(prompt, session_key="heartbeat")
     
-    heartbeat = HeartbeatService(
-        workspace=config.workspace_path,
-        on_heartbeat=on_heartbeat,
-        interval_s=30 * 60,  # 30 minutes
-        enabled=True
-    )
+    heartbeat = HeartbeatService.from_config(config.workspace_path, config.heartbeat, on_heartbeat=on_heartbeat)
     
     # Create channel manager
     channels = ChannelManager(config, bus, session_manager=session_manager)
@@ -374,24 +482,62 @@ def gateway(
     if cron_status["jobs"] > 0:
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
-    console.print(f"[green]✓[/green] Heartbeat: every 30m")
+    if config.heartbeat.enabled:
+        console.print(f"[green]✓[/green] Heartbeat: every {config.heartbeat.interval_s // 60}m")
     
     async def run():
+        import signal
+
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C surfaces as KeyboardInterrupt below
+
+        await cron.start()
+        control = None
+        if config.cron.control_enabled:
+            from chasingclaw.cron.control import CronControlServer
+            control = CronControlServer(cron, port=config.cron.control_port)
+            try:
+                await control.start()
+            except OSError as e:
+                console.print(f"[yellow]Cron control not started: {e}[/yellow]")
+                control = None
+        await heartbeat.start()
+        agent_task = asyncio.create_task(agent.run())
+        channels_task = asyncio.create_task(channels.start_all())
+        failure = None
         try:
-            await cron.start()
-            await heartbeat.start()
-            await asyncio.gather(
-                agent.run(),
-                channels.start_all(),
-            )
-        except KeyboardInterrupt:
-            console.print("\nShutting down...")
-            heartbeat.stop()
-            cron.stop()
-            agent.stop()
-            await channels.stop_all()
+            failure = await _wait_for_stop(stop_event, {"agent": agent_task, "channels": channels_task})
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+
+        console.print("\nShutting down...")
+        heartbeat.stop()
+        if control:
+            await control.stop()
+        cron.stop()
+
+        # Let the agent finish its current message, then flush replies before stopping channels
+        agent.stop()
+        done, _ = await asyncio.wait({agent_task}, timeout=30)
+        if not done:
+            agent_task.cancel()
+            console.print("[yellow]Agent did not finish in time, cancelled[/yellow]")
+        await channels.stop_all(drain=True)
+        channels_task.cancel()
+        await asyncio.gather(agent_task, channels_task, return_exceptions=True)
+        await agent.close()
+        if failure is not None:
+            raise failure
     
-    asyncio.run(run())
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
 
 
 
@@ -409,14 +555,17 @@ def agent(
     logs: bool = typer.Option(False, "--logs/--no-logs", help="Show chasingclaw runtime logs during chat"),
 ):
     """Interact with the agent directly."""
-    from chasingclaw.config.loader import load_config
+    from chasingclaw.config.loader import load_config, get_data_dir
     from chasingclaw.bus.queue import MessageBus
     from chasingclaw.agent.loop import AgentLoop
+    from chasingclaw.agent.generation import GenerationSettings
+    from chasingclaw.session.manager import SessionManager
+    from chasingclaw.session.usage import UsageLedger
     from loguru import logger
     
     config = load_config()
     
-    bus = MessageBus()
+    bus = MessageBus(config.bus)
     provider = _make_provider(config)
 
     if logs:
@@ -431,6 +580,11 @@ def agent(
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         restrict_to_workspace=config.tools.restrict_to_workspace,
+        session_manager=SessionManager(config.workspace_path, trace_config=config.traces),
+        generation=GenerationSettings.from_config(config.agents.defaults),
+        usage_ledger=UsageLedger.from_config(config.usage, get_data_dir() / "usage"),
+        subagent_config=config.agents.subagents,
+        memory_config=config.agents.memory,
     )
     
     # Show spinner when logs are off (no output to miss); skip when logs are on
@@ -444,8 +598,11 @@ def agent(
     if message:
         # Single message mode
         async def run_once():
-            with _thinking_ctx():
-                response = await agent_loop.process_direct(message, session_id)
+            try:
+                with _thinking_ctx():
+                    response = await agent_loop.process_direct(message, session_id)
+            finally:
+                await agent_loop.close()
             _print_agent_response(response, render_markdown=markdown)
         
         asyncio.run(run_once())
@@ -474,6 +631,9 @@ def agent(
                         _restore_terminal()
                         console.print("\nGoodbye!")
                         break
+
+                    if _handle_subagent_command(agent_loop.subagents, command):
+                        continue
                     
                     with _thinking_ctx():
                         response = await agent_loop.process_direct(user_input, session_id)
@@ -486,6 +646,7 @@ def agent(
                     _restore_terminal()
                     console.print("\nGoodbye!")
                     break
+            await agent_loop.close()
         
         asyncio.run(run_interactive())
 
@@ -664,10 +825,10 @@ def cron_list(
 ):
     """List scheduled jobs."""
     from chasingclaw.config.loader import get_data_dir
-    from chasingclaw.cron.service import CronService
+    from chasingclaw.cron.control import open_cron_service
     
     store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = open_cron_service(store_path)
     
     jobs = service.list_jobs(include_disabled=all)
     
@@ -689,6 +850,8 @@ def cron_list(
             sched = f"every {(job.schedule.every_ms or 0) // 1000}s"
         elif job.schedule.kind == "cron":
             sched = job.schedule.expr or ""
+            if job.schedule.tz:
+                sched += f" ({job.schedule.tz})"
         else:
             sched = "one-time"
         
@@ -712,53 +875,100 @@ def cron_add(
     every: int = typer.Option(None, "--every", "-e", help="Run every N seconds"),
     cron_expr: str = typer.Option(None, "--cron", "-c", help="Cron expression (e.g. '0 9 * * *')"),
     at: str = typer.Option(None, "--at", help="Run once at time (ISO format)"),
+    tz: str = typer.Option(None, "--tz", help="Timezone for --cron and --at (e.g. 'Asia/Shanghai'; default: local)"),
     deliver: bool = typer.Option(False, "--deliver", "-d", help="Deliver response to channel"),
     to: str = typer.Option(None, "--to", help="Recipient for delivery"),
     channel: str = typer.Option(None, "--channel", help="Channel for delivery (e.g. 'telegram', 'whatsapp')"),
+    cache: bool = typer.Option(False, "--cache", help="Allow cached replies (needs providers.responseCache.enabled)"),
+    overlap: str = typer.Option("skip", "--overlap", help="If still running when due again: skip, queue or allow"),
+    timeout: float = typer.Option(0.0, "--timeout", help="Per-run timeout in seconds (0 = cron.defaultTimeoutS)"),
+    misfire: str = typer.Option("run_once", "--misfire", help="Runs missed while down: run_once or skip"),
 ):
     """Add a scheduled job."""
     from chasingclaw.config.loader import get_data_dir
-    from chasingclaw.cron.service import CronService
+    from chasingclaw.cron.control import open_cron_service
     from chasingclaw.cron.types import CronSchedule
     
     # Determine schedule type
     if every:
         schedule = CronSchedule(kind="every", every_ms=every * 1000)
     elif cron_expr:
-        schedule = CronSchedule(kind="cron", expr=cron_expr)
+        schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
     elif at:
         import datetime
         dt = datetime.datetime.fromisoformat(at)
+        if tz and dt.tzinfo is None:
+            from chasingclaw.cron.schedule import resolve_zone
+            try:
+                dt = dt.replace(tzinfo=resolve_zone(tz))
+            except ValueError as e:
+                console.print(f"[red]Error: {e}[/red]")
+                raise typer.Exit(1)
         schedule = CronSchedule(kind="at", at_ms=int(dt.timestamp() * 1000))
     else:
         console.print("[red]Error: Must specify --every, --cron, or --at[/red]")
         raise typer.Exit(1)
     
     store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
-    
-    job = service.add_job(
-        name=name,
-        schedule=schedule,
-        message=message,
-        deliver=deliver,
-        to=to,
-        channel=channel,
-    )
+    service = open_cron_service(store_path)
+    
+    try:
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            deliver=deliver,
+            to=to,
+            channel=channel,
+            cache=cache,
+            overlap=overlap,
+            timeout_s=timeout,
+            misfire=misfire,
+        )
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
     
     console.print(f"[green]✓[/green] Added job '{job.name}' ({job.id})")
 
 
+@cron_app.command("preview")
+def cron_preview(
+    job_id: str = typer.Argument(..., help="Job ID"),
+    count: int = typer.Option(5, "--count", "-n", help="Number of run times to show"),
+):
+    """Show the next run times of a job."""
+    import time
+
+    from chasingclaw.config.loader import get_data_dir
+    from chasingclaw.cron.control import open_cron_service
+
+    store_path = get_data_dir() / "cron" / "jobs.json"
+    service = open_cron_service(store_path)
+
+    try:
+        runs = service.preview_job(job_id, count)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    if not runs:
+        console.print(f"Job {job_id} has no upcoming runs.")
+        return
+    for ms in runs:
+        console.print(time.strftime("%Y-%m-%d %H:%M:%S %Z", time.localtime(ms / 1000)))
+
+
 @cron_app.command("remove")
 def cron_remove(
     job_id: str = typer.Argument(..., help="Job ID to remove"),
 ):
     """Remove a scheduled job."""
     from chasingclaw.config.loader import get_data_dir
-    from chasingclaw.cron.service import CronService
+    from chasingclaw.cron.control import open_cron_service
     
     store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = open_cron_service(store_path)
     
     if service.remove_job(job_id):
         console.print(f"[green]✓[/green] Removed job {job_id}")
@@ -773,10 +983,10 @@ def cron_enable(
 ):
     """Enable or disable a job."""
     from chasingclaw.config.loader import get_data_dir
-    from chasingclaw.cron.service import CronService
+    from chasingclaw.cron.control import open_cron_service
     
     store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = open_cron_service(store_path)
     
     job = service.enable_job(job_id, enabled=not disable)
     if job:
@@ -793,10 +1003,10 @@ def cron_run(
 ):
     """Manually run a job."""
     from chasingclaw.config.loader import get_data_dir
-    from chasingclaw.cron.service import CronService
+    from chasingclaw.cron.control import open_cron_service
     
     store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = open_cron_service(store_path)
     
     async def run():
         return await service.run_job(job_id, force=force)
@@ -829,6 +1039,50 @@ def ui(
     server.serve(open_browser=open_browser)
 
 
+# ============================================================================
+# Usage Commands
+# ============================================================================
+
+
+@app.command()
+def usage(
+    days: int = typer.Option(7, "--days", "-d", help="Look-back window in days (0 = all)"),
+    by: str = typer.Option("session", "--by", "-b", help="Group by: session, channel, model, day or turn"),
+    top: int = typer.Option(20, "--top", "-n", help="Number of rows to show (0 = all)"),
+):
+    """Show token usage from the usage ledger."""
+    from chasingclaw.config.loader import get_data_dir
+    from chasingclaw.session.usage import GROUP_BY, UsageLedger
+
+    if by not in GROUP_BY:
+        console.print(f"[red]--by must be one of: {', '.join(GROUP_BY)}[/red]")
+        raise typer.Exit(1)
+
+    rows = UsageLedger(get_data_dir() / "usage").summarize(days=days, group_by=by, top=top)
+    if not rows:
+        console.print("No usage recorded.")
+        return
+
+    window = f"last {days} days" if days > 0 else "all time"
+    table = Table(title=f"Token Usage by {by} ({window})")
+    table.add_column(by.capitalize())
+    for column in ("Calls", "Turns", "Prompt", "Completion", "Cached", "Reasoning", "Total", "Avg ms"):
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(
+            row[by],
+            str(row["calls"]),
+            str(row["turns"]),
+            f"{row['prompt']:,}",
+            f"{row['completion']:,}",
+            f"{row['cached']:,}",
+            f"{row['reasoning']:,}",
+            f"{row['total']:,}",
+            str(row["avg_latency_ms"]),
+        )
+    console.print(table)
+
+
 # ============================================================================
 # Status Commands
 # ============================================================================
@@ -160,8 +160,26 @@ class WebhookConfig(BaseModel):
     link_button_title: str = "查看详情"
 
 
+class RetryPolicyConfig(BaseModel):
+    """Retry policy for failed outbound sends."""
+    max_attempts: int = 3
+    base_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+
+
+class DeliveryConfig(BaseModel):
+    """Outbound delivery workers."""
+    per_chat: bool = False  # One worker per chat instead of per channel
+    chat_concurrency: int = 4  # Max concurrent sends per channel when per_chat is on
+    idle_timeout_s: float = 300.0  # Retire idle per-chat workers after this long
+    worker_queue_size: int = 100  # 0 = unbounded
+    retry: RetryPolicyConfig = Field(default_factory=RetryPolicyConfig)
+    channel_retry: dict[str, RetryPolicyConfig] = Field(default_factory=dict)  # Per-channel overrides
+
+
 class ChannelsConfig(BaseModel):
     """Configuration for chat channels."""
+    delivery: DeliveryConfig = Field(default_factory=DeliveryConfig)
     whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
     telegram: TelegramConfig = Field(default_factory=TelegramConfig)
     discord: DiscordConfig = Field(default_factory=DiscordConfig)
@@ -174,18 +192,62 @@ class ChannelsConfig(BaseModel):
     webhook: WebhookConfig = Field(default_factory=WebhookConfig)
 
 
+class GenerationOverrideConfig(BaseModel):
+    """Per-channel generation overrides (unset fields keep the defaults)."""
+    max_tokens: int | None = None
+    temperature: float | None = None
+    planning_max_tokens: int | None = None
+
+
 class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.chasingclaw/workspace"
     model: str = "anthropic/claude-opus-4-5"
     max_tokens: int = 8192
     temperature: float = 0.7
+    planning_max_tokens: int = 0  # max_tokens for tool-planning iterations, 0 = same as max_tokens
     max_tool_iterations: int = 20
+    channel_overrides: dict[str, GenerationOverrideConfig] = Field(default_factory=dict)  # Keyed by channel name
+
+
+class SubagentsConfig(BaseModel):
+    """Scheduling limits for background subagents."""
+    max_concurrent: int = 3  # Running at once across all chats, 0 = unlimited
+    max_per_origin: int = 2  # Running at once per channel:chat_id, 0 = unlimited
+    max_queued: int = 20  # Waiting tasks before spawn is refused, 0 = unlimited
+    max_iterations: int = 15
+    token_budget: int = 0  # Max prompt+completion tokens per task, 0 = unlimited
+    time_budget_s: float = 900.0  # Max wall-clock seconds per task, 0 = unlimited
+    max_parallel_tools: int = 4  # Concurrent parallel-safe tool calls within one iteration
+    announce_window_s: float = 3.0  # Batch results of one chat finishing this close together, 0 = no batching
+    announce_model: str = ""  # Cheaper model for summarizing results (no tools, recent history only), "" = main model
+    announce_history: int = 10  # History messages sent with announce_model
+
+
+class MemoryConfig(BaseModel):
+    """How memory/*.md reaches the system prompt."""
+    retrieval: bool = True  # Past inline_max_chars, inject only chunks relevant to the message
+    inline_max_chars: int = 4000  # MEMORY.md + today's note up to this size are injected whole
+    top_k: int = 5
+    chunk_chars: int = 800
+    embedding_model: str = ""  # fastembed model blended with BM25 (e.g. "BAAI/bge-small-zh-v1.5"), "" = BM25 only
 
 
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    subagents: SubagentsConfig = Field(default_factory=SubagentsConfig)
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
+
+
+class RateLimitConfig(BaseModel):
+    """Client-side rate limiting for one provider (limits are per model)."""
+    enabled: bool = True
+    requests_per_minute: int = 0  # 0 = learn from x-ratelimit-* headers only
+    tokens_per_minute: int = 0  # 0 = learn from x-ratelimit-* headers only
+    max_concurrency: int = 0  # Max in-flight requests, 0 = unlimited
+    max_retries: int = 3  # Retries on HTTP 429
+    max_retry_wait_s: float = 60.0
 
 
 class ProviderConfig(BaseModel):
@@ -193,10 +255,39 @@ class ProviderConfig(BaseModel):
     api_key: str = ""
     api_base: str | None = None
     extra_headers: dict[str, str] | None = None  # Custom headers (e.g. APP-Code for AiHubMix)
+    backend: str = "litellm"  # "litellm" or "http" (direct OpenAI-compatible calls, needs api_base or OpenAI)
+    rate_limit: RateLimitConfig = Field(default_factory=RateLimitConfig)
+
+
+class FallbackEntry(BaseModel):
+    """One model in the fallback chain."""
+    model: str
+    provider: str = ""  # Provider config name (e.g. "openrouter"); empty = match by model
+
+
+class HedgingConfig(BaseModel):
+    """Send a backup request to the first fallback when the primary is slow."""
+    enabled: bool = False
+    percentile: float = 0.95  # Hedge after this latency percentile of the primary
+    min_samples: int = 20  # Use initial_delay_s until this many samples are collected
+    initial_delay_s: float = 8.0
+    min_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+
+
+class ResponseCacheConfig(BaseModel):
+    """Cache of plain-text replies, used only by callers that opt in (e.g. cron jobs)."""
+    enabled: bool = False
+    ttl_s: float = 3600.0
+    max_entries: int = 256
 
 
 class ProvidersConfig(BaseModel):
     """Configuration for LLM providers."""
+    fallbacks: list[FallbackEntry] = Field(default_factory=list)  # Tried in order on timeout/5xx/429
+    request_timeout_s: float = 0.0  # Per-attempt timeout before falling back, 0 = none
+    hedging: HedgingConfig = Field(default_factory=HedgingConfig)
+    response_cache: ResponseCacheConfig = Field(default_factory=ResponseCacheConfig)
     anthropic: ProviderConfig = Field(default_factory=ProviderConfig)
     openai: ProviderConfig = Field(default_factory=ProviderConfig)
     openrouter: ProviderConfig = Field(default_factory=ProviderConfig)
@@ -240,6 +331,69 @@ class ToolsConfig(BaseModel):
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
+class TracesConfig(BaseModel):
+    """Tool trace storage configuration (kept separate from chat history)."""
+    enabled: bool = True
+    max_age_days: int = 30  # 0 = keep forever
+    max_per_session: int = 200  # 0 = unlimited
+
+
+class UsageConfig(BaseModel):
+    """Token usage ledger (data dir /usage, one JSONL file per day)."""
+    enabled: bool = True
+    retention_days: int = 90  # 0 = keep forever
+
+
+class CronConfig(BaseModel):
+    """Scheduled job execution."""
+    max_concurrent: int = 2  # Jobs running at once, 0 = unlimited
+    default_timeout_s: float = 0.0  # Per-run timeout for jobs without their own, 0 = none
+    jitter_s: float = 0.0  # Spread cron-expression jobs over this many seconds (stable per job)
+    misfire_grace_s: float = 3600.0  # Missed runs older than this are skipped, 0 = no limit
+    control_enabled: bool = True  # Gateway serves its cron engine to the CLI/Web UI on localhost
+    control_port: int = 0  # 0 = any free port (published in <data dir>/cron/control.json)
+
+
+class HeartbeatConfig(BaseModel):
+    """Periodic agent wake-up driven by HEARTBEAT.md (gateway only)."""
+    enabled: bool = True
+    interval_s: int = 1800
+    max_interval_s: int = 4 * 3600  # Back off up to this after consecutive HEARTBEAT_OK replies
+    backoff_factor: float = 2.0
+    window_s: int = 3600  # An unchanged file that was OK is re-checked once per local time window, 0 = never
+    poll_s: float = 10.0  # How often HEARTBEAT.md is checked for edits (which wake the heartbeat), 0 = off
+
+
+class TranscriptionConfig(BaseModel):
+    """Voice note transcription shared by all channels."""
+    enabled: bool = True
+    backend: str = "auto"  # "groq", "local" (faster-whisper) or "auto" (Groq if keyed, then local)
+    max_concurrency: int = 2
+    cache_size: int = 256  # Transcripts kept by audio content hash
+    preprocess: bool = True  # Downmix to mono 16 kHz Opus with ffmpeg before upload
+    timeout_s: float = 60.0
+    groq_model: str = "whisper-large-v3"
+    local_model: str = "base"
+    local_compute_type: str = "int8"
+
+
+class OutboxConfig(BaseModel):
+    """Disk-backed outbox for outbound messages (gateway only)."""
+    enabled: bool = False
+    fsync: bool = False  # fsync every record (slower, survives OS crashes)
+    max_replays: int = 3  # Give up on a message after this many restarts
+    compact_interval_s: float = 300.0
+
+
+class BusConfig(BaseModel):
+    """Message bus queue limits and overflow behavior."""
+    inbound_maxsize: int = 1000  # 0 = unbounded
+    outbound_maxsize: int = 1000  # 0 = unbounded
+    overflow_policy: str = "block"  # "block", "drop_oldest" or "reject"
+    reject_notice: str = "当前消息较多，请稍后再试。"  # Sent back to the chat when a message is rejected
+    outbox: OutboxConfig = Field(default_factory=OutboxConfig)
+
+
 class UIConfig(BaseModel):
     """Web UI preference settings."""
 
@@ -253,6 +407,12 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    traces: TracesConfig = Field(default_factory=TracesConfig)
+    usage: UsageConfig = Field(default_factory=UsageConfig)
+    transcription: TranscriptionConfig = Field(default_factory=TranscriptionConfig)
+    cron: CronConfig = Field(default_factory=CronConfig)
+    heartbeat: HeartbeatConfig = Field(default_factory=HeartbeatConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
     ui: UIConfig = Field(default_factory=UIConfig)
     
     @property
@@ -0,0 +1,181 @@
+"""Cron control plane: the gateway's live CronService, reachable from the CLI and Web UI."""
+
+import asyncio
+import hmac
+import json
+import os
+import secrets
+import socket
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from chasingclaw.cron.service import (
+    CronService,
+    _job_from_dict,
+    _job_to_dict,
+    _schedule_from_dict,
+    _schedule_to_dict,
+)
+from chasingclaw.cron.types import CronJob, CronSchedule
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import CronConfig
+
+CONTROL_FILE = "control.json"
+
+
+def _control_path(store_path: Path) -> Path:
+    return store_path.parent / CONTROL_FILE
+
+
+class CronControlServer:
+    """
+    Localhost TCP endpoint in front of the gateway's CronService.
+
+    Each connection carries one JSON request line
+    ({"token", "op", "args"}) and gets one JSON response line. The port
+    and a random token are written to control.json next to the job store
+    (mode 0600), so only local users who can read it can connect.
+    """
+
+    def __init__(self, service: CronService, host: str = "127.0.0.1", port: int = 0):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.token = secrets.token_urlsafe(24)
+        self._server: asyncio.AbstractServer | None = None
+        self._control_path = _control_path(service.store_path)
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._control_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._control_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"host": self.host, "port": self.port, "token": self.token, "pid": os.getpid()}, f)
+        logger.info(f"Cron control listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        try:
+            data = json.loads(self._control_path.read_text())
+            if data.get("token") == self.token:
+                self._control_path.unlink()
+        except (OSError, ValueError):
+            pass
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            if not hmac.compare_digest(str(request.get("token", "")), self.token):
+                response: dict[str, Any] = {"ok": False, "error": "unauthorized"}
+            else:
+                result = await self._dispatch(request.get("op", ""), request.get("args") or {})
+                response = {"ok": True, "result": result}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        try:
+            writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, op: str, args: dict[str, Any]) -> Any:
+        service = self.service
+        if op == "status":
+            return service.status()
+        if op == "list":
+            return [_job_to_dict(j) for j in service.list_jobs(include_disabled=bool(args.get("include_disabled")))]
+        if op == "add":
+            args = dict(args)
+            args["schedule"] = _schedule_from_dict(args["schedule"])
+            return _job_to_dict(service.add_job(**args))
+        if op == "remove":
+            return service.remove_job(args["job_id"])
+        if op == "enable":
+            job = service.enable_job(args["job_id"], enabled=bool(args.get("enabled", True)))
+            return _job_to_dict(job) if job else None
+        if op == "preview":
+            return service.preview_job(args["job_id"], int(args.get("count", 5)))
+        if op == "run":
+            return await service.run_job(args["job_id"], force=bool(args.get("force")))
+        raise ValueError(f"unknown op: {op}")
+
+
+class RemoteCronService:
+    """
+    CronService look-alike that forwards every call to a running gateway,
+    so edits re-arm the live timer and "run now" goes through its agent.
+    """
+
+    def __init__(self, host: str, port: int, token: str, timeout_s: float = 10.0):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.timeout_s = timeout_s
+
+    def _call(self, op: str, timeout_s: float | None = None, **args: Any) -> Any:
+        request = json.dumps({"token": self.token, "op": op, "args": args}, ensure_ascii=False) + "\n"
+        timeout = timeout_s if timeout_s is not None else self.timeout_s
+        with socket.create_connection((self.host, self.port), timeout=timeout or None) as sock:
+            sock.sendall(request.encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as f:
+                line = f.readline()
+        if not line:
+            raise ConnectionError("cron control closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ValueError(response.get("error") or "cron control error")
+        return response.get("result")
+
+    def status(self) -> dict:
+        return self._call("status")
+
+    def list_jobs(self, include_disabled: bool = False) -> list[CronJob]:
+        return [_job_from_dict(j) for j in self._call("list", include_disabled=include_disabled)]
+
+    def add_job(self, name: str, schedule: CronSchedule, message: str, **kwargs: Any) -> CronJob:
+        return _job_from_dict(
+            self._call("add", name=name, schedule=_schedule_to_dict(schedule), message=message, **kwargs)
+        )
+
+    def remove_job(self, job_id: str) -> bool:
+        return bool(self._call("remove", job_id=job_id))
+
+    def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
+        job = self._call("enable", job_id=job_id, enabled=enabled)
+        return _job_from_dict(job) if job else None
+
+    def preview_job(self, job_id: str, count: int = 5) -> list[int]:
+        return list(self._call("preview", job_id=job_id, count=count))
+
+    async def run_job(self, job_id: str, force: bool = False) -> bool:
+        # The agent turn can take minutes; no socket timeout for this call.
+        return bool(await asyncio.to_thread(self._call, "run", 0, job_id=job_id, force=force))
+
+
+def open_cron_service(
+    store_path: Path,
+    config: "CronConfig | None" = None,
+) -> "CronService | RemoteCronService":
+    """
+    Connect to the running gateway's cron engine, or fall back to a local
+    CronService on the same store when no gateway is reachable.
+    """
+    control_path = _control_path(store_path)
+    try:
+        info = json.loads(control_path.read_text())
+        remote = RemoteCronService(info["host"], int(info["port"]), info["token"], timeout_s=2.0)
+        remote.status()
+        remote.timeout_s = 10.0
+        return remote
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"Cron control not reachable ({e}), using the job store directly")
+    return CronService(store_path, config=config)
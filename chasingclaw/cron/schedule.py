@@ -0,0 +1,201 @@
+"""Schedule evaluation: when an at / every / cron schedule fires next."""
+
+import copy
+import heapq
+import itertools
+import os
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Any, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from chasingclaw.cron.types import CronSchedule
+
+
+@lru_cache(maxsize=1)
+def _local_zone() -> tzinfo:
+    """The server's zone, as a real tz database zone when it can be found."""
+    candidates = [os.environ.get("TZ", "").lstrip(":")]
+    target = os.path.realpath("/etc/localtime")
+    if "zoneinfo/" in target:
+        candidates.append(target.split("zoneinfo/", 1)[1])
+    for key in candidates:
+        if not key:
+            continue
+        try:
+            return ZoneInfo(key)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    # Fixed offset: no DST rules, but still the right wall clock for now
+    return datetime.now().astimezone().tzinfo
+
+
+def resolve_zone(name: str | None) -> tzinfo:
+    """
+    Look up an IANA zone name (e.g. "Asia/Shanghai").
+
+    Args:
+        name: Zone name, or None for the server's local zone.
+
+    Returns:
+        The zone.
+
+    Raises:
+        ValueError: If the zone is unknown.
+    """
+    if not name:
+        return _local_zone()
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        raise ValueError(f"unknown timezone: {name}") from e
+
+
+@lru_cache(maxsize=1024)
+def _parsed_croniter(expr: str) -> Any:
+    """Parsed croniter for an expression; a template that is never advanced."""
+    from croniter import croniter
+    return croniter(expr)
+
+
+def _croniter(expr: str, start: datetime) -> Any:
+    """
+    A private iterator for one evaluation.
+
+    Copying the cached template skips re-parsing but gives each caller its
+    own position, so threads (the Web UI) and interleaved generators never
+    move each other's iterator.
+    """
+    cron = copy.copy(_parsed_croniter(expr))
+    cron.set_current(start, force=True)
+    return cron
+
+
+def _repeats_within_hour(expr: str) -> bool:
+    """Whether the expression fires in every hour, so a repeated hour fires twice."""
+    fields = expr.split()
+    return expr.strip() == "@hourly" or (len(fields) >= 5 and fields[1].startswith("*"))
+
+
+def _instant_ms(wall: datetime, zone: tzinfo, fold: int) -> int:
+    return int(wall.replace(tzinfo=zone, fold=fold).timestamp() * 1000)
+
+
+def _iter_cron(expr: str, zone: tzinfo, after_ms: int) -> Iterator[int]:
+    """
+    Fire times of a cron expression read as wall-clock time in `zone`.
+
+    Wall times skipped by a DST jump forward fire at the same distance
+    past the jump (02:30 becomes 03:30). Wall times repeated by a jump
+    back fire once, on their first occurrence, unless the expression
+    runs every hour, in which case the repeated hour fires again.
+    """
+    start = datetime.fromtimestamp(after_ms / 1000, zone).replace(tzinfo=None)
+    first, second = _instant_ms(start, zone, 0), _instant_ms(start, zone, 1)
+    if second > first:
+        # `after` lies inside a repeated hour: its second pass may still hold
+        # slots whose wall time is earlier than `start`.
+        start = datetime.fromtimestamp((after_ms - (second - first)) / 1000, zone).replace(tzinfo=None)
+
+    from croniter import CroniterBadDateError
+
+    cron = _croniter(expr, start)
+    twice = _repeats_within_hour(expr)
+    repeated: list[int] = []  # second occurrences, due after the first pass ends
+    last = after_ms
+    while True:
+        try:
+            wall = cron.get_next(datetime)
+        except CroniterBadDateError:
+            return
+        first, second = _instant_ms(wall, zone, 0), _instant_ms(wall, zone, 1)
+        while repeated and repeated[0] < first:
+            ms = heapq.heappop(repeated)
+            if ms > last:
+                last = ms
+                yield ms
+        if twice and second > first:
+            heapq.heappush(repeated, second)
+        # Skipped wall times shift onto real ones; fire each instant once
+        if first > last:
+            last = first
+            yield first
+
+
+def iter_runs(schedule: CronSchedule, after_ms: int, anchor_ms: int | None = None) -> Iterator[int]:
+    """
+    Fire times of a schedule strictly after `after_ms`, in order.
+
+    Args:
+        schedule: The schedule.
+        after_ms: Exclusive lower bound, epoch ms.
+        anchor_ms: For "every" schedules, a past slot (usually the job's
+            creation time) that all slots are whole intervals from, so a
+            slow run does not push later runs back. Without it the
+            interval counts from `after_ms`.
+
+    Returns:
+        An iterator of epoch ms; finite for "at", endless otherwise.
+    """
+    if schedule.kind == "at":
+        if schedule.at_ms and schedule.at_ms > after_ms:
+            yield schedule.at_ms
+        return
+
+    if schedule.kind == "every":
+        every = schedule.every_ms or 0
+        if every <= 0:
+            return
+        base = after_ms if anchor_ms is None else anchor_ms
+        slot = base + ((after_ms - base) // every + 1) * every
+        while True:
+            yield slot
+            slot += every
+
+    if schedule.kind == "cron" and schedule.expr:
+        try:
+            zone = resolve_zone(schedule.tz)
+        except ValueError:
+            return
+        yield from _iter_cron(schedule.expr, zone, after_ms)
+
+
+def next_run_ms(schedule: CronSchedule, after_ms: int, anchor_ms: int | None = None) -> int | None:
+    """First fire time after `after_ms`, or None if the schedule never fires again."""
+    try:
+        return next(iter_runs(schedule, after_ms, anchor_ms), None)
+    except Exception:
+        return None
+
+
+def next_runs(
+    schedule: CronSchedule,
+    after_ms: int,
+    count: int,
+    anchor_ms: int | None = None,
+) -> list[int]:
+    """The next `count` fire times after `after_ms` (fewer if the schedule ends)."""
+    return list(itertools.islice(iter_runs(schedule, after_ms, anchor_ms), max(0, count)))
+
+
+def validate_schedule(schedule: CronSchedule) -> None:
+    """
+    Check a schedule before it is stored.
+
+    Raises:
+        ValueError: If the schedule can never be evaluated.
+    """
+    if schedule.kind == "at":
+        if not schedule.at_ms:
+            raise ValueError("at schedule needs a time")
+    elif schedule.kind == "every":
+        if not schedule.every_ms or schedule.every_ms <= 0:
+            raise ValueError("every schedule needs a positive interval")
+    elif schedule.kind == "cron":
+        from croniter import croniter
+        if not schedule.expr or not croniter.is_valid(schedule.expr):
+            raise ValueError(f"invalid cron expression: {schedule.expr!r}")
+    else:
+        raise ValueError(f"unknown schedule kind: {schedule.kind}")
+    if schedule.tz is not None:
+        resolve_zone(schedule.tz)
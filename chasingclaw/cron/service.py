@@ -1,181 +1,318 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
+import heapq
+import itertools
 import json
+import os
 import time
 import uuid
+import zlib
 from pathlib import Path
-from typing import Any, Callable, Coroutine
+from typing import TYPE_CHECKING, Any, Callable, Coroutine
 
 from loguru import logger
 
+from chasingclaw.cron.schedule import next_run_ms, next_runs, validate_schedule
 from chasingclaw.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import CronConfig
+
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
-def _compute_next_run(schedule: CronSchedule, now_ms: int) -> int | None:
-    """Compute next run time in ms."""
-    if schedule.kind == "at":
-        return schedule.at_ms if schedule.at_ms and schedule.at_ms > now_ms else None
-    
-    if schedule.kind == "every":
-        if not schedule.every_ms or schedule.every_ms <= 0:
-            return None
-        # Next interval from now
-        return now_ms + schedule.every_ms
-    
-    if schedule.kind == "cron" and schedule.expr:
-        try:
-            from croniter import croniter
-            cron = croniter(schedule.expr, time.time())
-            next_time = cron.get_next()
-            return int(next_time * 1000)
-        except Exception:
-            return None
-    
-    return None
+def _schedule_from_dict(s: dict[str, Any]) -> CronSchedule:
+    return CronSchedule(
+        kind=s["kind"],
+        at_ms=s.get("atMs"),
+        every_ms=s.get("everyMs"),
+        expr=s.get("expr"),
+        tz=s.get("tz"),
+    )
+
+
+def _schedule_to_dict(s: CronSchedule) -> dict[str, Any]:
+    return {"kind": s.kind, "atMs": s.at_ms, "everyMs": s.every_ms, "expr": s.expr, "tz": s.tz}
+
+
+def _job_from_dict(j: dict[str, Any]) -> CronJob:
+    return CronJob(
+        id=j["id"],
+        name=j["name"],
+        enabled=j.get("enabled", True),
+        schedule=_schedule_from_dict(j["schedule"]),
+        payload=CronPayload(
+            kind=j["payload"].get("kind", "agent_turn"),
+            message=j["payload"].get("message", ""),
+            deliver=j["payload"].get("deliver", False),
+            channel=j["payload"].get("channel"),
+            to=j["payload"].get("to"),
+            cache=j["payload"].get("cache", False),
+        ),
+        state=CronJobState(
+            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
+            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
+            last_status=j.get("state", {}).get("lastStatus"),
+            last_error=j.get("state", {}).get("lastError"),
+        ),
+        created_at_ms=j.get("createdAtMs", 0),
+        updated_at_ms=j.get("updatedAtMs", 0),
+        delete_after_run=j.get("deleteAfterRun", False),
+        overlap=j.get("overlap", "skip"),
+        timeout_s=j.get("timeoutS", 0.0),
+        misfire=j.get("misfire", "run_once"),
+    )
+
+
+def _job_to_dict(j: CronJob) -> dict[str, Any]:
+    return {
+        "id": j.id,
+        "name": j.name,
+        "enabled": j.enabled,
+        "schedule": _schedule_to_dict(j.schedule),
+        "payload": {
+            "kind": j.payload.kind,
+            "message": j.payload.message,
+            "deliver": j.payload.deliver,
+            "channel": j.payload.channel,
+            "to": j.payload.to,
+            "cache": j.payload.cache,
+        },
+        "state": {
+            "nextRunAtMs": j.state.next_run_at_ms,
+            "lastRunAtMs": j.state.last_run_at_ms,
+            "lastStatus": j.state.last_status,
+            "lastError": j.state.last_error,
+        },
+        "createdAtMs": j.created_at_ms,
+        "updatedAtMs": j.updated_at_ms,
+        "deleteAfterRun": j.delete_after_run,
+        "overlap": j.overlap,
+        "timeoutS": j.timeout_s,
+        "misfire": j.misfire,
+    }
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
 
 
 class CronService:
-    """Service for managing and executing scheduled jobs."""
+    """
+    Service for managing and executing scheduled jobs.
+
+    Due jobs are dispatched concurrently (up to cron.maxConcurrent); each
+    job's overlap policy decides what happens when it comes due again
+    while a previous run is still going.
+
+    Wakeups come from a min-heap of (next run, job id) entries; entries
+    whose time no longer matches the job are dropped lazily. Changes are
+    appended to a journal next to jobs.json (one line per changed or
+    removed job), and the journal is folded into a compact jobs.json
+    snapshot every SNAPSHOT_EVERY entries and on start/stop.
+    """
+
+    SNAPSHOT_EVERY = 500
     
     def __init__(
         self,
         store_path: Path,
-        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None
+        on_job: Callable[[CronJob], Coroutine[Any, Any, str | None]] | None = None,
+        config: "CronConfig | None" = None,
     ):
+        from chasingclaw.config.schema import CronConfig
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
+        self.config = config or CronConfig()
         self._store: CronStore | None = None
         self._timer_task: asyncio.Task | None = None
         self._running = False
+        self._slots: asyncio.Semaphore | None = None
+        self._job_locks: dict[str, asyncio.Lock] = {}
+        self._active: dict[str, int] = {}  # job id -> runs in progress
+        self._queued: set[str] = set()  # job ids with a run waiting behind the current one
+        self._run_tasks: set[asyncio.Task] = set()
+        self.journal_path = store_path.with_name(store_path.stem + ".journal.jsonl")
+        self._by_id: dict[str, CronJob] = {}
+        self._heap: list[tuple[int, int, str]] = []  # (next_run_at_ms, seq, job_id)
+        self._heap_seq = itertools.count()
+        self._dirty: set[str] = set()  # changed job ids not yet journaled
+        self._deleted: set[str] = set()
+        self._journal_entries = 0
     
     def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
+        """Load jobs from the snapshot and replay the journal."""
         if self._store:
             return self._store
         
+        jobs: dict[str, CronJob] = {}
         if self.store_path.exists():
             try:
                 data = json.loads(self.store_path.read_text())
-                jobs = []
                 for j in data.get("jobs", []):
-                    jobs.append(CronJob(
-                        id=j["id"],
-                        name=j["name"],
-                        enabled=j.get("enabled", True),
-                        schedule=CronSchedule(
-                            kind=j["schedule"]["kind"],
-                            at_ms=j["schedule"].get("atMs"),
-                            every_ms=j["schedule"].get("everyMs"),
-                            expr=j["schedule"].get("expr"),
-                            tz=j["schedule"].get("tz"),
-                        ),
-                        payload=CronPayload(
-                            kind=j["payload"].get("kind", "agent_turn"),
-                            message=j["payload"].get("message", ""),
-                            deliver=j["payload"].get("deliver", False),
-                            channel=j["payload"].get("channel"),
-                            to=j["payload"].get("to"),
-                        ),
-                        state=CronJobState(
-                            next_run_at_ms=j.get("state", {}).get("nextRunAtMs"),
-                            last_run_at_ms=j.get("state", {}).get("lastRunAtMs"),
-                            last_status=j.get("state", {}).get("lastStatus"),
-                            last_error=j.get("state", {}).get("lastError"),
-                        ),
-                        created_at_ms=j.get("createdAtMs", 0),
-                        updated_at_ms=j.get("updatedAtMs", 0),
-                        delete_after_run=j.get("deleteAfterRun", False),
-                    ))
-                self._store = CronStore(jobs=jobs)
+                    jobs[j["id"]] = _job_from_dict(j)
             except Exception as e:
                 logger.warning(f"Failed to load cron store: {e}")
-                self._store = CronStore()
-        else:
-            self._store = CronStore()
+                jobs = {}
+
+        if self.journal_path.exists():
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        if entry.get("op") == "del":
+                            jobs.pop(entry["id"], None)
+                        else:
+                            jobs[entry["job"]["id"]] = _job_from_dict(entry["job"])
+                        self._journal_entries += 1
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # torn last line after a crash
         
+        self._store = CronStore(jobs=list(jobs.values()))
+        self._by_id = jobs
+        self._rebuild_heap()
         return self._store
     
+    def _touch(self, job: CronJob) -> None:
+        """Mark a job as changed (journaled on the next _save_store) and reschedule it."""
+        self._dirty.add(job.id)
+        self._schedule(job)
+
     def _save_store(self) -> None:
-        """Save jobs to disk."""
+        """Append changed and removed jobs to the journal; snapshot when it grows large."""
+        if not self._store or not (self._dirty or self._deleted):
+            return
+
+        lines = [_dumps({"op": "del", "id": job_id}) for job_id in self._deleted]
+        lines += [
+            _dumps({"op": "put", "job": _job_to_dict(self._by_id[job_id])})
+            for job_id in self._dirty if job_id in self._by_id
+        ]
+        self._dirty.clear()
+        self._deleted.clear()
+
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self._journal_entries += len(lines)
+        if self._journal_entries >= self.SNAPSHOT_EVERY:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """Write all jobs to jobs.json (atomically) and empty the journal."""
         if not self._store:
             return
-        
+        self._dirty.clear()
+        self._deleted.clear()
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        
         data = {
             "version": self._store.version,
-            "jobs": [
-                {
-                    "id": j.id,
-                    "name": j.name,
-                    "enabled": j.enabled,
-                    "schedule": {
-                        "kind": j.schedule.kind,
-                        "atMs": j.schedule.at_ms,
-                        "everyMs": j.schedule.every_ms,
-                        "expr": j.schedule.expr,
-                        "tz": j.schedule.tz,
-                    },
-                    "payload": {
-                        "kind": j.payload.kind,
-                        "message": j.payload.message,
-                        "deliver": j.payload.deliver,
-                        "channel": j.payload.channel,
-                        "to": j.payload.to,
-                    },
-                    "state": {
-                        "nextRunAtMs": j.state.next_run_at_ms,
-                        "lastRunAtMs": j.state.last_run_at_ms,
-                        "lastStatus": j.state.last_status,
-                        "lastError": j.state.last_error,
-                    },
-                    "createdAtMs": j.created_at_ms,
-                    "updatedAtMs": j.updated_at_ms,
-                    "deleteAfterRun": j.delete_after_run,
-                }
-                for j in self._store.jobs
-            ]
+            "jobs": [_job_to_dict(j) for j in self._store.jobs],
         }
-        
-        self.store_path.write_text(json.dumps(data, indent=2))
+        tmp = self.store_path.with_name(self.store_path.name + ".tmp")
+        tmp.write_text(_dumps(data))
+        os.replace(tmp, self.store_path)
+        self.journal_path.unlink(missing_ok=True)
+        self._journal_entries = 0
+
+    def _schedule(self, job: CronJob) -> None:
+        if job.enabled and job.state.next_run_at_ms:
+            heapq.heappush(self._heap, (job.state.next_run_at_ms, next(self._heap_seq), job.id))
+            if len(self._heap) > 2 * len(self._by_id) + 64:
+                self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [
+            (j.state.next_run_at_ms, next(self._heap_seq), j.id)
+            for j in self._by_id.values()
+            if j.enabled and j.state.next_run_at_ms
+        ]
+        heapq.heapify(self._heap)
+
+    def _heap_head(self) -> tuple[int, CronJob] | None:
+        """Earliest valid heap entry, dropping stale ones."""
+        while self._heap:
+            when, _, job_id = self._heap[0]
+            job = self._by_id.get(job_id)
+            if job and job.enabled and job.state.next_run_at_ms == when:
+                return when, job
+            heapq.heappop(self._heap)
+        return None
     
     async def start(self) -> None:
         """Start the cron service."""
         self._running = True
         self._load_store()
         self._recompute_next_runs()
-        self._save_store()
+        self._write_snapshot()
         self._arm_timer()
         logger.info(f"Cron service started with {len(self._store.jobs if self._store else [])} jobs")
     
     def stop(self) -> None:
-        """Stop the cron service."""
+        """Stop the cron service (runs in progress are cancelled)."""
         self._running = False
         if self._timer_task:
             self._timer_task.cancel()
             self._timer_task = None
+        for task in list(self._run_tasks):
+            task.cancel()
+        if self._store:
+            self._write_snapshot()
+
+    def _jitter_ms(self, job: CronJob) -> int:
+        """Stable per-job offset added to cron expression times."""
+        if job.schedule.kind != "cron" or self.config.jitter_s <= 0:
+            return 0
+        return zlib.crc32(job.id.encode()) % int(self.config.jitter_s * 1000)
+
+    def _next_run(self, job: CronJob, now_ms: int) -> int | None:
+        """
+        Next run time of a job, with its jitter offset.
+
+        "every" jobs stay on the grid of their creation time, so the time a
+        run takes does not push the following runs back.
+        """
+        jitter = self._jitter_ms(job)
+        next_ms = next_run_ms(job.schedule, now_ms - jitter, anchor_ms=job.created_at_ms or None)
+        return None if next_ms is None else next_ms + jitter
     
     def _recompute_next_runs(self) -> None:
-        """Recompute next run times for all enabled jobs."""
+        """
+        Recompute next run times for all enabled jobs.
+
+        A run missed while the service was down stays due (and runs once
+        right away) when the job's misfire policy is "run_once" and it is
+        within misfire_grace_s; otherwise the job moves to its next time.
+        """
         if not self._store:
             return
         now = _now_ms()
+        grace_ms = self.config.misfire_grace_s * 1000
         for job in self._store.jobs:
-            if job.enabled:
-                job.state.next_run_at_ms = _compute_next_run(job.schedule, now)
+            if not job.enabled:
+                continue
+            missed = job.state.next_run_at_ms
+            if (
+                missed and missed <= now
+                and job.misfire == "run_once"
+                and (grace_ms <= 0 or now - missed <= grace_ms)
+            ):
+                logger.info(f"Cron: job '{job.name}' missed its run, running it now")
+                continue
+            if missed and missed <= now:
+                logger.info(f"Cron: skipping missed run of job '{job.name}'")
+            job.state.next_run_at_ms = self._next_run(job, now)
+        self._rebuild_heap()
     
     def _get_next_wake_ms(self) -> int | None:
         """Get the earliest next run time across all jobs."""
         if not self._store:
             return None
-        times = [j.state.next_run_at_ms for j in self._store.jobs 
-                 if j.enabled and j.state.next_run_at_ms]
-        return min(times) if times else None
+        head = self._heap_head()
+        return head[0] if head else None
     
     def _arm_timer(self) -> None:
         """Schedule the next timer tick."""
@@ -197,36 +334,80 @@ class CronService:
         self._timer_task = asyncio.create_task(tick())
     
     async def _on_timer(self) -> None:
-        """Handle timer tick - run due jobs."""
+        """Handle timer tick - dispatch due jobs without waiting for them."""
         if not self._store:
             return
         
         now = _now_ms()
-        due_jobs = [
-            j for j in self._store.jobs
-            if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
-        ]
-        
-        for job in due_jobs:
-            await self._execute_job(job)
+        while (head := self._heap_head()) and head[0] <= now:
+            job = head[1]
+            heapq.heappop(self._heap)
+            # Move the job past this slot first so the next tick doesn't fire it again
+            job.state.next_run_at_ms = None if job.schedule.kind == "at" else self._next_run(job, now)
+            self._touch(job)
+            self._dispatch(job)
         
         self._save_store()
         self._arm_timer()
     
+    def _dispatch(self, job: CronJob) -> None:
+        """Start a run of the job in the background, honouring its overlap policy."""
+        if self._active.get(job.id) and job.overlap != "allow":
+            if job.overlap == "skip" or job.id in self._queued:
+                logger.info(f"Cron: job '{job.name}' still running, skipping this run")
+                job.state.last_status = "skipped"
+                return
+            self._queued.add(job.id)
+        task = asyncio.create_task(self._run_dispatched(job))
+        self._run_tasks.add(task)
+        task.add_done_callback(self._run_tasks.discard)
+
+    async def _run_dispatched(self, job: CronJob, manual: bool = False) -> None:
+        """Run the job under its overlap lock and a cron.maxConcurrent slot."""
+        if self._slots is None:
+            limit = self.config.max_concurrent
+            self._slots = asyncio.Semaphore(limit if limit > 0 else 1_000_000)
+        lock = None if job.overlap == "allow" else self._job_locks.setdefault(job.id, asyncio.Lock())
+        if lock:
+            await lock.acquire()
+        if not manual:
+            self._queued.discard(job.id)
+        self._active[job.id] = self._active.get(job.id, 0) + 1
+        try:
+            async with self._slots:
+                await self._execute_job(job)
+        finally:
+            self._active[job.id] -= 1
+            if not self._active[job.id]:
+                del self._active[job.id]
+            if lock:
+                lock.release()
+        if self._running:
+            self._save_store()
+            self._arm_timer()
+
     async def _execute_job(self, job: CronJob) -> None:
         """Execute a single job."""
         start_ms = _now_ms()
         logger.info(f"Cron: executing job '{job.name}' ({job.id})")
+        timeout = job.timeout_s or self.config.default_timeout_s
         
         try:
             response = None
             if self.on_job:
-                response = await self.on_job(job)
+                if timeout > 0:
+                    response = await asyncio.wait_for(self.on_job(job), timeout=timeout)
+                else:
+                    response = await self.on_job(job)
             
             job.state.last_status = "ok"
             job.state.last_error = None
             logger.info(f"Cron: job '{job.name}' completed")
             
+        except asyncio.TimeoutError:
+            job.state.last_status = "error"
+            job.state.last_error = f"timed out after {timeout:g}s"
+            logger.error(f"Cron: job '{job.name}' timed out after {timeout:g}s")
         except Exception as e:
             job.state.last_status = "error"
             job.state.last_error = str(e)
@@ -238,13 +419,23 @@ class CronService:
         # Handle one-shot jobs
         if job.schedule.kind == "at":
             if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
-            else:
-                job.enabled = False
-                job.state.next_run_at_ms = None
-        else:
+                self._forget(job.id)
+                return
+            job.enabled = False
+            job.state.next_run_at_ms = None
+        elif job.enabled:
             # Compute next run
-            job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
+        self._touch(job)
+
+    def _forget(self, job_id: str) -> bool:
+        job = self._by_id.pop(job_id, None)
+        if job is None:
+            return False
+        self._store.jobs.remove(job)
+        self._dirty.discard(job_id)
+        self._deleted.add(job_id)
+        return True
     
     # ========== Public API ==========
     
@@ -263,8 +454,17 @@ class CronService:
         channel: str | None = None,
         to: str | None = None,
         delete_after_run: bool = False,
+        cache: bool = False,
+        overlap: str = "skip",
+        timeout_s: float = 0.0,
+        misfire: str = "run_once",
     ) -> CronJob:
         """Add a new job."""
+        if overlap not in ("skip", "queue", "allow"):
+            raise ValueError("overlap must be one of: skip, queue, allow")
+        if misfire not in ("run_once", "skip"):
+            raise ValueError("misfire must be one of: run_once, skip")
+        validate_schedule(schedule)
         store = self._load_store()
         now = _now_ms()
         
@@ -279,14 +479,20 @@ class CronService:
                 deliver=deliver,
                 channel=channel,
                 to=to,
+                cache=cache,
             ),
-            state=CronJobState(next_run_at_ms=_compute_next_run(schedule, now)),
             created_at_ms=now,
             updated_at_ms=now,
             delete_after_run=delete_after_run,
+            overlap=overlap,
+            timeout_s=timeout_s,
+            misfire=misfire,
         )
+        job.state.next_run_at_ms = self._next_run(job, now)
         
         store.jobs.append(job)
+        self._by_id[job.id] = job
+        self._touch(job)
         self._save_store()
         self._arm_timer()
         
@@ -295,10 +501,8 @@ class CronService:
     
     def remove_job(self, job_id: str) -> bool:
         """Remove a job by ID."""
-        store = self._load_store()
-        before = len(store.jobs)
-        store.jobs = [j for j in store.jobs if j.id != job_id]
-        removed = len(store.jobs) < before
+        self._load_store()
+        removed = self._forget(job_id)
         
         if removed:
             self._save_store()
@@ -309,33 +513,48 @@ class CronService:
     
     def enable_job(self, job_id: str, enabled: bool = True) -> CronJob | None:
         """Enable or disable a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                job.enabled = enabled
-                job.updated_at_ms = _now_ms()
-                if enabled:
-                    job.state.next_run_at_ms = _compute_next_run(job.schedule, _now_ms())
-                else:
-                    job.state.next_run_at_ms = None
-                self._save_store()
-                self._arm_timer()
-                return job
-        return None
+        self._load_store()
+        job = self._by_id.get(job_id)
+        if job is None:
+            return None
+        job.enabled = enabled
+        job.updated_at_ms = _now_ms()
+        if enabled:
+            job.state.next_run_at_ms = self._next_run(job, _now_ms())
+        else:
+            job.state.next_run_at_ms = None
+        self._touch(job)
+        self._save_store()
+        self._arm_timer()
+        return job
     
     async def run_job(self, job_id: str, force: bool = False) -> bool:
-        """Manually run a job."""
-        store = self._load_store()
-        for job in store.jobs:
-            if job.id == job_id:
-                if not force and not job.enabled:
-                    return False
-                await self._execute_job(job)
-                self._save_store()
-                self._arm_timer()
-                return True
-        return False
+        """
+        Manually run a job.
+
+        The run takes the same overlap lock and concurrency slot as
+        scheduled runs, so it waits for a run already in progress (unless
+        the job allows overlap) and counts against cron.maxConcurrent.
+        """
+        self._load_store()
+        job = self._by_id.get(job_id)
+        if job is None or (not force and not job.enabled):
+            return False
+        await self._run_dispatched(job, manual=True)
+        if not self._running:
+            self._save_store()
+        return True
     
+    def preview_job(self, job_id: str, count: int = 5) -> list[int]:
+        """The job's next `count` run times (epoch ms), from now."""
+        self._load_store()
+        job = self._by_id.get(job_id)
+        if job is None:
+            raise ValueError(f"job not found: {job_id}")
+        jitter = self._jitter_ms(job)
+        runs = next_runs(job.schedule, _now_ms() - jitter, count, anchor_ms=job.created_at_ms or None)
+        return [ms + jitter for ms in runs]
+
     def status(self) -> dict:
         """Get service status."""
         store = self._load_store()
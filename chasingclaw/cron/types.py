@@ -27,6 +27,8 @@ class CronPayload:
     deliver: bool = False
     channel: str | None = None  # e.g. "whatsapp"
     to: str | None = None  # e.g. phone number
+    # Allow answering from the response cache (only for prompts whose reply may repeat)
+    cache: bool = False
 
 
 @dataclass
@@ -50,6 +52,13 @@ class CronJob:
     created_at_ms: int = 0
     updated_at_ms: int = 0
     delete_after_run: bool = False
+    # When the job is due while its previous run is still going:
+    # "skip" this run, "queue" one run after it, or "allow" overlapping runs
+    overlap: Literal["skip", "queue", "allow"] = "skip"
+    timeout_s: float = 0.0  # 0 = use cron.defaultTimeoutS
+    # Runs missed while the gateway was down: "run_once" on startup (within
+    # cron.misfireGraceS) or "skip" to the next scheduled time
+    misfire: Literal["run_once", "skip"] = "run_once"
 
 
 @dataclass
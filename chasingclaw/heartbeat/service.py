@@ -1,11 +1,17 @@
 """Heartbeat service - periodic agent wake-up to check for tasks."""
 
 import asyncio
+import hashlib
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Coroutine
+from typing import TYPE_CHECKING, Any, Callable, Coroutine
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import HeartbeatConfig
+
 # Default interval: 30 minutes
 DEFAULT_HEARTBEAT_INTERVAL_S = 30 * 60
 
@@ -35,12 +41,24 @@ def _is_heartbeat_empty(content: str | None) -> bool:
     return True
 
 
+def _heartbeat_prompt(digest: str | None) -> str:
+    """The heartbeat prompt, tagged with the file revision so cached replies never outlive an edit."""
+    if not digest:
+        return HEARTBEAT_PROMPT
+    return f"{HEARTBEAT_PROMPT}\n(HEARTBEAT.md revision {digest[:12]})"
+
+
 class HeartbeatService:
     """
     Periodic heartbeat service that wakes the agent to check for tasks.
     
     The agent reads HEARTBEAT.md from the workspace and executes any
     tasks listed there. If nothing needs attention, it replies HEARTBEAT_OK.
+
+    To save tokens, a tick is skipped when the file is unchanged since a
+    HEARTBEAT_OK reply within the same local time window, the interval
+    grows after consecutive OK replies, and editing the file wakes the
+    service early (its mtime is polled every poll_s seconds).
     """
     
     def __init__(
@@ -49,18 +67,54 @@ class HeartbeatService:
         on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
         interval_s: int = DEFAULT_HEARTBEAT_INTERVAL_S,
         enabled: bool = True,
+        max_interval_s: int | None = None,
+        backoff_factor: float = 2.0,
+        window_s: int = 3600,
+        poll_s: float = 10.0,
     ):
         self.workspace = workspace
         self.on_heartbeat = on_heartbeat
         self.interval_s = interval_s
         self.enabled = enabled
+        self.max_interval_s = max(interval_s, max_interval_s or interval_s)
+        self.backoff_factor = backoff_factor
+        self.window_s = window_s
+        self.poll_s = poll_s
         self._running = False
         self._task: asyncio.Task | None = None
+        self._ok_streak = 0
+        self._last_digest: str | None = None
+        self._last_window: int | None = None
+        self._last_ok = False
+        self._file_stat: tuple[int, int] | None = None
+
+    @classmethod
+    def from_config(
+        cls,
+        workspace: Path,
+        config: "HeartbeatConfig",
+        on_heartbeat: Callable[[str], Coroutine[Any, Any, str]] | None = None,
+    ) -> "HeartbeatService":
+        return cls(
+            workspace=workspace,
+            on_heartbeat=on_heartbeat,
+            interval_s=config.interval_s,
+            enabled=config.enabled,
+            max_interval_s=config.max_interval_s,
+            backoff_factor=config.backoff_factor,
+            window_s=config.window_s,
+            poll_s=config.poll_s,
+        )
     
     @property
     def heartbeat_file(self) -> Path:
         return self.workspace / "HEARTBEAT.md"
     
+    @property
+    def current_interval_s(self) -> float:
+        """Sleep before the next tick: the base interval, backed off after OK replies."""
+        return min(self.interval_s * self.backoff_factor ** self._ok_streak, self.max_interval_s)
+
     def _read_heartbeat_file(self) -> str | None:
         """Read HEARTBEAT.md content."""
         if self.heartbeat_file.exists():
@@ -70,6 +124,29 @@ class HeartbeatService:
                 return None
         return None
     
+    def _stat_heartbeat_file(self) -> tuple[int, int] | None:
+        try:
+            st = self.heartbeat_file.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _file_changed(self) -> bool:
+        """Whether HEARTBEAT.md was edited since the last check."""
+        stat = self._stat_heartbeat_file()
+        changed = stat != self._file_stat
+        self._file_stat = stat
+        return changed
+
+    def _current_window(self) -> int:
+        """Index of the local time window (e.g. the hour) we are in."""
+        if self.window_s <= 0:
+            return 0
+        local = datetime.now().astimezone()
+        offset = local.utcoffset()
+        seconds = local.timestamp() + (offset.total_seconds() if offset else 0)
+        return int(seconds // self.window_s)
+
     async def start(self) -> None:
         """Start the heartbeat service."""
         if not self.enabled:
@@ -77,6 +154,7 @@ class HeartbeatService:
             return
         
         self._running = True
+        self._file_stat = self._stat_heartbeat_file()
         self._task = asyncio.create_task(self._run_loop())
         logger.info(f"Heartbeat started (every {self.interval_s}s)")
     
@@ -91,7 +169,7 @@ class HeartbeatService:
         """Main heartbeat loop."""
         while self._running:
             try:
-                await asyncio.sleep(self.interval_s)
+                await self._wait(self.current_interval_s)
                 if self._running:
                     await self._tick()
             except asyncio.CancelledError:
@@ -99,6 +177,18 @@ class HeartbeatService:
             except Exception as e:
                 logger.error(f"Heartbeat error: {e}")
     
+    async def _wait(self, delay_s: float) -> None:
+        """Sleep until the next tick is due, or until HEARTBEAT.md is edited."""
+        deadline = time.monotonic() + delay_s
+        while (remaining := deadline - time.monotonic()) > 0:
+            if self.poll_s <= 0:
+                await asyncio.sleep(remaining)
+                return
+            await asyncio.sleep(min(remaining, self.poll_s))
+            if self._file_changed():
+                logger.debug("Heartbeat: HEARTBEAT.md changed, checking now")
+                return
+
     async def _tick(self) -> None:
         """Execute a single heartbeat tick."""
         content = self._read_heartbeat_file()
@@ -108,23 +198,39 @@ class HeartbeatService:
             logger.debug("Heartbeat: no tasks (HEARTBEAT.md empty)")
             return
         
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        window = self._current_window()
+        if digest == self._last_digest and self._last_ok and window == self._last_window:
+            logger.debug("Heartbeat: HEARTBEAT.md unchanged since last OK, skipping")
+            return
+        if digest != self._last_digest:
+            # New instructions: check at the base interval again
+            self._ok_streak = 0
+
         logger.info("Heartbeat: checking for tasks...")
         
         if self.on_heartbeat:
+            ok = False
             try:
-                response = await self.on_heartbeat(HEARTBEAT_PROMPT)
+                response = await self.on_heartbeat(_heartbeat_prompt(digest))
                 
                 # Check if agent said "nothing to do"
-                if HEARTBEAT_OK_TOKEN.replace("_", "") in response.upper().replace("_", ""):
+                ok = HEARTBEAT_OK_TOKEN.replace("_", "") in (response or "").upper().replace("_", "")
+                if ok:
                     logger.info("Heartbeat: OK (no action needed)")
                 else:
                     logger.info(f"Heartbeat: completed task")
                     
             except Exception as e:
                 logger.error(f"Heartbeat execution failed: {e}")
+
+            self._last_digest, self._last_window, self._last_ok = digest, window, ok
+            self._ok_streak = self._ok_streak + 1 if ok else 0
     
     async def trigger_now(self) -> str | None:
         """Manually trigger a heartbeat."""
         if self.on_heartbeat:
-            return await self.on_heartbeat(HEARTBEAT_PROMPT)
+            content = self._read_heartbeat_file()
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest() if content else None
+            return await self.on_heartbeat(_heartbeat_prompt(digest))
         return None
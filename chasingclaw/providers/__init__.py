@@ -1,6 +1,13 @@
 """LLM provider abstraction module."""
 
 from chasingclaw.providers.base import LLMProvider, LLMResponse
-from chasingclaw.providers.litellm_provider import LiteLLMProvider
 
 __all__ = ["LLMProvider", "LLMResponse", "LiteLLMProvider"]
+
+
+def __getattr__(name: str):
+    # Keep `import chasingclaw.providers` cheap: the LiteLLM backend is loaded on demand.
+    if name == "LiteLLMProvider":
+        from chasingclaw.providers.litellm_provider import LiteLLMProvider
+        return LiteLLMProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,13 @@
 """Base LLM provider interface."""
 
+import asyncio
+import json
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any, Mapping
+
+if TYPE_CHECKING:
+    from chasingclaw.providers.ratelimit import RateLimiter
 
 
 @dataclass
@@ -21,6 +26,9 @@ class LLMResponse:
     finish_reason: str = "stop"
     usage: dict[str, int] = field(default_factory=dict)
     reasoning_content: str | None = None  # Kimi, DeepSeek-R1 etc.
+    queue_wait_s: float = 0.0  # Time spent waiting on the client-side rate limiter
+    error_kind: str | None = None  # Set with finish_reason="error": rate_limit, timeout, server, client, other
+    model: str | None = None  # Model that served the reply, as reported by the API or fallback chain
     
     @property
     def has_tool_calls(self) -> bool:
@@ -28,6 +36,56 @@ class LLMResponse:
         return len(self.tool_calls) > 0
 
 
+def parse_tool_arguments(args: Any) -> dict[str, Any]:
+    """Decode tool-call arguments; unparseable JSON is kept under "raw"."""
+    if isinstance(args, dict):
+        return args
+    try:
+        return json.loads(args) if args else {}
+    except json.JSONDecodeError:
+        return {"raw": args}
+
+
+class ToolCallAccumulator:
+    """
+    Assembles streamed tool-call deltas.
+
+    Calls arrive in index order, so a delta for a new index means every
+    earlier call is complete: add() returns those so they can be yielded
+    (and started) before the stream ends.
+    """
+
+    def __init__(self):
+        self._calls: dict[int, dict[str, str]] = {}
+        self._emitted: set[int] = set()
+
+    def add(self, index: int, call_id: str | None, name: str | None, arguments: str | None) -> list[ToolCallRequest]:
+        """Merge one delta. Returns calls completed by it (possibly empty)."""
+        completed: list[ToolCallRequest] = []
+        if index not in self._calls:
+            for idx in sorted(self._calls):
+                if idx < index and idx not in self._emitted:
+                    self._emitted.add(idx)
+                    completed.append(self._build(idx))
+            self._calls[index] = {"id": "", "name": "", "arguments": ""}
+        entry = self._calls[index]
+        if call_id:
+            entry["id"] += call_id
+        if name:
+            entry["name"] += name
+        if arguments:
+            entry["arguments"] += arguments
+        return completed
+
+    def _build(self, index: int) -> ToolCallRequest:
+        entry = self._calls[index]
+        return ToolCallRequest(id=entry["id"], name=entry["name"], arguments=parse_tool_arguments(entry["arguments"]))
+
+    def finish(self) -> list[ToolCallRequest]:
+        """All tool calls in index order (including ones already returned by add())."""
+        return [self._build(idx) for idx in sorted(self._calls)]
+
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -36,9 +94,15 @@ class LLMProvider(ABC):
     while maintaining a consistent interface.
     """
     
-    def __init__(self, api_key: str | None = None, api_base: str | None = None):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        rate_limiter: "RateLimiter | None" = None,
+    ):
         self.api_key = api_key
         self.api_base = api_base
+        self.rate_limiter = rate_limiter
     
     @abstractmethod
     async def chat(
@@ -68,3 +132,126 @@ class LLMProvider(ABC):
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+
+    def _sanitize_text(self, value: Any, limit: int = 1200) -> str:
+        text = str(value).strip()
+        if self.api_key:
+            text = text.replace(self.api_key, "***")
+        if len(text) > limit:
+            return text[:limit] + "...(truncated)"
+        return text
+
+    def _format_error(self, err: Exception, context: dict[str, Any] | None = None) -> str:
+        """Format provider errors with detailed diagnostics for UI debugging."""
+        if self._status_code(err) == 429:
+            return (
+                "The model provider is currently rate limiting requests (HTTP 429) "
+                "and retries did not succeed. Please try again in a moment."
+            )
+        lines: list[str] = ["Error calling LLM:"]
+        lines.append(f"- type: {type(err).__name__}")
+        lines.append(f"- message: {self._sanitize_text(err)}")
+
+        status = self._status_code(err)
+        if status is not None:
+            lines.append(f"- status: {status}")
+
+        response = getattr(err, "response", None)
+        if response is not None:
+            try:
+                body = response.text
+            except Exception:
+                body = ""
+            if body:
+                lines.append(f"- response_body: {self._sanitize_text(body)}")
+
+        for attr in ("body", "error", "message", "status_code"):
+            if not hasattr(err, attr):
+                continue
+            value = getattr(err, attr)
+            if value in (None, ""):
+                continue
+            if attr == "status_code" and status is not None:
+                continue
+            lines.append(f"- {attr}: {self._sanitize_text(value)}")
+
+        if context:
+            context_lines: list[str] = []
+            for key, value in context.items():
+                if value in (None, "", []):
+                    continue
+                context_lines.append(f"{key}={self._sanitize_text(value, limit=300)}")
+            if context_lines:
+                lines.append(f"- context: {'; '.join(context_lines)}")
+
+        return "\n".join(lines)
+
+    def _status_code(self, err: Exception) -> int | None:
+        response = getattr(err, "response", None)
+        status = getattr(response, "status_code", None) if response is not None else None
+        if status is None:
+            status = getattr(err, "status_code", None)
+        try:
+            return int(status) if status is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def _error_kind(self, err: BaseException) -> str:
+        """Classify a provider error so callers can decide whether to fall back."""
+        status = self._status_code(err) if isinstance(err, Exception) else None
+        if status == 429:
+            return "rate_limit"
+        if status is not None and status >= 500:
+            return "server"
+        name = type(err).__name__.lower()
+        if isinstance(err, (asyncio.TimeoutError, TimeoutError)) or "timeout" in name:
+            return "timeout"
+        if "ratelimit" in name:
+            return "rate_limit"
+        if any(key in name for key in ("connect", "unavailable", "internalserver", "serviceunavailable")):
+            return "server"
+        if status is not None and 400 <= status < 500:
+            return "client"
+        return "other"
+
+    @staticmethod
+    def _response_headers(obj: Any) -> Mapping[str, str] | None:
+        """Response headers of a provider result or exception, if available."""
+        headers = getattr(obj, "litellm_response_headers", None)
+        if headers:
+            return headers
+        hidden = getattr(obj, "_hidden_params", None)
+        if isinstance(hidden, dict) and hidden.get("additional_headers"):
+            return hidden["additional_headers"]
+        response = getattr(obj, "response", None)
+        headers = getattr(obj, "headers", None) or getattr(response, "headers", None)
+        return headers if headers else None
+
+    @staticmethod
+    def _parse_usage(usage: Any) -> dict[str, int]:
+        """
+        Normalize a usage object or dict to prompt/completion/total tokens,
+        plus cached_tokens and reasoning_tokens when the provider reports them.
+        """
+        if not usage:
+            return {}
+
+        def _get(obj: Any, key: str) -> Any:
+            return obj.get(key) if isinstance(obj, Mapping) else getattr(obj, key, None)
+
+        result: dict[str, int] = {}
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            value = _get(usage, key)
+            if isinstance(value, int):
+                result[key] = value
+
+        # OpenAI-style details; Anthropic (via LiteLLM) reports cache reads separately.
+        cached = _get(_get(usage, "prompt_tokens_details") or {}, "cached_tokens")
+        if not isinstance(cached, int) or not cached:
+            cached = _get(usage, "cache_read_input_tokens")
+        if isinstance(cached, int) and cached:
+            result["cached_tokens"] = cached
+        reasoning = _get(_get(usage, "completion_tokens_details") or {}, "reasoning_tokens")
+        if isinstance(reasoning, int) and reasoning:
+            result["reasoning_tokens"] = reasoning
+        return result
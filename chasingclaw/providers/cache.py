@@ -0,0 +1,202 @@
+"""Opt-in response cache for repeated, tool-free prompts (cron jobs, heartbeats)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import replace
+from typing import Any, Iterator
+
+from loguru import logger
+
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+# Set by callers (e.g. a cron job with cache enabled) around agent calls.
+_cache_enabled: ContextVar[bool] = ContextVar("chasingclaw_response_cache", default=False)
+
+# "2026-10-19 14:05 (Monday)" in the system prompt -> keep the date only,
+# so the key is stable for a day instead of changing every minute.
+_CLOCK_RE = re.compile(r"(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}(?::\d{2})?")
+
+
+@contextmanager
+def response_cache(enabled: bool = True) -> Iterator[None]:
+    """Allow (or forbid) cached responses for LLM calls made inside this block."""
+    token = _cache_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _cache_enabled.reset(token)
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(_CLOCK_RE.sub(r"\1", content).split())
+    return content
+
+
+def cache_key(
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]] | None,
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    """
+    Hash of the stable prompt: model, settings, system prompt and the
+    current turn (from the last user message on).
+
+    Session history is left out on purpose: a cron job or heartbeat that
+    repeats the same prompt grows its history on every run, which would
+    otherwise make each run a miss. Callers opt in to this with
+    response_cache() only for prompts whose reply may repeat.
+    """
+    last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=0)
+    prompt = [m for m in messages[:last_user] if m.get("role") == "system"] + messages[last_user:]
+    payload = {
+        "model": model,
+        "messages": [
+            {**m, "content": _normalize_content(m.get("content"))} for m in prompt
+        ],
+        "tools": tools or [],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded LRU of LLM responses with a TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[str, tuple[float, LLMResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> LLMResponse | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_s, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class CachingProvider(LLMProvider):
+    """
+    Serves repeated prompts from a ResponseCache.
+
+    Only used inside response_cache(); everywhere else calls pass straight
+    through. Only the opening call of a turn (no tool calls or results since
+    the last user message) is looked up, and only plain text replies are
+    stored, so a turn that runs tools is never answered from the cache.
+    """
+
+    def __init__(self, inner: LLMProvider, cache: ResponseCache):
+        super().__init__(inner.api_key, inner.api_base, inner.rate_limiter)
+        self.inner = inner
+        self.cache = cache
+
+    def get_default_model(self) -> str:
+        return self.inner.get_default_model()
+
+    @staticmethod
+    def _cacheable_request(messages: list[dict[str, Any]]) -> bool:
+        for message in reversed(messages):
+            if message.get("role") == "user":
+                return True
+            if message.get("role") == "tool" or message.get("tool_calls"):
+                return False
+        return False
+
+    @staticmethod
+    def _cacheable_response(response: LLMResponse) -> bool:
+        return response.finish_reason == "stop" and not response.has_tool_calls and bool(response.content)
+
+    def _lookup_key(self, messages, tools, model, max_tokens, temperature) -> str | None:
+        if not _cache_enabled.get() or not self._cacheable_request(messages):
+            return None
+        return cache_key(model or self.get_default_model(), messages, tools, max_tokens, temperature)
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """Send a chat request, answering from the cache when allowed."""
+        key = self._lookup_key(messages, tools, model, max_tokens, temperature)
+        if key:
+            cached = self.cache.get(key)
+            if cached:
+                logger.debug("Response cache hit")
+                return replace(cached, usage={}, queue_wait_s=0.0)
+        response = await self.inner.chat(
+            messages=messages, tools=tools, model=model, max_tokens=max_tokens, temperature=temperature
+        )
+        if key and self._cacheable_response(response):
+            self.cache.put(key, replace(response, usage={}))
+        return response
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ):
+        """Stream a chat completion; a cache hit is replayed as one token plus the response."""
+        key = self._lookup_key(messages, tools, model, max_tokens, temperature)
+        if key:
+            cached = self.cache.get(key)
+            if cached:
+                logger.debug("Response cache hit")
+                yield cached.content
+                yield replace(cached, usage={}, queue_wait_s=0.0)
+                return
+
+        kwargs = {"messages": messages, "tools": tools, "model": model, "max_tokens": max_tokens, "temperature": temperature}
+        if not hasattr(self.inner, "chat_stream"):
+            response = await self.inner.chat(**kwargs)
+            items = [response]
+        else:
+            items = self.inner.chat_stream(**kwargs)
+
+        async def _iter(source):
+            if isinstance(source, list):
+                for item in source:
+                    yield item
+            else:
+                async for item in source:
+                    yield item
+
+        async for item in _iter(items):
+            if key and isinstance(item, LLMResponse) and self._cacheable_response(item):
+                self.cache.put(key, replace(item, usage={}))
+            yield item
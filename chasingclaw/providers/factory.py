@@ -0,0 +1,147 @@
+"""Provider construction shared by the CLI and the WebUI."""
+
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from chasingclaw.providers.base import LLMProvider
+from chasingclaw.providers.ratelimit import RateLimiter
+
+# Shared across providers built from the same settings (the WebUI builds one per request).
+_response_caches: dict[tuple[float, int], Any] = {}
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import Config, RateLimitConfig
+
+
+def create_provider(
+    api_key: str | None = None,
+    api_base: str | None = None,
+    default_model: str = "anthropic/claude-opus-4-5",
+    extra_headers: dict[str, str] | None = None,
+    provider_name: str | None = None,
+    backend: str = "litellm",
+    rate_limit: "RateLimitConfig | None" = None,
+) -> LLMProvider:
+    """
+    Create the LLM provider for the given backend.
+
+    Args:
+        backend: "litellm" (default, multi-provider routing) or "http" (direct
+            OpenAI-compatible `/chat/completions` calls, no LiteLLM).
+        rate_limit: Client-side rate limiting settings (None = disabled).
+
+    Returns:
+        The provider instance.
+    """
+    rate_limiter = RateLimiter.from_config(rate_limit)
+    if (backend or "litellm").strip().lower() == "http":
+        from chasingclaw.providers.http_provider import OpenAICompatProvider
+        return OpenAICompatProvider(
+            api_key=api_key,
+            api_base=api_base,
+            default_model=default_model,
+            extra_headers=extra_headers,
+            rate_limiter=rate_limiter,
+        )
+
+    from chasingclaw.providers.litellm_provider import LiteLLMProvider
+    return LiteLLMProvider(
+        api_key=api_key,
+        api_base=api_base,
+        default_model=default_model,
+        extra_headers=extra_headers,
+        provider_name=provider_name,
+        rate_limiter=rate_limiter,
+    )
+
+
+def wrap_with_fallbacks(primary: LLMProvider, config: "Config") -> LLMProvider:
+    """
+    Wrap the primary provider with the configured fallback chain and hedging.
+
+    Args:
+        primary: Provider for the default model.
+        config: Root config; reads `providers.fallbacks`, `providers.requestTimeoutS`
+            and `providers.hedging`.
+
+    Returns:
+        A FallbackProvider, or the primary itself when nothing is configured.
+    """
+    providers = config.providers
+    if not providers.fallbacks and providers.request_timeout_s <= 0:
+        return primary
+
+    from chasingclaw.providers.fallback import FallbackProvider, HedgePolicy
+    from chasingclaw.providers.registry import find_by_name
+
+    fallbacks: list[tuple[LLMProvider, str]] = []
+    for entry in providers.fallbacks:
+        name = entry.provider.strip().lower()
+        if name:
+            provider_cfg = getattr(providers, name, None)
+            if not hasattr(provider_cfg, "api_key"):
+                logger.warning(f"Unknown fallback provider '{entry.provider}', skipping {entry.model}")
+                continue
+            api_base = provider_cfg.api_base
+            spec = find_by_name(name)
+            if not api_base and spec and spec.is_gateway and spec.default_api_base:
+                api_base = spec.default_api_base
+        else:
+            provider_cfg = config.get_provider(entry.model)
+            api_base = config.get_api_base(entry.model)
+            name = config.get_provider_name(entry.model)
+        if not (provider_cfg and provider_cfg.api_key) and not entry.model.startswith("bedrock/"):
+            logger.warning(f"No API key for fallback model {entry.model}, skipping")
+            continue
+        provider = create_provider(
+            api_key=provider_cfg.api_key if provider_cfg else None,
+            api_base=api_base,
+            default_model=entry.model,
+            extra_headers=provider_cfg.extra_headers if provider_cfg else None,
+            provider_name=name,
+            backend=provider_cfg.backend if provider_cfg else "litellm",
+            rate_limit=provider_cfg.rate_limit if provider_cfg else None,
+        )
+        fallbacks.append((provider, entry.model))
+
+    h = providers.hedging
+    return FallbackProvider(
+        primary,
+        fallbacks,
+        request_timeout_s=providers.request_timeout_s,
+        hedge=HedgePolicy(
+            enabled=h.enabled,
+            percentile=h.percentile,
+            min_samples=h.min_samples,
+            initial_delay_s=h.initial_delay_s,
+            min_delay_s=h.min_delay_s,
+            max_delay_s=h.max_delay_s,
+        ),
+    )
+
+
+def wrap_with_cache(provider: LLMProvider, config: "Config") -> LLMProvider:
+    """
+    Wrap a provider with the opt-in response cache.
+
+    Args:
+        provider: Provider to wrap (usually the result of wrap_with_fallbacks).
+        config: Root config; reads `providers.responseCache`.
+
+    Returns:
+        A CachingProvider, or the provider itself when the cache is disabled.
+    """
+    cache_cfg = config.providers.response_cache
+    if not cache_cfg.enabled or cache_cfg.max_entries <= 0:
+        return provider
+
+    from chasingclaw.providers.cache import CachingProvider, ResponseCache
+
+    settings = (cache_cfg.ttl_s, cache_cfg.max_entries)
+    cache = _response_caches.get(settings)
+    if cache is None:
+        cache = _response_caches[settings] = ResponseCache(
+            max_entries=cache_cfg.max_entries, ttl_s=cache_cfg.ttl_s
+        )
+    return CachingProvider(provider, cache)
@@ -0,0 +1,301 @@
+"""Model fallback chain and latency hedging on top of other providers."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from loguru import logger
+
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+# Error kinds (LLMResponse.error_kind) that move on to the next candidate.
+FALLBACK_ERROR_KINDS = {"rate_limit", "timeout", "server"}
+
+Candidate = tuple[LLMProvider, str]
+
+
+class LatencyTracker:
+    """Sliding window of latencies with percentile lookup."""
+
+    def __init__(self, window: int = 200):
+        self.samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return ordered[index]
+
+
+@dataclass
+class HedgePolicy:
+    """When to send a backup request for a slow primary."""
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 20
+    initial_delay_s: float = 8.0  # Deadline until enough samples are collected
+    min_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+
+    def deadline(self, tracker: LatencyTracker) -> float:
+        """Seconds to wait for the primary before hedging."""
+        if len(tracker.samples) < self.min_samples:
+            return self.initial_delay_s
+        value = tracker.percentile(self.percentile) or self.initial_delay_s
+        return min(self.max_delay_s, max(self.min_delay_s, value))
+
+
+class FallbackProvider(LLMProvider):
+    """
+    Wraps a primary provider with an ordered chain of fallback models.
+
+    A candidate's result is used unless it failed with a rate limit, a
+    timeout or a server error, in which case the next candidate is tried.
+    With hedging enabled, a backup request goes to the first fallback when
+    the primary has not answered (chat) or produced its first token
+    (chat_stream) within a p95-based deadline; the slower one is cancelled.
+    """
+
+    def __init__(
+        self,
+        primary: LLMProvider,
+        fallbacks: list[Candidate],
+        request_timeout_s: float = 0.0,
+        hedge: HedgePolicy | None = None,
+    ):
+        super().__init__(primary.api_key, primary.api_base, primary.rate_limiter)
+        self.primary = primary
+        self.fallbacks = fallbacks
+        self.request_timeout_s = request_timeout_s
+        self.hedge = hedge or HedgePolicy()
+        self.response_latency = LatencyTracker()
+        self.first_token_latency = LatencyTracker()
+        self.stats = {"fallbacks": 0, "hedges": 0, "hedge_wins": 0}
+
+    def get_default_model(self) -> str:
+        return self.primary.get_default_model()
+
+    def _candidates(self, model: str | None) -> list[Candidate]:
+        return [(self.primary, model or self.primary.get_default_model())] + list(self.fallbacks)
+
+    @property
+    def _hedging(self) -> bool:
+        return self.hedge.enabled and bool(self.fallbacks)
+
+    @staticmethod
+    def _should_fall_back(response: Any) -> bool:
+        return (
+            isinstance(response, LLMResponse)
+            and response.finish_reason == "error"
+            and response.error_kind in FALLBACK_ERROR_KINDS
+        )
+
+    def _timeout_response(self, model: str) -> LLMResponse:
+        return LLMResponse(
+            content=f"Error calling LLM: {model} did not respond within {self.request_timeout_s:g}s",
+            finish_reason="error",
+            error_kind="timeout",
+            model=model,
+        )
+
+    # ------------------------------------------------------------------
+    # chat
+    # ------------------------------------------------------------------
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """Send a chat request, falling back (and hedging) across candidates."""
+        kwargs = {"messages": messages, "tools": tools, "max_tokens": max_tokens, "temperature": temperature}
+        candidates = self._candidates(model)
+        response: LLMResponse | None = None
+        i = 0
+        while i < len(candidates):
+            if i == 0 and self._hedging:
+                response, hedged = await self._hedged_chat(candidates[0], candidates[1], kwargs)
+                # A primary that failed before the hedge started leaves the backup untried
+                i = 2 if hedged else 1
+            else:
+                response = await self._call(candidates[i], kwargs)
+                i += 1
+            if not self._should_fall_back(response):
+                return response
+            if i < len(candidates):
+                self.stats["fallbacks"] += 1
+                logger.warning(f"LLM call failed ({response.error_kind}), falling back to {candidates[i][1]}")
+        return response
+
+    async def _call(self, candidate: Candidate, kwargs: dict[str, Any]) -> LLMResponse:
+        provider, model = candidate
+        start = time.monotonic()
+        try:
+            if self.request_timeout_s > 0:
+                response = await asyncio.wait_for(
+                    provider.chat(model=model, **kwargs), timeout=self.request_timeout_s
+                )
+            else:
+                response = await provider.chat(model=model, **kwargs)
+        except asyncio.TimeoutError:
+            return self._timeout_response(model)
+        if provider is self.primary and response.finish_reason != "error":
+            self.response_latency.record(time.monotonic() - start)
+        response.model = response.model or model
+        return response
+
+    async def _hedged_chat(
+        self, primary: Candidate, backup: Candidate, kwargs: dict[str, Any]
+    ) -> tuple[LLMResponse, bool]:
+        """Race primary and backup; also returns whether the backup was called."""
+        start = time.monotonic()
+        primary_task = asyncio.create_task(self._call(primary, kwargs))
+        deadline = self.hedge.deadline(self.response_latency)
+        done, _ = await asyncio.wait({primary_task}, timeout=deadline)
+        if done:
+            return primary_task.result(), False
+
+        self.stats["hedges"] += 1
+        logger.info(f"Primary model slower than {deadline:.1f}s, hedging with {backup[1]}")
+        backup_task = asyncio.create_task(self._call(backup, kwargs))
+        pending = {primary_task, backup_task}
+        response: LLMResponse | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    response = task.result()
+                    if not self._should_fall_back(response):
+                        if task is backup_task:
+                            self.stats["hedge_wins"] += 1
+                        return response, True
+            return response, True
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary_task in pending:
+                # Keep the slow sample so the deadline reflects the tail.
+                self.response_latency.record(time.monotonic() - start)
+
+    # ------------------------------------------------------------------
+    # chat_stream
+    # ------------------------------------------------------------------
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ):
+        """
+        Stream a chat completion (str tokens, then a final LLMResponse).
+
+        Falls back only while nothing has been yielded yet; hedging races
+        the first token of the primary against the first fallback.
+        """
+        kwargs = {"messages": messages, "tools": tools, "max_tokens": max_tokens, "temperature": temperature}
+        candidates = self._candidates(model)
+        i = 0
+        while i < len(candidates):
+            if i == 0 and self._hedging:
+                stream, first, hedged = await self._hedged_stream_start(candidates[0], candidates[1], kwargs)
+                i = 2 if hedged else 1
+            else:
+                stream, first = await self._stream_start(candidates[i], kwargs)
+                i += 1
+
+            if self._should_fall_back(first) and i < len(candidates):
+                await stream.aclose()
+                self.stats["fallbacks"] += 1
+                logger.warning(f"LLM stream failed ({first.error_kind}), falling back to {candidates[i][1]}")
+                continue
+
+            if first is not None:
+                yield first
+            async for item in stream:
+                yield item
+            return
+
+    async def _stream_of(self, candidate: Candidate, kwargs: dict[str, Any]) -> AsyncIterator[Any]:
+        provider, model = candidate
+        if hasattr(provider, "chat_stream"):
+            async for item in provider.chat_stream(model=model, **kwargs):
+                if isinstance(item, LLMResponse):
+                    item.model = item.model or model
+                yield item
+        else:
+            response = await provider.chat(model=model, **kwargs)
+            response.model = response.model or model
+            yield response
+
+    async def _first_item(self, candidate: Candidate, stream: AsyncIterator[Any]) -> Any:
+        """Wait for the first item of a stream, honoring the request timeout."""
+        try:
+            if self.request_timeout_s > 0:
+                return await asyncio.wait_for(anext(stream, None), timeout=self.request_timeout_s)
+            return await anext(stream, None)
+        except asyncio.TimeoutError:
+            return self._timeout_response(candidate[1])
+
+    async def _stream_start(self, candidate: Candidate, kwargs: dict[str, Any]) -> tuple[AsyncIterator[Any], Any]:
+        start = time.monotonic()
+        stream = self._stream_of(candidate, kwargs)
+        first = await self._first_item(candidate, stream)
+        if candidate[0] is self.primary and not (isinstance(first, LLMResponse) and first.finish_reason == "error"):
+            self.first_token_latency.record(time.monotonic() - start)
+        return stream, first
+
+    async def _hedged_stream_start(
+        self, primary: Candidate, backup: Candidate, kwargs: dict[str, Any]
+    ) -> tuple[AsyncIterator[Any], Any, bool]:
+        """Race first tokens; also returns whether the backup was called."""
+        start = time.monotonic()
+        streams = {"primary": self._stream_of(primary, kwargs)}
+        tasks = {"primary": asyncio.create_task(self._first_item(primary, streams["primary"]))}
+        deadline = self.hedge.deadline(self.first_token_latency)
+        done, _ = await asyncio.wait({tasks["primary"]}, timeout=deadline)
+        if done:
+            first = tasks["primary"].result()
+            if not (isinstance(first, LLMResponse) and first.finish_reason == "error"):
+                self.first_token_latency.record(time.monotonic() - start)
+            return streams["primary"], first, False
+
+        self.stats["hedges"] += 1
+        logger.info(f"No first token within {deadline:.1f}s, hedging with {backup[1]}")
+        streams["backup"] = self._stream_of(backup, kwargs)
+        tasks["backup"] = asyncio.create_task(self._first_item(backup, streams["backup"]))
+
+        winner: str | None = None
+        first: Any = None
+        pending = set(tasks.values())
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for name, task in tasks.items():
+                if task in done and winner is None:
+                    first = task.result()
+                    if not (self._should_fall_back(first) and pending):
+                        winner = name
+        winner = winner or "primary"
+
+        # Cancel and close the loser.
+        loser = "backup" if winner == "primary" else "primary"
+        tasks[loser].cancel()
+        await asyncio.gather(tasks[loser], return_exceptions=True)
+        await streams[loser].aclose()
+        if winner == "backup":
+            self.stats["hedge_wins"] += 1
+            self.first_token_latency.record(time.monotonic() - start)
+        return streams[winner], first, True
@@ -0,0 +1,347 @@
+"""Direct OpenAI-compatible HTTP provider (no LiteLLM)."""
+
+import asyncio
+import json
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator
+
+import httpx
+
+from chasingclaw.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    ToolCallAccumulator,
+    ToolCallRequest,
+    parse_tool_arguments,
+)
+from chasingclaw.providers.ratelimit import RateLimiter, estimate_tokens
+from chasingclaw.providers.registry import OPENAI_COMPAT_PREFIXES, find_model_overrides
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+
+class OpenAICompatProvider(LLMProvider):
+    """
+    LLM provider that talks to an OpenAI-compatible `/chat/completions`
+    endpoint directly over a pooled httpx.AsyncClient.
+
+    Meant for single-endpoint deployments (e.g. an intranet vLLM/OpenAI
+    gateway) where LiteLLM's model resolution and parameter mapping are not
+    needed. Supports streaming (SSE) and tool calls.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        default_model: str = "gpt-4o",
+        extra_headers: dict[str, str] | None = None,
+        timeout: float = 120.0,
+        max_connections: int = 20,
+        transport: httpx.AsyncBaseTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ):
+        super().__init__(api_key, (api_base or DEFAULT_API_BASE).rstrip("/"), rate_limiter)
+        self.default_model = default_model
+        self.extra_headers = extra_headers or {}
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        # Cleared once the server turns out to reject stream_options
+        self._stream_usage = True
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, recreating it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop or self._client.is_closed:
+            headers = {"Content-Type": "application/json", **self.extra_headers}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            self._client = httpx.AsyncClient(
+                base_url=self.api_base,
+                headers=headers,
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        """Close the underlying HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _resolve_model(self, model: str) -> str:
+        """Strip routing prefixes (openai/, hosted_vllm/, ...) that only LiteLLM understands."""
+        if "/" in model:
+            prefix, rest = model.split("/", 1)
+            if rest and (prefix == "openai" or prefix in OPENAI_COMPAT_PREFIXES):
+                return rest
+        return model
+
+    def _build_body(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> dict[str, Any]:
+        body: dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+        # Apply model-specific overrides (e.g. kimi-k2.5 temperature)
+        body.update(find_model_overrides(model))
+
+        if tools:
+            body["tools"] = tools
+            body["tool_choice"] = "auto"
+        return body
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions in OpenAI format.
+            model: Model identifier.
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+
+        Returns:
+            LLMResponse with content and/or tool calls.
+        """
+        model = self._resolve_model(model or self.default_model)
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+
+        retried_without_tools = False
+        try:
+            return self._parse_response(*await self._post(body))
+        except Exception as e:
+            # Some OpenAI-compatible servers reject tool definitions with a 400.
+            if tools and self._status_code(e) == 400:
+                retried_without_tools = True
+                body.pop("tools", None)
+                body.pop("tool_choice", None)
+                try:
+                    return self._parse_response(*await self._post(body))
+                except Exception as retry_err:
+                    e = retry_err
+            return LLMResponse(
+                content=self._format_error(
+                    e,
+                    context={
+                        "provider_name": "openai (http)",
+                        "api_base": self.api_base,
+                        "model": model,
+                        "tools_count": len(tools or []),
+                        "retried_without_tools": retried_without_tools,
+                    },
+                ),
+                finish_reason="error",
+                error_kind=self._error_kind(e),
+            )
+
+    async def chat_stream(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ):
+        """
+        Stream a chat completion. Yields str tokens during text generation,
+        a ToolCallRequest as soon as each tool call (but the last) is complete,
+        then LLMResponse as the final item (with all tool_calls, if any).
+        """
+        model = self._resolve_model(model or self.default_model)
+        body = self._build_body(messages, tools, model, max_tokens, temperature)
+        body["stream"] = True
+        if self._stream_usage:
+            body["stream_options"] = {"include_usage": True}
+
+        try:
+            content_parts: list[str] = []
+            reasoning_parts: list[str] = []
+            tool_calls = ToolCallAccumulator()
+            finish_reason = None
+            usage: dict[str, int] = {}
+            served_model = None
+            stats = {"queue_wait_s": 0.0}
+
+            async for chunk in self._stream_chunks(body, stats):
+                served_model = chunk.get("model") or served_model
+                if chunk.get("usage"):
+                    usage = self._parse_usage(chunk["usage"])
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                choice = choices[0]
+                finish_reason = choice.get("finish_reason") or finish_reason
+                delta = choice.get("delta") or {}
+
+                # Accumulate tool call fragments, yielding each call once the next one starts
+                for tc_delta in delta.get("tool_calls") or []:
+                    function = tc_delta.get("function") or {}
+                    for completed in tool_calls.add(
+                        tc_delta.get("index", 0), tc_delta.get("id"), function.get("name"), function.get("arguments")
+                    ):
+                        yield completed
+
+                if delta.get("reasoning_content"):
+                    reasoning_parts.append(delta["reasoning_content"])
+
+                # Stream text tokens
+                text = delta.get("content")
+                if text:
+                    content_parts.append(text)
+                    yield text
+
+            calls = tool_calls.finish()
+            yield LLMResponse(
+                content="".join(content_parts) or None,
+                tool_calls=calls,
+                finish_reason=finish_reason or ("tool_calls" if calls else "stop"),
+                usage=usage,
+                reasoning_content="".join(reasoning_parts) or None,
+                queue_wait_s=stats["queue_wait_s"],
+                model=served_model,
+            )
+        except Exception as e:
+            yield LLMResponse(
+                content=self._format_error(e, context={"model": model, "api_base": self.api_base}),
+                finish_reason="error",
+                error_kind=self._error_kind(e),
+            )
+
+    async def _post(self, body: dict[str, Any]) -> tuple[dict[str, Any], float]:
+        """POST a completion request. Returns (JSON body, queue wait seconds)."""
+        async def _send() -> httpx.Response:
+            response = await self._get_client().post("/chat/completions", json=body)
+            response.raise_for_status()
+            return response
+
+        if not self.rate_limiter:
+            return (await _send()).json(), 0.0
+        response, wait = await self.rate_limiter.execute(
+            body["model"],
+            estimate_tokens(body["messages"], body.get("max_tokens", 0)),
+            _send,
+            status_of=self._status_code,
+            headers_of=self._response_headers,
+            usage_of=lambda r: (r.json().get("usage") or {}).get("total_tokens"),
+        )
+        return response.json(), wait
+
+    async def _stream_chunks(self, body: dict[str, Any], stats: dict[str, float]) -> AsyncIterator[dict[str, Any]]:
+        """
+        _stream, retried once without stream_options if the server rejects
+        them with a 400; a retry that goes through is remembered.
+        """
+        try:
+            async for payload in self._stream(body, stats):
+                yield payload
+            return
+        except httpx.HTTPStatusError as e:
+            if "stream_options" not in body or e.response.status_code != 400:
+                raise
+        body = {k: v for k, v in body.items() if k != "stream_options"}
+        async for payload in self._stream(body, stats):
+            self._stream_usage = False
+            yield payload
+
+    async def _stream(self, body: dict[str, Any], stats: dict[str, float]) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield parsed SSE `data:` payloads until [DONE], recording queue wait in stats.
+
+        The rate-limit ticket is settled with the stream's final usage.
+        """
+        limiter = self.rate_limiter
+        attempts = limiter.max_retries + 1 if limiter else 1
+        for attempt in range(attempts):
+            async with AsyncExitStack() as stack:
+                if limiter:
+                    ticket = await stack.enter_async_context(
+                        limiter.acquire(body["model"], estimate_tokens(body["messages"], body.get("max_tokens", 0)))
+                    )
+                    stats["queue_wait_s"] += ticket.wait_s
+                response = await stack.enter_async_context(
+                    self._get_client().stream("POST", "/chat/completions", json=body)
+                )
+                if response.is_error:
+                    await response.aread()
+                    if limiter and response.status_code == 429 and attempt + 1 < attempts:
+                        limiter.throttle(body["model"], response.headers, attempt)
+                        continue
+                    response.raise_for_status()
+                if limiter:
+                    limiter.observe_headers(body["model"], response.headers)
+                total_tokens = None
+                try:
+                    async for payload in self._iter_sse(response):
+                        if payload.get("usage"):
+                            total_tokens = payload["usage"].get("total_tokens")
+                        yield payload
+                finally:
+                    if limiter:
+                        ticket.settle(total_tokens)
+                return
+
+    @staticmethod
+    async def _iter_sse(response: httpx.Response) -> AsyncIterator[dict[str, Any]]:
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            if data:
+                yield json.loads(data)
+
+    def _parse_response(self, data: dict[str, Any], queue_wait_s: float = 0.0) -> LLMResponse:
+        """Parse a /chat/completions JSON body into our standard format."""
+        choice = data["choices"][0]
+        message = choice.get("message") or {}
+
+        tool_calls = [
+            ToolCallRequest(
+                id=tc.get("id", ""),
+                name=(tc.get("function") or {}).get("name", ""),
+                arguments=parse_tool_arguments((tc.get("function") or {}).get("arguments")),
+            )
+            for tc in message.get("tool_calls") or []
+        ]
+
+        return LLMResponse(
+            content=message.get("content"),
+            tool_calls=tool_calls,
+            finish_reason=choice.get("finish_reason") or "stop",
+            usage=self._parse_usage(data.get("usage") or {}),
+            reasoning_content=message.get("reasoning_content"),
+            queue_wait_s=queue_wait_s,
+            model=data.get("model"),
+        )
+
+    def get_default_model(self) -> str:
+        """Get the default model."""
+        return self.default_model
@@ -2,26 +2,42 @@
 
 import json
 import os
+from contextlib import asynccontextmanager
 from typing import Any
 
-import litellm
-from litellm import acompletion
+from chasingclaw.providers.base import LLMProvider, LLMResponse, ToolCallAccumulator, ToolCallRequest
+from chasingclaw.providers.ratelimit import RateLimiter, estimate_tokens
+from chasingclaw.providers.registry import (
+    OPENAI_COMPAT_PREFIXES,
+    find_by_model,
+    find_by_name,
+    find_gateway,
+    find_model_overrides,
+)
 
-from chasingclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
-from chasingclaw.providers.registry import PROVIDERS, find_by_model, find_by_name, find_gateway
 
+_litellm = None
 
-OPENAI_COMPAT_PREFIXES = {
-    spec.name for spec in PROVIDERS if spec.name
-}.union(
-    spec.litellm_prefix for spec in PROVIDERS if spec.litellm_prefix
-).union(
-    {
-        # Common aliases seen in model strings.
-        "zhipu",
-        "hosted_vllm",
-    }
-)
+
+def _load_litellm():
+    """
+    Import litellm on first use.
+
+    Importing litellm takes seconds, so commands that never call a model
+    (status, cron list, ...) should not pay for it.
+    """
+    global _litellm
+    if _litellm is None:
+        # Use the bundled model cost map instead of fetching it at import time.
+        os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+        import litellm
+
+        # Disable LiteLLM logging noise
+        litellm.suppress_debug_info = True
+        # Drop unsupported parameters for providers (e.g., gpt-5 rejects some params)
+        litellm.drop_params = True
+        _litellm = litellm
+    return _litellm
 
 
 class LiteLLMProvider(LLMProvider):
@@ -40,8 +56,9 @@ class LiteLLMProvider(LLMProvider):
         default_model: str = "anthropic/claude-opus-4-5",
         extra_headers: dict[str, str] | None = None,
         provider_name: str | None = None,
+        rate_limiter: RateLimiter | None = None,
     ):
-        super().__init__(api_key, api_base)
+        super().__init__(api_key, api_base, rate_limiter)
         self.default_model = default_model
         self.extra_headers = extra_headers or {}
         self.provider_name = (provider_name or "").strip().lower()
@@ -50,19 +67,31 @@ class LiteLLMProvider(LLMProvider):
         # provider_name (from config key) is the primary signal;
         # api_key / api_base are fallback for auto-detection.
         self._gateway = find_gateway(provider_name, api_key, api_base)
+        self._resolved_models: dict[str, str] = {}
+        # Cleared once the endpoint turns out to reject stream_options
+        self._stream_usage = True
         
         # Configure environment variables
         if api_key:
             self._setup_env(api_key, api_base, default_model)
-        
-        if api_base:
-            litellm.api_base = api_base
-        
-        # Disable LiteLLM logging noise
-        litellm.suppress_debug_info = True
-        # Drop unsupported parameters for providers (e.g., gpt-5 rejects some params)
-        litellm.drop_params = True
-    
+
+    async def _acompletion(self, **kwargs: Any) -> Any:
+        """Call litellm.acompletion, importing litellm on first use."""
+        return await _load_litellm().acompletion(**kwargs)
+
+    async def _limited_completion(self, kwargs: dict[str, Any]) -> tuple[Any, float]:
+        """Call acompletion through the rate limiter. Returns (response, queue wait seconds)."""
+        if not self.rate_limiter:
+            return await self._acompletion(**kwargs), 0.0
+        return await self.rate_limiter.execute(
+            kwargs["model"],
+            estimate_tokens(kwargs["messages"], kwargs.get("max_tokens", 0)),
+            lambda: self._acompletion(**kwargs),
+            status_of=self._status_code,
+            headers_of=self._response_headers,
+            usage_of=lambda r: getattr(getattr(r, "usage", None), "total_tokens", None),
+        )
+
     def _setup_env(self, api_key: str, api_base: str | None, model: str) -> None:
         """Set environment variables based on detected provider."""
         spec = self._gateway
@@ -89,7 +118,14 @@ class LiteLLMProvider(LLMProvider):
             os.environ.setdefault(env_name, resolved)
     
     def _resolve_model(self, model: str) -> str:
-        """Resolve model name by applying provider/gateway prefixes."""
+        """Resolve model name by applying provider/gateway prefixes (memoized per model)."""
+        resolved = self._resolved_models.get(model)
+        if resolved is None:
+            resolved = self._resolved_models[model] = self._route_model(model)
+        return resolved
+
+    def _route_model(self, model: str) -> str:
+        """Apply provider/gateway prefixes to a model name."""
         # In OpenAI-compatible mode, always route through openai/.
         # If model has a known provider prefix (e.g. anthropic/claude-*), strip it first.
         if self.provider_name == "openai" and self.api_base:
@@ -123,72 +159,8 @@ class LiteLLMProvider(LLMProvider):
     
     def _apply_model_overrides(self, model: str, kwargs: dict[str, Any]) -> None:
         """Apply model-specific parameter overrides from the registry."""
-        model_lower = model.lower()
-        spec = find_by_model(model)
-        if spec:
-            for pattern, overrides in spec.model_overrides:
-                if pattern in model_lower:
-                    kwargs.update(overrides)
-                    return
+        kwargs.update(find_model_overrides(model))
     
-    def _sanitize_text(self, value: Any, limit: int = 1200) -> str:
-        text = str(value).strip()
-        if self.api_key:
-            text = text.replace(self.api_key, "***")
-        if len(text) > limit:
-            return text[:limit] + "...(truncated)"
-        return text
-
-    def _format_error(self, err: Exception, context: dict[str, Any] | None = None) -> str:
-        """Format provider errors with detailed diagnostics for UI debugging."""
-        lines: list[str] = ["Error calling LLM:"]
-        lines.append(f"- type: {type(err).__name__}")
-        lines.append(f"- message: {self._sanitize_text(err)}")
-
-        status = self._status_code(err)
-        if status is not None:
-            lines.append(f"- status: {status}")
-
-        response = getattr(err, "response", None)
-        if response is not None:
-            try:
-                body = response.text
-            except Exception:
-                body = ""
-            if body:
-                lines.append(f"- response_body: {self._sanitize_text(body)}")
-
-        for attr in ("body", "error", "message", "status_code"):
-            if not hasattr(err, attr):
-                continue
-            value = getattr(err, attr)
-            if value in (None, ""):
-                continue
-            if attr == "status_code" and status is not None:
-                continue
-            lines.append(f"- {attr}: {self._sanitize_text(value)}")
-
-        if context:
-            context_lines: list[str] = []
-            for key, value in context.items():
-                if value in (None, "", []):
-                    continue
-                context_lines.append(f"{key}={self._sanitize_text(value, limit=300)}")
-            if context_lines:
-                lines.append(f"- context: {'; '.join(context_lines)}")
-
-        return "\n".join(lines)
-
-    def _status_code(self, err: Exception) -> int | None:
-        response = getattr(err, "response", None)
-        if response is None:
-            return None
-        status = getattr(response, "status_code", None)
-        try:
-            return int(status) if status is not None else None
-        except (TypeError, ValueError):
-            return None
-
     def _can_retry_without_tools(self, err: Exception, tools_used: bool) -> bool:
         """Retry once without tools for OpenAI-compatible intranet endpoints."""
         if not tools_used:
@@ -248,8 +220,8 @@ class LiteLLMProvider(LLMProvider):
 
         retried_without_tools = False
         try:
-            response = await acompletion(**kwargs)
-            return self._parse_response(response)
+            response, wait = await self._limited_completion(kwargs)
+            return self._parse_response(response, queue_wait_s=wait)
         except Exception as e:
             if self._can_retry_without_tools(e, tools_used=bool(tools)):
                 retried_without_tools = True
@@ -257,8 +229,8 @@ class LiteLLMProvider(LLMProvider):
                 retry_kwargs.pop("tools", None)
                 retry_kwargs.pop("tool_choice", None)
                 try:
-                    response = await acompletion(**retry_kwargs)
-                    return self._parse_response(response)
+                    response, wait = await self._limited_completion(retry_kwargs)
+                    return self._parse_response(response, queue_wait_s=wait)
                 except Exception as retry_err:
                     e = retry_err
             # Return error as content for graceful handling
@@ -274,6 +246,7 @@ class LiteLLMProvider(LLMProvider):
                     },
                 ),
                 finish_reason="error",
+                error_kind=self._error_kind(e),
             )
     
     async def chat_stream(
@@ -286,7 +259,8 @@ class LiteLLMProvider(LLMProvider):
     ):
         """
         Stream a chat completion. Yields str tokens during text generation,
-        then yields LLMResponse as the final item (with tool_calls if any).
+        a ToolCallRequest as soon as each tool call (but the last) is complete,
+        then LLMResponse as the final item (with all tool_calls, if any).
         """
         from typing import AsyncGenerator
         model = self._resolve_model(model or self.default_model)
@@ -298,6 +272,8 @@ class LiteLLMProvider(LLMProvider):
             "temperature": temperature,
             "stream": True,
         }
+        if self._stream_usage:
+            kwargs["stream_options"] = {"include_usage": True}
         self._apply_model_overrides(model, kwargs)
         # Remove stream from overrides if model doesn't support it
         if self.api_key:
@@ -311,65 +287,113 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tool_choice"] = "auto"
 
         try:
-            stream = await acompletion(**kwargs)
-            content_parts: list[str] = []
-            # accumulate tool call deltas: id -> {name, arguments}
-            tool_call_map: dict[int, dict] = {}
-
-            async for chunk in stream:
-                choice = chunk.choices[0] if chunk.choices else None
-                if not choice:
-                    continue
-                delta = choice.delta
-
-                # Accumulate tool call fragments
-                if hasattr(delta, "tool_calls") and delta.tool_calls:
-                    for tc_delta in delta.tool_calls:
-                        idx = tc_delta.index
-                        if idx not in tool_call_map:
-                            tool_call_map[idx] = {"id": "", "name": "", "arguments": ""}
-                        if tc_delta.id:
-                            tool_call_map[idx]["id"] += tc_delta.id
-                        if tc_delta.function:
-                            if tc_delta.function.name:
-                                tool_call_map[idx]["name"] += tc_delta.function.name
-                            if tc_delta.function.arguments:
-                                tool_call_map[idx]["arguments"] += tc_delta.function.arguments
-                    continue
-
-                # Stream text tokens
-                text = getattr(delta, "content", None)
-                if text:
-                    content_parts.append(text)
-                    yield text
-
-            # Build final response
-            tool_calls = []
-            for idx in sorted(tool_call_map):
-                entry = tool_call_map[idx]
-                args = entry["arguments"]
-                try:
-                    args = json.loads(args) if args else {}
-                except json.JSONDecodeError:
-                    args = {"raw": args}
-                tool_calls.append(ToolCallRequest(
-                    id=entry["id"],
-                    name=entry["name"],
-                    arguments=args,
-                ))
-            yield LLMResponse(
-                content="".join(content_parts) or None,
-                tool_calls=tool_calls,
-                finish_reason="tool_calls" if tool_calls else "stop",
-            )
+            started = False
+            try:
+                async for item in self._stream_items(model, kwargs):
+                    started = True
+                    yield item
+            except Exception as e:
+                # Some OpenAI-compatible servers reject stream_options with a 400.
+                if started or "stream_options" not in kwargs or self._status_code(e) != 400:
+                    raise
+                kwargs.pop("stream_options")
+                async for item in self._stream_items(model, kwargs):
+                    self._stream_usage = False
+                    yield item
         except Exception as e:
             # Yield error as final LLMResponse
             yield LLMResponse(
                 content=self._format_error(e, context={"model": model}),
                 finish_reason="error",
+                error_kind=self._error_kind(e),
             )
 
-    def _parse_response(self, response: Any) -> LLMResponse:
+    async def _stream_items(self, model: str, kwargs: dict[str, Any]):
+        """Open a stream and yield its items, settling the rate-limit ticket at the end."""
+        async with self._stream_slot(model, kwargs) as (stream, wait, ticket):
+            async for item in self._consume_stream(stream, wait):
+                if ticket and isinstance(item, LLMResponse):
+                    ticket.settle(item.usage.get("total_tokens"))
+                yield item
+
+    @asynccontextmanager
+    async def _stream_slot(self, model: str, kwargs: dict[str, Any]):
+        """
+        Open a stream, holding a rate-limiter slot until it is consumed.
+
+        Yields (stream, queue wait seconds, ticket); the caller settles the
+        ticket with the stream's final usage. The ticket is None without a
+        rate limiter.
+        """
+        if not self.rate_limiter:
+            yield await self._acompletion(**kwargs), 0.0, None
+            return
+        limiter = self.rate_limiter
+        waited = 0.0
+        for attempt in range(limiter.max_retries + 1):
+            async with limiter.acquire(model, estimate_tokens(kwargs["messages"], kwargs["max_tokens"])) as ticket:
+                waited += ticket.wait_s
+                try:
+                    stream = await self._acompletion(**kwargs)
+                except Exception as e:
+                    if self._status_code(e) != 429 or attempt >= limiter.max_retries:
+                        raise
+                    limiter.throttle(model, self._response_headers(e), attempt)
+                    continue
+                limiter.observe_headers(model, self._response_headers(stream))
+                yield stream, waited, ticket
+                return
+
+    async def _consume_stream(self, stream: Any, queue_wait_s: float):
+        """Yield text tokens from a LiteLLM stream, then the final LLMResponse."""
+        content_parts: list[str] = []
+        tool_call_acc = ToolCallAccumulator()
+        finish_reason = None
+        usage: dict[str, int] = {}
+        served_model = None
+
+        async for chunk in stream:
+            served_model = getattr(chunk, "model", None) or served_model
+            # With include_usage the last chunk carries usage and no choices.
+            if getattr(chunk, "usage", None):
+                usage = self._parse_usage(chunk.usage)
+            choice = chunk.choices[0] if chunk.choices else None
+            if not choice:
+                continue
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta
+
+            # Accumulate tool call fragments, yielding each call once the next one starts
+            if hasattr(delta, "tool_calls") and delta.tool_calls:
+                for tc_delta in delta.tool_calls:
+                    function = tc_delta.function
+                    for completed in tool_call_acc.add(
+                        tc_delta.index,
+                        tc_delta.id,
+                        function.name if function else None,
+                        function.arguments if function else None,
+                    ):
+                        yield completed
+                continue
+
+            # Stream text tokens
+            text = getattr(delta, "content", None)
+            if text:
+                content_parts.append(text)
+                yield text
+
+        # Build final response
+        tool_calls = tool_call_acc.finish()
+        yield LLMResponse(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason or ("tool_calls" if tool_calls else "stop"),
+            usage=usage,
+            queue_wait_s=queue_wait_s,
+            model=served_model,
+        )
+
+    def _parse_response(self, response: Any, queue_wait_s: float = 0.0) -> LLMResponse:
         """Parse LiteLLM response into our standard format."""
         choice = response.choices[0]
         message = choice.message
@@ -391,13 +415,7 @@ class LiteLLMProvider(LLMProvider):
                     arguments=args,
                 ))
         
-        usage = {}
-        if hasattr(response, "usage") and response.usage:
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            }
+        usage = self._parse_usage(getattr(response, "usage", None))
         
         reasoning_content = getattr(message, "reasoning_content", None)
         
@@ -407,6 +425,8 @@ class LiteLLMProvider(LLMProvider):
             finish_reason=choice.finish_reason or "stop",
             usage=usage,
             reasoning_content=reasoning_content,
+            queue_wait_s=queue_wait_s,
+            model=getattr(response, "model", None),
         )
     
     def get_default_model(self) -> str:
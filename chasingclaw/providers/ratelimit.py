@@ -0,0 +1,301 @@
+"""Client-side rate limiting for LLM providers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Mapping, TypeVar
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import RateLimitConfig
+
+T = TypeVar("T")
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse "1s", "6m0s", "20ms" or a plain number of seconds."""
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+    """Read Retry-After (seconds) or retry-after-ms from response headers."""
+    if not headers:
+        return None
+    ms = _header(headers, "retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000
+        except ValueError:
+            pass
+    return parse_duration(_header(headers, "retry-after"))
+
+
+def estimate_tokens(messages: list[dict[str, Any]], max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 chars per token) for a request."""
+    try:
+        chars = len(json.dumps(messages, ensure_ascii=False, default=str))
+    except (TypeError, ValueError):
+        chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + max_tokens
+
+
+def _header(headers: Mapping[str, str], name: str) -> str | None:
+    """Case-insensitive lookup that also accepts LiteLLM's "llm_provider-" prefix."""
+    lowered = {str(k).lower(): v for k, v in headers.items()}
+    value = lowered.get(name)
+    if value is None:
+        value = lowered.get(f"llm_provider-{name}")
+    return str(value) if value is not None else None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity per minute.
+
+    A capacity of 0 means unlimited until a limit is learned from headers.
+    """
+
+    def __init__(self, per_minute: int = 0):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.limited:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """Take amount tokens, waiting for refill if needed. Returns the wait in seconds."""
+        if not self.limited:
+            return 0.0
+        amount = min(amount, self.capacity)  # A single request larger than the bucket must still pass
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) * 60.0 / self.capacity
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def adjust(self, delta: float) -> None:
+        """Give back (positive) or charge extra (negative) tokens after the fact."""
+        if self.limited:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + delta)
+
+    def observe(self, limit: int | None, remaining: int | None, reset_s: float | None) -> None:
+        """Align the bucket with the server's view of the limit."""
+        if limit and limit > 0 and (not self.limited or limit < self.capacity):
+            learned = not self.limited
+            self.capacity = float(limit)
+            self.tokens = self.capacity if learned else min(self.tokens, self.capacity)
+        if remaining is not None and self.limited:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset_s:
+                # Empty until the reset; model it as debt repaid by the refill rate.
+                self.tokens = -reset_s * self.capacity / 60.0
+
+
+@dataclass
+class RateLimitTicket:
+    """A granted slot; settle() reconciles the token estimate with actual usage."""
+    model: str
+    estimated_tokens: int
+    wait_s: float
+    limiter: "RateLimiter"
+
+    def settle(self, actual_tokens: int | None) -> None:
+        if actual_tokens:
+            self.limiter._tokens(self.model).adjust(self.estimated_tokens - actual_tokens)
+
+
+class RateLimiter:
+    """
+    Per-model requests/min and tokens/min buckets plus a concurrency cap.
+
+    Limits start from config and are tightened by `x-ratelimit-*` response
+    headers. 429 responses are retried with jittered exponential backoff
+    that honors Retry-After.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 0,
+        max_retries: int = 3,
+        base_delay_s: float = 1.0,
+        max_retry_wait_s: float = 60.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay_s = base_delay_s
+        self.max_retry_wait_s = max_retry_wait_s
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._request_buckets: dict[str, TokenBucket] = {}
+        self._token_buckets: dict[str, TokenBucket] = {}
+        self._cooldown_until: dict[str, float] = {}
+        self.total_wait_s = 0.0
+        self.throttled = 0
+
+    @classmethod
+    def from_config(cls, config: "RateLimitConfig | None") -> "RateLimiter | None":
+        """Build a limiter from config, or None when rate limiting is disabled."""
+        if config is None or not config.enabled:
+            return None
+        return cls(
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_concurrency=config.max_concurrency,
+            max_retries=config.max_retries,
+            max_retry_wait_s=config.max_retry_wait_s,
+        )
+
+    def _requests(self, model: str) -> TokenBucket:
+        if model not in self._request_buckets:
+            self._request_buckets[model] = TokenBucket(self.requests_per_minute)
+        return self._request_buckets[model]
+
+    def _tokens(self, model: str) -> TokenBucket:
+        if model not in self._token_buckets:
+            self._token_buckets[model] = TokenBucket(self.tokens_per_minute)
+        return self._token_buckets[model]
+
+    @asynccontextmanager
+    async def acquire(self, model: str, estimated_tokens: int = 0) -> AsyncIterator[RateLimitTicket]:
+        """Wait for a request slot for this model (concurrency + RPM + TPM)."""
+        start = time.monotonic()
+        # After a 429 every caller for this model backs off, not just the one that got it.
+        cooldown = self._cooldown_until.get(model, 0.0) - start
+        if cooldown > 0:
+            await asyncio.sleep(cooldown)
+        if self._semaphore:
+            await self._semaphore.acquire()
+        try:
+            await self._requests(model).acquire(1)
+            await self._tokens(model).acquire(estimated_tokens)
+            wait = time.monotonic() - start
+            self.total_wait_s += wait
+            if wait > 1.0:
+                logger.debug(f"Rate limiter: waited {wait:.1f}s for {model}")
+            yield RateLimitTicket(model=model, estimated_tokens=estimated_tokens, wait_s=wait, limiter=self)
+        finally:
+            if self._semaphore:
+                self._semaphore.release()
+
+    def observe_headers(self, model: str, headers: Mapping[str, str] | None) -> None:
+        """Update the buckets from `x-ratelimit-*` headers."""
+        if not headers:
+            return
+
+        def _int(name: str) -> int | None:
+            value = _header(headers, name)
+            try:
+                return int(float(value)) if value is not None else None
+            except ValueError:
+                return None
+
+        self._requests(model).observe(
+            _int("x-ratelimit-limit-requests"),
+            _int("x-ratelimit-remaining-requests"),
+            parse_duration(_header(headers, "x-ratelimit-reset-requests")),
+        )
+        self._tokens(model).observe(
+            _int("x-ratelimit-limit-tokens"),
+            _int("x-ratelimit-remaining-tokens"),
+            parse_duration(_header(headers, "x-ratelimit-reset-tokens")),
+        )
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Delay before retry number `attempt` (0-based)."""
+        if retry_after is not None:
+            # Small jitter so concurrent callers don't all retry at the same instant.
+            return min(self.max_retry_wait_s, retry_after + random.uniform(0, 0.25 * self.base_delay_s))
+        delay = min(self.max_retry_wait_s, self.base_delay_s * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    async def execute(
+        self,
+        model: str,
+        estimated_tokens: int,
+        call: Callable[[], Awaitable[T]],
+        status_of: Callable[[Exception], int | None],
+        headers_of: Callable[[Any], Mapping[str, str] | None],
+        usage_of: Callable[[T], int | None] = lambda result: None,
+    ) -> tuple[T, float]:
+        """
+        Run call() under the limiter, retrying 429s.
+
+        Args:
+            status_of: Extracts the HTTP status from an exception.
+            headers_of: Extracts response headers from a result or exception.
+            usage_of: Extracts the actual total tokens from a result.
+
+        Returns:
+            (result, seconds spent waiting for slots and backoff).
+        """
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            async with self.acquire(model, estimated_tokens) as ticket:
+                waited += ticket.wait_s
+                try:
+                    result = await call()
+                except Exception as e:
+                    if status_of(e) != 429 or attempt >= self.max_retries:
+                        raise
+                    self.throttle(model, headers_of(e), attempt)
+                    continue
+                self.observe_headers(model, headers_of(result))
+                ticket.settle(usage_of(result))
+                return result, waited
+        raise RuntimeError("unreachable")
+
+    def throttle(self, model: str, headers: Mapping[str, str] | None, attempt: int) -> float:
+        """
+        Record a 429 and put the model in cooldown.
+
+        Returns:
+            The backoff delay in seconds; the next acquire() waits it out.
+        """
+        self.observe_headers(model, headers)
+        delay = self.backoff(attempt, retry_after_seconds(headers))
+        until = time.monotonic() + delay
+        self._cooldown_until[model] = max(self._cooldown_until.get(model, 0.0), until)
+        self.throttled += 1
+        logger.warning(f"Rate limited by provider ({model}), retrying in {delay:.1f}s")
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        return {"total_wait_s": round(self.total_wait_s, 3), "throttled": self.throttled}
@@ -13,7 +13,9 @@ Every entry writes out all fields so you can copy-paste as a template.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
 
 
 @dataclass(frozen=True)
@@ -305,21 +307,58 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
 
 
 # ---------------------------------------------------------------------------
-# Lookup helpers
+# Lookup helpers — tables built once at import; model lookups are memoized.
 # ---------------------------------------------------------------------------
 
+_BY_NAME: dict[str, ProviderSpec] = {spec.name: spec for spec in PROVIDERS}
+
+# (keyword, spec) for standard providers, in registry order.
+_MODEL_KEYWORDS: tuple[tuple[str, ProviderSpec], ...] = tuple(
+    (kw, spec)
+    for spec in PROVIDERS
+    if not (spec.is_gateway or spec.is_local)
+    for kw in spec.keywords
+)
+
+# Model-string prefixes that only LiteLLM understands; stripped when talking
+# to an OpenAI-compatible endpoint directly.
+OPENAI_COMPAT_PREFIXES: frozenset[str] = frozenset(
+    {spec.name for spec in PROVIDERS if spec.name}
+    | {spec.litellm_prefix for spec in PROVIDERS if spec.litellm_prefix}
+    | {
+        # Common aliases seen in model strings.
+        "zhipu",
+        "hosted_vllm",
+    }
+)
+
+_NO_OVERRIDES: Mapping[str, Any] = MappingProxyType({})
+
+
+@lru_cache(maxsize=1024)
 def find_by_model(model: str) -> ProviderSpec | None:
     """Match a standard provider by model-name keyword (case-insensitive).
     Skips gateways/local — those are matched by api_key/api_base instead."""
     model_lower = model.lower()
-    for spec in PROVIDERS:
-        if spec.is_gateway or spec.is_local:
-            continue
-        if any(kw in model_lower for kw in spec.keywords):
+    for kw, spec in _MODEL_KEYWORDS:
+        if kw in model_lower:
             return spec
     return None
 
 
+@lru_cache(maxsize=1024)
+def find_model_overrides(model: str) -> Mapping[str, Any]:
+    """Per-model parameter overrides (e.g. kimi-k2.5 temperature), read-only."""
+    spec = find_by_model(model)
+    if spec:
+        model_lower = model.lower()
+        for pattern, overrides in spec.model_overrides:
+            if pattern in model_lower:
+                return MappingProxyType(dict(overrides))
+    return _NO_OVERRIDES
+
+
+@lru_cache(maxsize=256)
 def find_gateway(
     provider_name: str | None = None,
     api_key: str | None = None,
@@ -341,7 +380,7 @@ def find_gateway(
         if spec and (spec.is_gateway or spec.is_local):
             return spec
 
-    # 2. Auto-detect by api_key prefix / api_base keyword
+    # 2. Auto-detect by api_key prefix / api_base keyword (registry order)
     for spec in PROVIDERS:
         if spec.detect_by_key_prefix and api_key and api_key.startswith(spec.detect_by_key_prefix):
             return spec
@@ -353,7 +392,4 @@ def find_gateway(
 
 def find_by_name(name: str) -> ProviderSpec | None:
     """Find a provider spec by config field name, e.g. "dashscope"."""
-    for spec in PROVIDERS:
-        if spec.name == name:
-            return spec
-    return None
+    return _BY_NAME.get(name)
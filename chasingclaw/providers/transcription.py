@@ -1,65 +1,293 @@
-"""Voice transcription provider using Groq."""
+"""Voice transcription: Groq Whisper API, optional local faster-whisper, and a shared service."""
 
+import asyncio
+import hashlib
+import importlib.util
 import os
+import shutil
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Protocol
 
 import httpx
 from loguru import logger
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import TranscriptionConfig
+
+
+class TranscriptionError(Exception):
+    """A backend failed to transcribe a file."""
+
+
+class TranscriptionBackend(Protocol):
+    name: str
+    # Whether the backend benefits from a smaller (downmixed/resampled) file.
+    wants_preprocessed: bool
+
+    async def transcribe_file(self, path: Path) -> str: ...
+
 
 class GroqTranscriptionProvider:
     """
     Voice transcription provider using Groq's Whisper API.
-    
+
     Groq offers extremely fast transcription with a generous free tier.
+    The HTTP client is created once and reused for every upload.
     """
-    
-    def __init__(self, api_key: str | None = None):
+
+    name = "groq"
+    wants_preprocessed = True
+
+    def __init__(self, api_key: str | None = None, model: str = "whisper-large-v3", timeout_s: float = 60.0):
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.api_url = "https://api.groq.com/openai/v1/audio/transcriptions"
-    
+        self.model = model
+        self.timeout_s = timeout_s
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout_s)
+        return self._client
+
+    async def transcribe_file(self, path: Path) -> str:
+        """Upload one file; raises TranscriptionError on any failure."""
+        if not self.api_key:
+            raise TranscriptionError("Groq API key not configured")
+        try:
+            with open(path, "rb") as f:
+                response = await self._get_client().post(
+                    self.api_url,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    files={"file": (path.name, f), "model": (None, self.model)},
+                )
+            response.raise_for_status()
+            return response.json().get("text", "")
+        except (httpx.HTTPError, OSError, ValueError) as e:
+            raise TranscriptionError(f"Groq transcription error: {e}") from e
+
     async def transcribe(self, file_path: str | Path) -> str:
         """
         Transcribe an audio file using Groq.
-        
+
         Args:
             file_path: Path to the audio file.
-            
+
         Returns:
-            Transcribed text.
+            Transcribed text ("" on failure).
         """
-        if not self.api_key:
-            logger.warning("Groq API key not configured for transcription")
+        path = Path(file_path)
+        if not path.exists():
+            logger.error(f"Audio file not found: {file_path}")
+            return ""
+        try:
+            return await self.transcribe_file(path)
+        except TranscriptionError as e:
+            logger.error(str(e))
             return ""
-        
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalWhisperBackend:
+    """
+    Offline transcription with faster-whisper on the CPU.
+
+    The model is loaded on first use and kept; decoding runs in a worker
+    thread so the event loop stays responsive.
+    """
+
+    name = "local"
+    wants_preprocessed = False  # faster-whisper decodes and resamples itself
+
+    def __init__(self, model: str = "base", compute_type: str = "int8"):
+        self.model_name = model
+        self.compute_type = compute_type
+        self._model: Any = None
+
+    @staticmethod
+    def available() -> bool:
+        return importlib.util.find_spec("faster_whisper") is not None
+
+    def _transcribe_sync(self, path: Path) -> str:
+        if self._model is None:
+            from faster_whisper import WhisperModel
+            self._model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type)
+        segments, _info = self._model.transcribe(str(path), vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+    async def transcribe_file(self, path: Path) -> str:
+        try:
+            return await asyncio.to_thread(self._transcribe_sync, path)
+        except Exception as e:
+            raise TranscriptionError(f"Local transcription error: {e}") from e
+
+
+async def downmix(path: Path, sample_rate: int = 16000) -> Path | None:
+    """
+    Re-encode audio as mono Opus at `sample_rate` with ffmpeg.
+
+    Returns:
+        Path of a temporary .ogg file (caller deletes it), or None when
+        ffmpeg is missing or fails.
+    """
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    fd, out_name = tempfile.mkstemp(suffix=".ogg", prefix="chasingclaw-audio-")
+    os.close(fd)
+    out = Path(out_name)
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg, "-y", "-loglevel", "error", "-i", str(path),
+        "-ac", "1", "-ar", str(sample_rate), "-c:a", "libopus", "-b:a", "24k", str(out),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await proc.communicate()
+    if proc.returncode != 0 or not out.exists() or out.stat().st_size == 0:
+        logger.debug(f"ffmpeg downmix failed: {stderr.decode(errors='replace').strip()[:200]}")
+        out.unlink(missing_ok=True)
+        return None
+    return out
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TranscriptionService:
+    """
+    Shared transcription entry point for all channels.
+
+    - At most `max_concurrency` files are transcribed at once.
+    - Results are cached by content hash, and identical files arriving
+      together share one request, so forwarded voice notes are free.
+    - Audio is downmixed/resampled with ffmpeg (if installed) before upload.
+    - Backends are tried in order; the first non-failing one wins.
+    """
+
+    def __init__(
+        self,
+        backends: list[TranscriptionBackend],
+        max_concurrency: int = 2,
+        cache_size: int = 256,
+        preprocess: bool = True,
+    ):
+        self.backends = backends
+        self.cache_size = cache_size
+        self.preprocess = preprocess
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        config: "TranscriptionConfig | None",
+        groq_api_key: str | None = None,
+    ) -> "TranscriptionService | None":
+        """Build the service from config, or None when transcription is disabled."""
+        if config is None:
+            backends: list[TranscriptionBackend] = [GroqTranscriptionProvider(groq_api_key)]
+            return cls(backends)
+        if not config.enabled:
+            return None
+
+        groq = GroqTranscriptionProvider(groq_api_key, model=config.groq_model, timeout_s=config.timeout_s)
+        local = LocalWhisperBackend(config.local_model, compute_type=config.local_compute_type)
+        backend = config.backend.strip().lower()
+        if backend == "groq":
+            backends = [groq]
+        elif backend == "local":
+            backends = [local]
+        else:  # "auto": Groq when a key is set, local faster-whisper when installed
+            backends = []
+            if groq.api_key:
+                backends.append(groq)
+            if LocalWhisperBackend.available():
+                backends.append(local)
+        return cls(
+            backends,
+            max_concurrency=config.max_concurrency,
+            cache_size=config.cache_size,
+            preprocess=config.preprocess,
+        )
+
+    async def transcribe(self, file_path: str | Path) -> str:
+        """
+        Transcribe an audio file.
+
+        Args:
+            file_path: Path to the audio file.
+
+        Returns:
+            Transcribed text, or "" when every backend failed (errors are logged).
+        """
         path = Path(file_path)
         if not path.exists():
             logger.error(f"Audio file not found: {file_path}")
             return ""
-        
+        if not self.backends:
+            logger.warning("No transcription backend configured (set a Groq API key or install faster-whisper)")
+            return ""
+
+        digest = await asyncio.to_thread(_file_digest, path)
+        if digest in self._cache:
+            self._cache.move_to_end(digest)
+            logger.debug(f"Transcription cache hit for {path.name}")
+            return self._cache[digest]
+        if digest in self._inflight:
+            return await asyncio.shield(self._inflight[digest])
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[digest] = future
         try:
-            async with httpx.AsyncClient() as client:
-                with open(path, "rb") as f:
-                    files = {
-                        "file": (path.name, f),
-                        "model": (None, "whisper-large-v3"),
-                    }
-                    headers = {
-                        "Authorization": f"Bearer {self.api_key}",
-                    }
-                    
-                    response = await client.post(
-                        self.api_url,
-                        headers=headers,
-                        files=files,
-                        timeout=60.0
-                    )
-                    
-                    response.raise_for_status()
-                    data = response.json()
-                    return data.get("text", "")
-                    
+            async with self._semaphore:
+                text = await self._run_backends(path)
+            if text and self.cache_size > 0:
+                self._cache[digest] = text
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except Exception as e:
-            logger.error(f"Groq transcription error: {e}")
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(digest, None)
+
+    async def _run_backends(self, path: Path) -> str:
+        converted: Path | None = None
+        try:
+            if self.preprocess and any(b.wants_preprocessed for b in self.backends):
+                converted = await downmix(path)
+            for backend in self.backends:
+                source = converted if (converted and backend.wants_preprocessed) else path
+                try:
+                    return await backend.transcribe_file(source)
+                except TranscriptionError as e:
+                    logger.warning(f"{e} ({backend.name}, {path.name})")
+            logger.error(f"All transcription backends failed for {path.name}")
             return ""
+        finally:
+            if converted:
+                converted.unlink(missing_ok=True)
+
+    async def close(self) -> None:
+        for backend in self.backends:
+            close = getattr(backend, "close", None)
+            if close:
+                await close()
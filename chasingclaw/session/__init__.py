@@ -1,5 +1,6 @@
 """Session management module."""
 
 from chasingclaw.session.manager import SessionManager, Session
+from chasingclaw.session.traces import TraceStore
 
-__all__ = ["SessionManager", "Session"]
+__all__ = ["SessionManager", "Session", "TraceStore"]
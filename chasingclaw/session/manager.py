@@ -1,15 +1,20 @@
 """Session management for conversation history."""
 
 import json
+import uuid
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
+from chasingclaw.session.traces import TraceStore
 from chasingclaw.utils.helpers import ensure_dir, safe_filename
 
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import TracesConfig
+
 
 @dataclass
 class Session:
@@ -62,12 +67,20 @@ class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are stored as JSONL files in the sessions directory. Tool traces
+    live in a separate TraceStore; messages only keep a "trace_ref" to them.
     """
     
-    def __init__(self, workspace: Path):
+    def __init__(self, workspace: Path, trace_config: "TracesConfig | None" = None):
+        from chasingclaw.config.schema import TracesConfig
         self.workspace = workspace
         self.sessions_dir = ensure_dir(Path.home() / ".chasingclaw" / "sessions")
+        self.trace_config = trace_config or TracesConfig()
+        self.traces = TraceStore(
+            Path.home() / ".chasingclaw" / "traces",
+            max_age_days=self.trace_config.max_age_days,
+            max_per_session=self.trace_config.max_per_session,
+        )
         self._cache: dict[str, Session] = {}
     
     def _get_session_path(self, key: str) -> Path:
@@ -133,9 +146,44 @@ class SessionManager:
             logger.warning(f"Failed to load session {key}: {e}")
             return None
     
+    def save_trace(self, key: str, events: list[dict[str, Any]]) -> str | None:
+        """
+        Store a turn's trace events in the trace store.
+
+        Args:
+            key: Session key.
+            events: Trace events of the turn.
+
+        Returns:
+            The reference to keep on the assistant message, or None if nothing was stored.
+        """
+        if not events or not self.trace_config.enabled:
+            return None
+        trace_ref = uuid.uuid4().hex[:12]
+        self.traces.append(key, trace_ref, events)
+        return trace_ref
+
+    def get_trace(self, key: str, message: dict[str, Any]) -> list[dict[str, Any]]:
+        """Get the trace of a message, whether stored inline (legacy) or by reference."""
+        if isinstance(message.get("trace"), list):
+            return message["trace"]
+        trace_ref = message.get("trace_ref")
+        if not trace_ref:
+            return []
+        return self.traces.get(key, str(trace_ref))
+
     def save(self, session: Session) -> None:
         """Save a session to disk."""
         path = self._get_session_path(session.key)
+
+        # Move legacy inline traces out of the history file. With traces
+        # disabled there is nowhere to move them, so they stay inline.
+        for msg in session.messages:
+            if isinstance(msg.get("trace"), list):
+                trace_ref = self.save_trace(session.key, msg["trace"])
+                if trace_ref:
+                    del msg["trace"]
+                    msg["trace_ref"] = trace_ref
         
         with open(path, "w") as f:
             # Write metadata first
@@ -165,6 +213,7 @@ class SessionManager:
         """
         # Remove from cache
         self._cache.pop(key, None)
+        self.traces.delete(key)
         
         # Remove file
         path = self._get_session_path(key)
@@ -0,0 +1,142 @@
+"""Append-only storage for tool execution traces."""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from chasingclaw.utils.helpers import ensure_dir, safe_filename
+
+
+class TraceStore:
+    """
+    Stores per-turn tool traces outside of the conversation history.
+
+    Each session gets its own append-only JSONL file; every line is one
+    assistant turn keyed by the message id that the session file references.
+    Retention (age and count) is enforced by compaction, independently of
+    the chat history itself.
+    """
+
+    def __init__(
+        self,
+        traces_dir: Path,
+        max_age_days: int = 30,
+        max_per_session: int = 200,
+    ):
+        self.traces_dir = ensure_dir(traces_dir)
+        self.max_age_days = max_age_days
+        self.max_per_session = max_per_session
+        self._line_counts: dict[Path, int] = {}
+
+    def _get_path(self, key: str) -> Path:
+        """Get the trace file path for a session."""
+        safe_key = safe_filename(key.replace(":", "_"))
+        return self.traces_dir / f"{safe_key}.jsonl"
+
+    def append(self, key: str, message_id: str, events: list[dict[str, Any]]) -> None:
+        """
+        Append the trace of one assistant message.
+
+        Args:
+            key: Session key.
+            message_id: Id of the assistant message the trace belongs to.
+            events: Trace events recorded during the turn.
+        """
+        path = self._get_path(key)
+        record = {
+            "id": message_id,
+            "timestamp": datetime.now().isoformat(),
+            "events": events,
+        }
+
+        if path not in self._line_counts:
+            self._line_counts[path] = self._count_lines(path)
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._line_counts[path] += 1
+
+        # Compact with some slack so rewrites stay amortized.
+        if self.max_per_session > 0 and self._line_counts[path] > self.max_per_session * 2:
+            self._compact_file(path)
+
+    def load(self, key: str) -> dict[str, list[dict[str, Any]]]:
+        """Load all traces of a session as a message_id -> events mapping."""
+        traces: dict[str, list[dict[str, Any]]] = {}
+        for record in self._read_records(self._get_path(key)):
+            events = record.get("events")
+            if record.get("id") and isinstance(events, list):
+                traces[str(record["id"])] = events
+        return traces
+
+    def get(self, key: str, message_id: str) -> list[dict[str, Any]]:
+        """Get the trace of a single message (empty if missing or expired)."""
+        return self.load(key).get(message_id, [])
+
+    def delete(self, key: str) -> None:
+        """Delete all traces of a session."""
+        path = self._get_path(key)
+        self._line_counts.pop(path, None)
+        if path.exists():
+            path.unlink()
+
+    def compact(self, key: str) -> int:
+        """
+        Drop expired traces and keep at most max_per_session per session.
+
+        Returns:
+            Number of removed trace records.
+        """
+        return self._compact_file(self._get_path(key))
+
+    def compact_all(self) -> int:
+        """Compact every trace file. Returns the total number of removed records."""
+        return sum(self._compact_file(path) for path in self.traces_dir.glob("*.jsonl"))
+
+    def _compact_file(self, path: Path) -> int:
+        records = list(self._read_records(path))
+        kept = records
+
+        if self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            kept = [r for r in kept if str(r.get("timestamp", "")) >= cutoff]
+        if self.max_per_session > 0:
+            kept = kept[-self.max_per_session:]
+
+        removed = len(records) - len(kept)
+        if removed:
+            if kept:
+                tmp_path = path.with_suffix(".jsonl.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for record in kept:
+                        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                tmp_path.replace(path)
+            elif path.exists():
+                path.unlink()
+            logger.debug(f"Compacted traces in {path.name}: removed {removed}")
+
+        self._line_counts[path] = len(kept)
+        return removed
+
+    def _read_records(self, path: Path):
+        """Yield trace records from a file, skipping corrupt lines."""
+        if not path.exists():
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _count_lines(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
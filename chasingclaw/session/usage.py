@@ -0,0 +1,188 @@
+"""Token usage ledger (one compact JSONL line per LLM call)."""
+
+import json
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from loguru import logger
+
+from chasingclaw.utils.helpers import ensure_dir
+
+if TYPE_CHECKING:
+    from chasingclaw.config.schema import UsageConfig
+
+# Ledger field -> key in LLMResponse.usage
+_TOKEN_FIELDS = {
+    "prompt": "prompt_tokens",
+    "completion": "completion_tokens",
+    "cached": "cached_tokens",
+    "reasoning": "reasoning_tokens",
+}
+
+GROUP_BY = ("session", "channel", "model", "day", "turn")
+
+
+class UsageLedger:
+    """
+    Append-only usage ledger, one file per day under the data dir.
+
+    Every line is one LLM call (an agent iteration) with its turn id, so
+    usage can be rolled up per iteration, turn, session, channel or model.
+    """
+
+    def __init__(self, usage_dir: Path, retention_days: int = 90):
+        self.usage_dir = ensure_dir(usage_dir)
+        self.retention_days = retention_days
+
+    @classmethod
+    def from_config(cls, config: "UsageConfig | None", usage_dir: Path) -> "UsageLedger | None":
+        """Build a ledger from config, or None when usage accounting is disabled."""
+        if config is None or not config.enabled:
+            return None
+        return cls(usage_dir, retention_days=config.retention_days)
+
+    def _get_path(self, day: str) -> Path:
+        return self.usage_dir / f"{day}.jsonl"
+
+    def record(self, entry: dict[str, Any]) -> None:
+        """Append one call record (a "ts" epoch timestamp is added if missing)."""
+        entry.setdefault("ts", round(time.time(), 3))
+        day = datetime.fromtimestamp(entry["ts"]).strftime("%Y-%m-%d")
+        try:
+            with open(self._get_path(day), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to write usage record: {e}")
+
+    def iter_records(self, days: int = 7) -> Iterator[dict[str, Any]]:
+        """Yield records from the last `days` days (0 = all), oldest first."""
+        cutoff = (datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d") if days > 0 else ""
+        for path in sorted(self.usage_dir.glob("*.jsonl")):
+            if path.stem < cutoff:
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    def summarize(self, days: int = 7, group_by: str = "session", top: int = 20) -> list[dict[str, Any]]:
+        """
+        Aggregate usage, highest total tokens first.
+
+        Args:
+            days: Look-back window in days (0 = all).
+            group_by: One of "session", "channel", "model", "day" or "turn".
+            top: Max rows to return (0 = all).
+
+        Returns:
+            Rows with calls, turns, token totals and average latency.
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        groups: dict[str, dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "turns": set(), "latency_ms": 0, **{k: 0 for k in _TOKEN_FIELDS}}
+        )
+        for record in self.iter_records(days):
+            if group_by == "day":
+                key = datetime.fromtimestamp(record.get("ts", 0)).strftime("%Y-%m-%d")
+            else:
+                key = str(record.get(group_by) or "-")
+            row = groups[key]
+            row["calls"] += 1
+            row["turns"].add(record.get("turn"))
+            row["latency_ms"] += record.get("ms", 0)
+            for field in _TOKEN_FIELDS:
+                row[field] += record.get(field, 0)
+
+        rows = []
+        for key, row in groups.items():
+            calls = row["calls"]
+            rows.append({
+                group_by: key,
+                "calls": calls,
+                "turns": len(row["turns"]),
+                **{field: row[field] for field in _TOKEN_FIELDS},
+                "total": row["prompt"] + row["completion"],
+                "avg_latency_ms": round(row["latency_ms"] / calls) if calls else 0,
+            })
+        rows.sort(key=lambda r: r["total"], reverse=True)
+        return rows[:top] if top > 0 else rows
+
+    def prune(self) -> int:
+        """Delete day files older than retention_days. Returns the number removed."""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        removed = 0
+        for path in self.usage_dir.glob("*.jsonl"):
+            if path.stem < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class UsageTurn:
+    """Accumulates usage for one agent turn and writes each call to the ledger."""
+
+    def __init__(
+        self,
+        ledger: UsageLedger | None,
+        session: str,
+        channel: str,
+        model: str,
+    ):
+        self.ledger = ledger
+        self.session = session
+        self.channel = channel
+        self.model = model
+        self.turn_id = uuid.uuid4().hex[:12]
+        self.totals = {field: 0 for field in _TOKEN_FIELDS}
+        self.calls = 0
+        self.latency_s = 0.0
+
+    def add(self, iteration: int, usage: dict[str, int], latency_s: float, model: str | None = None) -> None:
+        """
+        Record one LLM call of this turn.
+
+        Args:
+            iteration: Iteration of the agent loop.
+            usage: Token usage of the call.
+            latency_s: Call latency.
+            model: Model that served the call (e.g. a fallback); defaults to
+                the turn's configured model.
+        """
+        self.calls += 1
+        self.latency_s += latency_s
+        entry: dict[str, Any] = {
+            "turn": self.turn_id,
+            "session": self.session,
+            "channel": self.channel,
+            "model": model or self.model,
+            "iter": iteration,
+            "ms": round(latency_s * 1000),
+        }
+        for field, key in _TOKEN_FIELDS.items():
+            value = usage.get(key, 0)
+            self.totals[field] += value
+            if value:
+                entry[field] = value
+        if self.ledger:
+            self.ledger.record(entry)
+
+    def summary(self) -> dict[str, Any]:
+        """Turn totals (attached to the outbound message and the stream's done event)."""
+        return {
+            **self.totals,
+            "total": self.totals["prompt"] + self.totals["completion"],
+            "calls": self.calls,
+            "latencyMs": round(self.latency_s * 1000),
+        }
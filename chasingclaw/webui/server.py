@@ -21,12 +21,15 @@ from urllib.parse import parse_qs, urlparse
 import httpx
 from loguru import logger
 
+from chasingclaw.agent.generation import GenerationSettings
 from chasingclaw.agent.loop import AgentLoop
 from chasingclaw.bus.queue import MessageBus
-from chasingclaw.config.loader import load_config, save_config
-from chasingclaw.providers.litellm_provider import LiteLLMProvider
+from chasingclaw.config.loader import get_data_dir, load_config, save_config
+from chasingclaw.providers.base import LLMProvider
+from chasingclaw.providers.factory import create_provider, wrap_with_cache, wrap_with_fallbacks
 from chasingclaw.providers.registry import PROVIDERS, find_by_name
 from chasingclaw.session.manager import SessionManager
+from chasingclaw.session.usage import GROUP_BY, UsageLedger
 
 
 UI_HTML = (Path(__file__).with_name("ui.html")).read_text(encoding="utf-8")
@@ -81,7 +84,10 @@ class WebUIRuntime:
     def _provider_options(self) -> list[str]:
         return [spec.name for spec in PROVIDERS] + ["custom", "intranet"]
 
-    def _make_provider(self, config: Any) -> LiteLLMProvider:
+    def _make_provider(self, config: Any) -> LLMProvider:
+        return wrap_with_cache(wrap_with_fallbacks(self._make_primary_provider(config), config), config)
+
+    def _make_primary_provider(self, config: Any) -> LLMProvider:
         model = config.agents.defaults.model
         selected = (config.ui.selected_provider or "").strip().lower()
 
@@ -90,7 +96,9 @@ class WebUIRuntime:
             provider_cfg = config.providers.openai
             if not (provider_cfg and provider_cfg.api_key) and not model.startswith("bedrock/"):
                 raise ValueError("Custom provider requires API key.")
-            return LiteLLMProvider(
+            return create_provider(
+                backend=provider_cfg.backend if provider_cfg else "litellm",
+                rate_limit=provider_cfg.rate_limit if provider_cfg else None,
                 api_key=provider_cfg.api_key if provider_cfg else None,
                 api_base=provider_cfg.api_base if provider_cfg else None,
                 default_model=model,
@@ -103,7 +111,9 @@ class WebUIRuntime:
             provider_cfg = config.providers.openai
             if not (provider_cfg and provider_cfg.api_key) and not model.startswith("bedrock/"):
                 raise ValueError("Intranet provider requires API key.")
-            return LiteLLMProvider(
+            return create_provider(
+                backend=provider_cfg.backend if provider_cfg else "litellm",
+                rate_limit=provider_cfg.rate_limit if provider_cfg else None,
                 api_key=provider_cfg.api_key if provider_cfg else None,
                 api_base=provider_cfg.api_base if provider_cfg else None,
                 default_model=model,
@@ -121,7 +131,9 @@ class WebUIRuntime:
             if not api_base and spec and spec.is_gateway and spec.default_api_base:
                 api_base = spec.default_api_base
 
-            return LiteLLMProvider(
+            return create_provider(
+                backend=provider_cfg.backend if provider_cfg else "litellm",
+                rate_limit=provider_cfg.rate_limit if provider_cfg else None,
                 api_key=provider_cfg.api_key if provider_cfg else None,
                 api_base=api_base,
                 default_model=model,
@@ -132,7 +144,9 @@ class WebUIRuntime:
         provider_cfg = config.get_provider()
         if not (provider_cfg and provider_cfg.api_key) and not model.startswith("bedrock/"):
             raise ValueError("No API key configured. Please save provider/apiKey in the UI first.")
-        return LiteLLMProvider(
+        return create_provider(
+            backend=provider_cfg.backend if provider_cfg else "litellm",
+            rate_limit=provider_cfg.rate_limit if provider_cfg else None,
             api_key=provider_cfg.api_key if provider_cfg else None,
             api_base=config.get_api_base(),
             default_model=model,
@@ -149,6 +163,12 @@ class WebUIRuntime:
             return value.strip().lower() in {"1", "true", "yes", "on"}
         return False
 
+    def _as_float(self, value: Any, default: float) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
     def _format_now(self) -> str:
         return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
 
@@ -355,8 +375,8 @@ class WebUIRuntime:
     ) -> dict[str, Any]:
         config = load_config()
         provider = self._make_provider(config)
-        bus = MessageBus()
-        session_manager = SessionManager(config.workspace_path)
+        bus = MessageBus(config.bus)
+        session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
 
         agent = AgentLoop(
             bus=bus,
@@ -368,6 +388,10 @@ class WebUIRuntime:
             exec_config=config.tools.exec,
             restrict_to_workspace=config.tools.restrict_to_workspace,
             session_manager=session_manager,
+            generation=GenerationSettings.from_config(config.agents.defaults),
+            usage_ledger=UsageLedger.from_config(config.usage, get_data_dir() / "usage"),
+            subagent_config=config.agents.subagents,
+            memory_config=config.agents.memory,
         )
         metadata: dict[str, Any] = {}
         if display_message:
@@ -375,13 +399,16 @@ class WebUIRuntime:
         if attachments:
             metadata["attachments"] = attachments
 
-        outbound = await agent.process_direct_with_result(
-            content=message,
-            session_key=f"{channel}:{session_id}",
-            channel=channel,
-            chat_id=session_id,
-            metadata=metadata,
-        )
+        try:
+            outbound = await agent.process_direct_with_result(
+                content=message,
+                session_key=f"{channel}:{session_id}",
+                channel=channel,
+                chat_id=session_id,
+                metadata=metadata,
+            )
+        finally:
+            await agent.close()
         reply = outbound.content if outbound else ""
         trace = []
         if outbound and isinstance(outbound.metadata, dict):
@@ -442,16 +469,24 @@ class WebUIRuntime:
 
     def get_history(self, session_id: str, channel: str = "webui") -> list[dict[str, Any]]:
         config = load_config()
-        session_manager = SessionManager(config.workspace_path)
-        session = session_manager.get_or_create(f"{channel}:{session_id}")
+        session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
+        key = f"{channel}:{session_id}"
+        session = session_manager.get_or_create(key)
+        recent = session.messages[-100:]
+        traces: dict[str, list[dict[str, Any]]] = {}
+        if any(item.get("trace_ref") for item in recent):
+            traces = session_manager.traces.load(key)
         messages: list[dict[str, Any]] = []
-        for item in session.messages[-100:]:
+        for item in recent:
+            trace = item.get("trace")
+            if not isinstance(trace, list):
+                trace = traces.get(str(item.get("trace_ref") or ""), [])
             messages.append(
                 {
                     "role": item.get("role", "assistant"),
                     "content": item.get("content", ""),
                     "timestamp": item.get("timestamp", ""),
-                    "trace": item.get("trace", []) if isinstance(item.get("trace"), list) else [],
+                    "trace": trace,
                     "attachments": item.get("attachments", []) if isinstance(item.get("attachments"), list) else [],
                 }
             )
@@ -459,7 +494,7 @@ class WebUIRuntime:
 
     def list_sessions(self, channel: str = "webui", limit: int = 200) -> dict[str, Any]:
         config = load_config()
-        session_manager = SessionManager(config.workspace_path)
+        session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
         sessions = session_manager.list_sessions()
         items: list[dict[str, Any]] = []
         prefix = f"{channel}:"
@@ -506,7 +541,7 @@ class WebUIRuntime:
 
     def remove_session(self, session_id: str, channel: str = "webui") -> dict[str, Any]:
         config = load_config()
-        session_manager = SessionManager(config.workspace_path)
+        session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
         key = f"{channel}:{session_id}"
         deleted = session_manager.delete(key)
         return {"success": deleted, "sessionId": session_id}
@@ -783,11 +818,24 @@ class WebUIRuntime:
         }
 
     def _cron_service(self):
+        """The gateway's live cron engine, or the job store itself when no gateway runs."""
         from chasingclaw.config.loader import get_data_dir
+        from chasingclaw.cron.control import open_cron_service
         from chasingclaw.cron.service import CronService
 
         store_path = get_data_dir() / "cron" / "jobs.json"
-        return CronService(store_path)
+        service = open_cron_service(store_path, load_config().cron)
+        if isinstance(service, CronService):
+            service.on_job = self._run_cron_job_locally
+        return service
+
+    async def _run_cron_job_locally(self, job: Any) -> str:
+        """Run a job through a one-off agent (used for "run now" without a gateway)."""
+        from chasingclaw.providers.cache import response_cache
+
+        with response_cache(job.payload.cache):
+            result = await self._chat_once_async(job.payload.message, session_id=job.id, channel="cron")
+        return result["reply"]
 
     def _cron_job_to_dict(self, job: Any) -> dict[str, Any]:
         schedule_kind = job.schedule.kind
@@ -802,8 +850,13 @@ class WebUIRuntime:
             "scheduleKind": schedule_kind,
             "everySeconds": (job.schedule.every_ms or 0) // 1000,
             "cronExpr": job.schedule.expr or "",
+            "tz": job.schedule.tz or "",
             "atIso": at_iso,
             "message": job.payload.message,
+            "cache": job.payload.cache,
+            "overlap": job.overlap,
+            "timeoutS": job.timeout_s,
+            "misfire": job.misfire,
             "nextRunAtMs": job.state.next_run_at_ms,
             "lastRunAtMs": job.state.last_run_at_ms,
             "lastStatus": job.state.last_status,
@@ -838,7 +891,8 @@ class WebUIRuntime:
             cron_expr = str(payload.get("cronExpr") or "").strip()
             if not cron_expr:
                 raise ValueError("cronExpr is required for cron schedule")
-            schedule = CronSchedule(kind="cron", expr=cron_expr)
+            tz = str(payload.get("tz") or "").strip() or None
+            schedule = CronSchedule(kind="cron", expr=cron_expr, tz=tz)
         elif schedule_type == "at":
             at_time = str(payload.get("atTime") or "").strip()
             if not at_time:
@@ -854,7 +908,15 @@ class WebUIRuntime:
             raise ValueError("scheduleType must be one of: every, cron, at")
 
         service = self._cron_service()
-        job = service.add_job(name=name, schedule=schedule, message=message)
+        job = service.add_job(
+            name=name,
+            schedule=schedule,
+            message=message,
+            cache=self._as_bool(payload.get("cache")),
+            overlap=str(payload.get("overlap") or "skip").strip().lower(),
+            timeout_s=self._as_float(payload.get("timeoutS"), 0.0),
+            misfire=str(payload.get("misfire") or "run_once").strip().lower(),
+        )
         return {
             "ok": True,
             "job": self._cron_job_to_dict(job),
@@ -1080,6 +1142,22 @@ class _WebUIHandler(BaseHTTPRequestHandler):
             self._send_json(200, {"result": "ok"})
             return
 
+        if parsed.path == "/api/usage":
+            query = parse_qs(parsed.query)
+            group_by = query.get("by", ["session"])[0]
+            if group_by not in GROUP_BY:
+                self._send_json(400, {"error": f"by must be one of {', '.join(GROUP_BY)}"})
+                return
+            try:
+                days = int(query.get("days", ["7"])[0])
+                top = int(query.get("top", ["20"])[0])
+            except ValueError:
+                self._send_json(400, {"error": "days and top must be integers"})
+                return
+            ledger = UsageLedger(get_data_dir() / "usage")
+            self._send_json(200, {"by": group_by, "days": days, "rows": ledger.summarize(days, group_by, top)})
+            return
+
         if parsed.path == "/api/memory/list":
             from pathlib import Path
             workspace_dir = Path(__file__).resolve().parent.parent.parent / "workspace"
@@ -1184,8 +1262,8 @@ class _WebUIHandler(BaseHTTPRequestHandler):
 
                 config = load_config()
                 provider = self.runtime._make_provider(config)
-                bus = MessageBus()
-                session_manager = SessionManager(config.workspace_path)
+                bus = MessageBus(config.bus)
+                session_manager = SessionManager(config.workspace_path, trace_config=config.traces)
                 agent = AgentLoop(
                     bus=bus,
                     provider=provider,
@@ -1196,6 +1274,10 @@ class _WebUIHandler(BaseHTTPRequestHandler):
                     exec_config=config.tools.exec,
                     restrict_to_workspace=config.tools.restrict_to_workspace,
                     session_manager=session_manager,
+                    generation=GenerationSettings.from_config(config.agents.defaults),
+                    usage_ledger=UsageLedger.from_config(config.usage, get_data_dir() / "usage"),
+                    subagent_config=config.agents.subagents,
+                    memory_config=config.agents.memory,
                 )
                 metadata: dict[str, Any] = {}
                 if display_message:
@@ -1221,17 +1303,20 @@ class _WebUIHandler(BaseHTTPRequestHandler):
                         return False
 
                 async def run_stream():
-                    async for event in agent.process_direct_streaming(
-                        content=message,
-                        session_key=f"webui:{session_id}",
-                        channel="webui",
-                        chat_id=session_id,
-                        metadata=metadata,
-                    ):
-                        if not send_sse(event):
-                            break
-                        if event.get("type") == "done":
-                            break
+                    try:
+                        async for event in agent.process_direct_streaming(
+                            content=message,
+                            session_key=f"webui:{session_id}",
+                            channel="webui",
+                            chat_id=session_id,
+                            metadata=metadata,
+                        ):
+                            if not send_sse(event):
+                                break
+                            if event.get("type") == "done":
+                                break
+                    finally:
+                        await agent.close()
 
                 try:
                     asyncio.run(run_stream())
@@ -56,3 +56,29 @@ def test_init_prompt_session_creates_session():
         _, kwargs = MockSession.call_args
         assert kwargs["multiline"] is False
         assert kwargs["enable_open_in_editor"] is False
+
+
+@pytest.mark.asyncio
+async def test_gateway_wait_surfaces_a_crashed_task():
+    async def crash():
+        raise ValueError("bad token")
+
+    async def forever():
+        await asyncio.Event().wait()
+
+    stop = asyncio.Event()
+    agent = asyncio.create_task(forever())
+    error = await asyncio.wait_for(
+        commands._wait_for_stop(stop, {"agent": agent, "channels": asyncio.create_task(crash())}), 1
+    )
+    assert isinstance(error, ValueError)
+
+    # Channels returning after startup is fine; only the stop event ends the wait.
+    waiting = asyncio.create_task(
+        commands._wait_for_stop(stop, {"agent": agent, "channels": asyncio.create_task(asyncio.sleep(0))})
+    )
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    stop.set()
+    assert await waiting is None
+    agent.cancel()
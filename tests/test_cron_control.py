@@ -0,0 +1,69 @@
+import asyncio
+import json
+from pathlib import Path
+
+from chasingclaw.cron.control import CronControlServer, RemoteCronService, open_cron_service
+from chasingclaw.cron.service import CronService
+from chasingclaw.cron.types import CronSchedule
+
+
+async def test_remote_calls_reach_live_service(tmp_path: Path) -> None:
+    ran: list[str] = []
+
+    async def on_job(job):
+        ran.append(job.payload.message)
+        return "done"
+
+    store_path = tmp_path / "cron" / "jobs.json"
+    service = CronService(store_path, on_job=on_job)
+    await service.start()
+    server = CronControlServer(service)
+    await server.start()
+    try:
+        remote = await asyncio.to_thread(open_cron_service, store_path)
+        assert isinstance(remote, RemoteCronService)
+
+        job = await asyncio.to_thread(
+            remote.add_job, "daily", CronSchedule(kind="every", every_ms=60_000), "report", overlap="queue"
+        )
+        # The live service saw the edit and armed its timer for it.
+        assert service.list_jobs()[0].id == job.id
+        assert service._get_next_wake_ms() == job.state.next_run_at_ms
+        assert job.overlap == "queue"
+
+        assert await remote.run_job(job.id)
+        assert ran == ["report"]
+
+        disabled = await asyncio.to_thread(remote.enable_job, job.id, False)
+        assert disabled.enabled is False
+        assert await asyncio.to_thread(remote.remove_job, job.id)
+        assert service.list_jobs(include_disabled=True) == []
+    finally:
+        await server.stop()
+        service.stop()
+    assert not (store_path.parent / "control.json").exists()
+
+
+async def test_bad_token_is_rejected(tmp_path: Path) -> None:
+    service = CronService(tmp_path / "jobs.json")
+    server = CronControlServer(service)
+    await server.start()
+    try:
+        remote = RemoteCronService(server.host, server.port, "wrong")
+        try:
+            await asyncio.to_thread(remote.status)
+        except ValueError as e:
+            assert "unauthorized" in str(e)
+        else:
+            raise AssertionError("expected rejection")
+    finally:
+        await server.stop()
+
+
+def test_falls_back_to_local_store(tmp_path: Path) -> None:
+    store_path = tmp_path / "jobs.json"
+    assert isinstance(open_cron_service(store_path), CronService)
+
+    # Stale control file left by a gateway that is gone.
+    (tmp_path / "control.json").write_text(json.dumps({"host": "127.0.0.1", "port": 9, "token": "x"}))
+    assert isinstance(open_cron_service(store_path), CronService)
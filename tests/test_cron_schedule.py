@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from croniter import croniter
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from chasingclaw.cron.schedule import iter_runs, next_run_ms, next_runs
+from chasingclaw.cron.service import CronService
+from chasingclaw.cron.types import CronSchedule
+
+ZONES = ["UTC", "America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Shanghai"]
+EXPRS = ["0 9 * * *", "30 2 * * *", "30 1 * * *", "*/20 * * * *", "15 */3 * * 1-5", "0 0 1 * *"]
+
+zones = st.sampled_from(ZONES)
+after_ms = st.integers(
+    min_value=int(datetime(2020, 1, 1).timestamp() * 1000),
+    max_value=int(datetime(2030, 1, 1).timestamp() * 1000),
+)
+
+
+def _ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _wall(ms: int, tz: str) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, ZoneInfo(tz)).replace(tzinfo=None)
+
+
+def _nonexistent(wall: datetime, tz: str) -> bool:
+    aware = wall.replace(tzinfo=ZoneInfo(tz))
+    return aware.astimezone(ZoneInfo("UTC")).astimezone(ZoneInfo(tz)).replace(tzinfo=None) != wall
+
+
+@settings(deadline=None)
+@given(expr=st.sampled_from(EXPRS), tz=zones, after=after_ms)
+def test_cron_runs_increase_and_match_local_wall_time(expr: str, tz: str, after: int) -> None:
+    runs = next_runs(CronSchedule(kind="cron", expr=expr, tz=tz), after, 8)
+
+    assert len(runs) == 8
+    assert runs[0] > after
+    assert all(a < b for a, b in zip(runs, runs[1:]))
+    for ms in runs:
+        wall = _wall(ms, tz)
+        # Either the wall time matches, or it is a time skipped by DST shifted past the jump.
+        assert croniter.match(expr, wall) or any(
+            croniter.match(expr, wall - shift) and _nonexistent(wall - shift, tz)
+            for shift in (timedelta(minutes=30), timedelta(hours=1))
+        )
+
+
+@settings(deadline=None)
+@given(tz=zones, after=after_ms, hour=st.integers(0, 23), minute=st.integers(0, 59))
+def test_daily_job_fires_once_per_local_day(tz: str, after: int, hour: int, minute: int) -> None:
+    runs = next_runs(CronSchedule(kind="cron", expr=f"{minute} {hour} * * *", tz=tz), after, 10)
+
+    days = [_wall(ms, tz).date() for ms in runs]
+    assert days == [days[0] + timedelta(days=i) for i in range(10)]
+
+
+@given(
+    anchor=after_ms,
+    every_s=st.integers(1, 7 * 86400),
+    lag=st.integers(0, 10**10),
+)
+def test_every_stays_on_anchor_grid(anchor: int, every_s: int, lag: int) -> None:
+    every_ms = every_s * 1000
+    after = anchor + lag
+    runs = next_runs(CronSchedule(kind="every", every_ms=every_ms), after, 3, anchor_ms=anchor)
+
+    assert after < runs[0] <= after + every_ms
+    assert all((ms - anchor) % every_ms == 0 for ms in runs)
+    assert runs[2] - runs[0] == 2 * every_ms
+
+
+def test_dst_gap_and_overlap() -> None:
+    ny = ZoneInfo("America/New_York")
+    nightly = CronSchedule(kind="cron", expr="30 2 * * *", tz="America/New_York")
+    spring = next_runs(nightly, _ms(datetime(2024, 3, 9, 12, tzinfo=ny)), 2)
+    # 02:30 does not exist on 2024-03-10; the run moves to 03:30 EDT.
+    assert [datetime.fromtimestamp(ms / 1000, ny).hour for ms in spring] == [3, 2]
+
+    early = CronSchedule(kind="cron", expr="30 1 * * *", tz="America/New_York")
+    fall = next_runs(early, _ms(datetime(2024, 11, 2, 12, tzinfo=ny)), 2)
+    # 01:30 happens twice on 2024-11-03; the job runs once.
+    assert fall[1] - fall[0] == 25 * 3600 * 1000
+
+    frequent = CronSchedule(kind="cron", expr="*/20 * * * *", tz="America/New_York")
+    repeated = next_runs(frequent, _ms(datetime(2024, 11, 3, 0, 50, tzinfo=ny)), 7)
+    # Runs every hour, so the repeated hour runs too: 01:00-01:40 twice, then 02:00.
+    assert all(b - a == 20 * 60 * 1000 for a, b in zip(repeated, repeated[1:]))
+
+
+def test_concurrent_evaluations_do_not_share_iterators() -> None:
+    schedule = CronSchedule(kind="cron", expr="*/5 9-17 * * 1-5", tz="UTC")
+    starts = [_ms(datetime(2020 + i % 8, 3, 4, 10, 1, tzinfo=ZoneInfo("UTC"))) for i in range(400)]
+    expected = [next_run_ms(schedule, ms) for ms in starts]
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(lambda ms: next_run_ms(schedule, ms), starts)) == expected
+
+    # Two interleaved previews of the same expression stay independent too.
+    a, b = iter_runs(schedule, starts[0]), iter_runs(schedule, starts[1])
+    first = next(a)
+    assert next(b) == expected[1]
+    assert [first, next(a)] == next_runs(schedule, starts[0], 2)
+
+
+def test_service_keeps_every_jobs_on_grid_and_checks_schedules(tmp_path: Path) -> None:
+    service = CronService(tmp_path / "jobs.json")
+    job = service.add_job("tick", CronSchedule(kind="every", every_ms=60_000), "hi")
+
+    # A run finishing late still leaves the next run on the original grid.
+    later = job.created_at_ms + 150_000
+    assert service._next_run(job, later) == job.created_at_ms + 180_000
+    preview = service.preview_job(job.id, 3)
+    assert [b - a for a, b in zip(preview, preview[1:])] == [60_000, 60_000]
+
+    with pytest.raises(ValueError, match="timezone"):
+        service.add_job("bad", CronSchedule(kind="cron", expr="0 9 * * *", tz="Mars/Base"), "hi")
+    with pytest.raises(ValueError, match="cron expression"):
+        service.add_job("bad", CronSchedule(kind="cron", expr="every morning"), "hi")
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from pathlib import Path
+
+from chasingclaw.config.schema import CronConfig
+from chasingclaw.cron.service import CronService
+from chasingclaw.cron.types import CronSchedule
+
+
+def _service(tmp_path: Path, on_job=None, **config) -> CronService:
+    return CronService(tmp_path / "jobs.json", on_job=on_job, config=CronConfig(**config))
+
+
+def _every(seconds: int = 3600) -> CronSchedule:
+    return CronSchedule(kind="every", every_ms=seconds * 1000)
+
+
+async def _wait_idle(service: CronService) -> None:
+    for _ in range(100):
+        if not service._run_tasks:
+            return
+        await asyncio.sleep(0.01)
+
+
+def _make_due(service: CronService, *jobs) -> None:
+    for job in jobs:
+        job.state.next_run_at_ms = int(time.time() * 1000) - 1
+        service._touch(job)
+
+
+async def test_due_jobs_run_concurrently_up_to_limit(tmp_path: Path) -> None:
+    active = 0
+    peak = 0
+
+    async def on_job(job):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return "ok"
+
+    service = _service(tmp_path, on_job, max_concurrent=2)
+    jobs = [service.add_job(f"job{i}", _every(), "hi") for i in range(3)]
+    service._running = True
+    _make_due(service, *jobs)
+
+    await service._on_timer()
+    await _wait_idle(service)
+
+    assert peak == 2
+    assert all(j.state.last_status == "ok" for j in jobs)
+    service.stop()
+
+
+async def test_overlap_policies(tmp_path: Path) -> None:
+    gate = asyncio.Event()
+    runs: list[str] = []
+
+    async def on_job(job):
+        runs.append(job.name)
+        await gate.wait()
+
+    service = _service(tmp_path, on_job)
+    skip = service.add_job("skip", _every(), "hi", overlap="skip")
+    queue = service.add_job("queue", _every(), "hi", overlap="queue")
+    service._running = True
+
+    for _ in range(3):
+        _make_due(service, skip, queue)
+        await service._on_timer()
+        await asyncio.sleep(0.01)
+
+    assert runs == ["skip", "queue"]
+    assert skip.state.last_status == "skipped"
+    gate.set()
+    await _wait_idle(service)
+    # "queue" keeps one extra run behind the running one; the third tick was dropped.
+    assert runs.count("queue") == 2
+    assert runs.count("skip") == 1
+    service.stop()
+
+
+async def test_manual_run_waits_for_scheduled_run(tmp_path: Path) -> None:
+    gate = asyncio.Event()
+    active = 0
+    peak = 0
+
+    async def on_job(job):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await gate.wait()
+        active -= 1
+
+    service = _service(tmp_path, on_job, max_concurrent=1)
+    skip = service.add_job("skip", _every(), "hi", overlap="skip")
+    other = service.add_job("other", _every(), "hi", overlap="allow")
+    service._running = True
+    _make_due(service, skip)
+    await service._on_timer()
+    await asyncio.sleep(0.01)
+
+    manual = asyncio.gather(service.run_job(skip.id), service.run_job(other.id))
+    await asyncio.sleep(0.02)
+    # Neither the same job nor another one past cron.maxConcurrent starts alongside.
+    assert active == 1
+    gate.set()
+    assert await manual == [True, True]
+    assert peak == 1
+    service.stop()
+
+
+async def test_job_timeout_marks_error(tmp_path: Path) -> None:
+    async def on_job(job):
+        await asyncio.sleep(1)
+
+    service = _service(tmp_path, on_job, default_timeout_s=5)
+    job = service.add_job("slow", _every(), "hi", timeout_s=0.02)
+
+    await service._execute_job(job)
+
+    assert job.state.last_status == "error"
+    assert "timed out" in job.state.last_error
+
+
+def test_misfire_policy_on_startup(tmp_path: Path) -> None:
+    service = _service(tmp_path, misfire_grace_s=600)
+    now_ms = int(time.time() * 1000)
+    run_once = service.add_job("run_once", _every(), "hi")
+    skip = service.add_job("skip", _every(), "hi", misfire="skip")
+    stale = service.add_job("stale", _every(), "hi")
+    run_once.state.next_run_at_ms = skip.state.next_run_at_ms = now_ms - 60_000
+    stale.state.next_run_at_ms = now_ms - 3_600_000
+
+    service._recompute_next_runs()
+
+    assert run_once.state.next_run_at_ms == now_ms - 60_000
+    assert skip.state.next_run_at_ms > now_ms
+    assert stale.state.next_run_at_ms > now_ms
+
+
+def test_jitter_is_stable_per_job(tmp_path: Path) -> None:
+    service = _service(tmp_path, jitter_s=30)
+    a = service.add_job("a", CronSchedule(kind="cron", expr="0 9 * * *"), "hi")
+    b = service.add_job("b", CronSchedule(kind="cron", expr="0 9 * * *"), "hi")
+    now_ms = int(time.time() * 1000)
+
+    offset_a = service._next_run(a, now_ms) % 60_000
+    assert service._next_run(a, now_ms) % 60_000 == offset_a < 30_000
+    assert service._next_run(b, now_ms) % 60_000 < 30_000
+
+
+def test_journal_replay_and_snapshot(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    keep = service.add_job("keep", _every(), "hi")
+    gone = service.add_job("gone", _every(), "bye")
+    service.enable_job(keep.id, enabled=False)
+    service.remove_job(gone.id)
+
+    assert not (tmp_path / "jobs.json").exists()
+    entries = (tmp_path / "jobs.journal.jsonl").read_text().splitlines()
+    assert len(entries) == 4
+
+    reloaded = _service(tmp_path)
+    jobs = reloaded.list_jobs(include_disabled=True)
+    assert [(j.id, j.enabled) for j in jobs] == [(keep.id, False)]
+
+    reloaded._write_snapshot()
+    assert not (tmp_path / "jobs.journal.jsonl").exists()
+    assert [j.id for j in _service(tmp_path).list_jobs(include_disabled=True)] == [keep.id]
+
+
+def test_next_wake_comes_from_heap(tmp_path: Path) -> None:
+    service = _service(tmp_path)
+    now_ms = int(time.time() * 1000)
+    jobs = [
+        service.add_job(f"at{i}", CronSchedule(kind="at", at_ms=now_ms + (i + 1) * 60_000), "hi")
+        for i in range(5)
+    ]
+    assert service._get_next_wake_ms() == jobs[0].state.next_run_at_ms
+
+    service.remove_job(jobs[0].id)
+    service.enable_job(jobs[1].id, enabled=False)
+    assert service._get_next_wake_ms() == jobs[2].state.next_run_at_ms
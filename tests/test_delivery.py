@@ -0,0 +1,111 @@
+import asyncio
+
+from chasingclaw.bus.events import OutboundMessage
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.channels.base import BaseChannel
+from chasingclaw.channels.delivery import DeliveryDispatcher, LatencyHistogram
+from chasingclaw.channels.slack import SlackChannel
+from chasingclaw.config.schema import DeliveryConfig, RetryPolicyConfig, SlackConfig
+
+
+class _FakeChannel(BaseChannel):
+    def __init__(self, name: str, delay: float = 0.0, failures: int = 0):
+        super().__init__(config=None, bus=MessageBus())
+        self._running = True
+        self.name = name
+        self.delay = delay
+        self.failures = failures
+        self.sent: list[str] = []
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def send(self, msg: OutboundMessage) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("temporary failure")
+        await asyncio.sleep(self.delay)
+        self.sent.append(msg.content)
+
+
+def _out(channel: str, content: str, chat_id: str = "1") -> OutboundMessage:
+    return OutboundMessage(channel=channel, chat_id=chat_id, content=content)
+
+
+async def test_slow_channel_does_not_block_others() -> None:
+    slow = _FakeChannel("discord", delay=0.5)
+    fast = _FakeChannel("telegram")
+    dispatcher = DeliveryDispatcher({"discord": slow, "telegram": fast})
+
+    await dispatcher.submit(_out("discord", "d1"))
+    await dispatcher.submit(_out("telegram", "t1"))
+    await asyncio.sleep(0.05)
+
+    assert fast.sent == ["t1"]
+    assert slow.sent == []
+    await dispatcher.close(timeout=0)
+
+
+async def test_order_is_kept_within_chat() -> None:
+    channel = _FakeChannel("telegram", delay=0.001)
+    dispatcher = DeliveryDispatcher({"telegram": channel}, DeliveryConfig(per_chat=True))
+
+    for i in range(5):
+        await dispatcher.submit(_out("telegram", f"a{i}", chat_id="a"))
+        await dispatcher.submit(_out("telegram", f"b{i}", chat_id="b"))
+    await dispatcher.close(timeout=1.0)
+
+    assert [c for c in channel.sent if c.startswith("a")] == [f"a{i}" for i in range(5)]
+    assert [c for c in channel.sent if c.startswith("b")] == [f"b{i}" for i in range(5)]
+
+
+async def test_failed_send_is_retried_and_recorded() -> None:
+    channel = _FakeChannel("email", failures=1)
+    config = DeliveryConfig(channel_retry={"email": RetryPolicyConfig(max_attempts=2, base_delay_s=0.001)})
+    dispatcher = DeliveryDispatcher({"email": channel}, config)
+
+    await dispatcher.submit(_out("email", "hello"))
+    await dispatcher.close(timeout=1.0)
+
+    assert channel.sent == ["hello"]
+    stats = dispatcher.metrics()["email"]
+    assert (stats["sent"], stats["retries"], stats["failed"]) == (1, 1, 0)
+    assert stats["latency"]["count"] == 1
+
+
+async def test_channel_send_errors_reach_the_retry_policy() -> None:
+    class _FlakyWebClient:
+        def __init__(self) -> None:
+            self.calls = 0
+
+        async def chat_postMessage(self, **kwargs) -> None:  # noqa: N802
+            self.calls += 1
+            if self.calls == 1:
+                raise ConnectionError("reset by peer")
+
+    channel = SlackChannel(SlackConfig(), MessageBus())
+    channel._running = True
+    channel._web_client = _FlakyWebClient()
+    config = DeliveryConfig(channel_retry={"slack": RetryPolicyConfig(max_attempts=2, base_delay_s=0.001)})
+    dispatcher = DeliveryDispatcher({"slack": channel}, config)
+
+    await dispatcher.submit(_out("slack", "hello"))
+    await dispatcher.close(timeout=1.0)
+
+    assert channel._web_client.calls == 2
+    stats = dispatcher.metrics()["slack"]
+    assert (stats["sent"], stats["retries"], stats["failed"]) == (1, 1, 0)
+
+
+def test_latency_histogram_percentiles() -> None:
+    hist = LatencyHistogram()
+    for _ in range(9):
+        hist.record(0.02)
+    hist.record(3.0)
+
+    assert hist.percentile(0.5) == 50.0
+    assert hist.percentile(0.95) == 5000.0
+    assert hist.snapshot()["buckets"] == {"<=50ms": 9, "<=5000ms": 1}
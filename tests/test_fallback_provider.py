@@ -0,0 +1,140 @@
+import asyncio
+
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+from chasingclaw.providers.fallback import FallbackProvider, HedgePolicy, LatencyTracker
+
+
+class FakeProvider(LLMProvider):
+    def __init__(self, name: str, delay: float = 0.0, error_kind: str | None = None):
+        super().__init__(None, None)
+        self.name = name
+        self.delay = delay
+        self.error_kind = error_kind
+        self.calls = 0
+        self.cancelled = False
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error_kind:
+            return LLMResponse(content="Error calling LLM", finish_reason="error", error_kind=self.error_kind)
+        return LLMResponse(content=f"{self.name}:{model}")
+
+    async def chat_stream(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        response = await self.chat(messages, tools, model, max_tokens, temperature)
+        if response.finish_reason != "error":
+            yield self.name
+        yield response
+
+    def get_default_model(self) -> str:
+        return "primary-model"
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+async def test_falls_back_on_retryable_errors_only() -> None:
+    primary = FakeProvider("a", error_kind="rate_limit")
+    backup = FakeProvider("b")
+    provider = FallbackProvider(primary, [(backup, "backup-model")])
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "b:backup-model"
+    assert provider.stats["fallbacks"] == 1
+
+    primary.error_kind = "client"
+    response = await provider.chat(MESSAGES)
+    assert response.finish_reason == "error"
+    assert backup.calls == 1
+
+
+async def test_request_timeout_moves_to_next_candidate() -> None:
+    primary = FakeProvider("a", delay=1.0)
+    provider = FallbackProvider(primary, [(FakeProvider("b"), "backup-model")], request_timeout_s=0.05)
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "b:backup-model"
+    assert primary.cancelled
+
+
+async def test_hedged_chat_cancels_slow_primary() -> None:
+    primary = FakeProvider("a", delay=1.0)
+    backup = FakeProvider("b", delay=0.01)
+    provider = FallbackProvider(
+        primary, [(backup, "backup-model")], hedge=HedgePolicy(enabled=True, initial_delay_s=0.05)
+    )
+
+    response = await provider.chat(MESSAGES)
+    await asyncio.sleep(0)
+
+    assert response.content == "b:backup-model"
+    assert primary.cancelled
+    assert provider.stats == {"fallbacks": 0, "hedges": 1, "hedge_wins": 1}
+
+
+async def test_hedge_not_sent_when_primary_is_fast() -> None:
+    backup = FakeProvider("b")
+    provider = FallbackProvider(
+        FakeProvider("a"), [(backup, "backup-model")], hedge=HedgePolicy(enabled=True, initial_delay_s=0.5)
+    )
+
+    response = await provider.chat(MESSAGES)
+
+    assert response.content == "a:primary-model"
+    assert backup.calls == 0
+
+
+async def test_fast_primary_failure_still_tries_first_fallback() -> None:
+    backup = FakeProvider("b")
+    hedge = HedgePolicy(enabled=True, initial_delay_s=0.5)
+    provider = FallbackProvider(FakeProvider("a", error_kind="rate_limit"), [(backup, "backup-model")], hedge=hedge)
+
+    response = await provider.chat(MESSAGES)
+    items = [item async for item in provider.chat_stream(MESSAGES)]
+
+    assert response.content == "b:backup-model"
+    assert items[-1].content == "b:backup-model"
+    assert backup.calls == 2
+    assert provider.stats["hedges"] == 0
+
+
+async def test_stream_hedges_on_first_token() -> None:
+    primary = FakeProvider("a", delay=1.0)
+    provider = FallbackProvider(
+        primary, [(FakeProvider("b"), "backup-model")], hedge=HedgePolicy(enabled=True, initial_delay_s=0.05)
+    )
+
+    items = [item async for item in provider.chat_stream(MESSAGES)]
+
+    assert items[0] == "b"
+    assert items[-1].content == "b:backup-model"
+    assert primary.cancelled
+
+
+async def test_stream_falls_back_before_first_token() -> None:
+    provider = FallbackProvider(FakeProvider("a", error_kind="server"), [(FakeProvider("b"), "backup-model")])
+
+    items = [item async for item in provider.chat_stream(MESSAGES)]
+
+    assert items == ["b", items[-1]]
+    assert items[-1].content == "b:backup-model"
+
+
+def test_hedge_deadline_uses_percentile_within_bounds() -> None:
+    tracker = LatencyTracker()
+    policy = HedgePolicy(enabled=True, min_samples=10, initial_delay_s=5.0, min_delay_s=0.5, max_delay_s=3.0)
+    assert policy.deadline(tracker) == 5.0
+
+    for i in range(1, 21):
+        tracker.record(i / 10)
+    assert policy.deadline(tracker) == 1.9
+
+    for _ in range(5):
+        tracker.record(100.0)
+    assert policy.deadline(tracker) == 3.0
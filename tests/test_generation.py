@@ -0,0 +1,119 @@
+from pathlib import Path
+
+from chasingclaw.agent.generation import GenerationSettings, chat_with_budget
+from chasingclaw.agent.loop import AgentLoop
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.config.schema import AgentDefaults
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+
+class RecordingProvider(LLMProvider):
+    def __init__(self, finish_reasons: list[str] | None = None):
+        super().__init__(None, None)
+        self.finish_reasons = list(finish_reasons or [])
+        self.calls: list[dict] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls.append({"max_tokens": max_tokens, "temperature": temperature, "tools": bool(tools)})
+        finish = self.finish_reasons.pop(0) if self.finish_reasons else "stop"
+        return LLMResponse(content="done", finish_reason=finish)
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def test_settings_from_config_and_overrides() -> None:
+    defaults = AgentDefaults.model_validate({
+        "max_tokens": 2000,
+        "temperature": 0.3,
+        "planning_max_tokens": 500,
+        "channel_overrides": {"telegram": {"max_tokens": 1000}},
+    })
+    settings = GenerationSettings.from_config(defaults)
+
+    assert settings.budget(with_tools=True) == 500
+    assert settings.budget(with_tools=False) == 2000
+
+    resolved = settings.resolve("telegram", {"generation": {"temperature": "0.9", "maxTokens": "bad"}})
+    assert (resolved.max_tokens, resolved.temperature, resolved.planning_max_tokens) == (1000, 0.9, 500)
+    assert settings.resolve("email") == settings
+
+
+class TruncatingProvider(LLMProvider):
+    """Replies 'Hel' cut off at the planning budget, then 'lo'; optionally as a tool call."""
+
+    def __init__(self, tool_call: bool = False):
+        super().__init__(None, None)
+        self.tool_call = tool_call
+        self.calls: list[dict] = []
+
+    def _reply(self, max_tokens: int) -> LLMResponse:
+        if self.calls:
+            return LLMResponse(content="lo", usage={"total_tokens": 2})
+        if self.tool_call:
+            return LLMResponse(content=None, finish_reason="length", usage={"total_tokens": 3})
+        return LLMResponse(content="Hel", finish_reason="length", usage={"total_tokens": 3})
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        response = self._reply(max_tokens)
+        self.calls.append({"max_tokens": max_tokens, "messages": messages})
+        return response
+
+    async def chat_stream(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        response = self._reply(max_tokens)
+        self.calls.append({"max_tokens": max_tokens, "messages": messages})
+        if response.content:
+            yield response.content
+        yield response
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_planning_budget_truncation_continues_answers_and_retries_tool_calls() -> None:
+    settings = GenerationSettings(max_tokens=2000, planning_max_tokens=300, temperature=0.2)
+
+    provider = TruncatingProvider()
+    response = await chat_with_budget(provider, settings, [], [{"type": "function"}], "m")
+    assert (response.content, response.finish_reason, response.usage) == ("Hello", "stop", {"total_tokens": 5})
+    assert [c["max_tokens"] for c in provider.calls] == [300, 1700]
+    assert provider.calls[1]["messages"][0] == {"role": "assistant", "content": "Hel"}
+
+    provider = TruncatingProvider(tool_call=True)
+    response = await chat_with_budget(provider, settings, [], [{"type": "function"}], "m")
+    assert response.content == "lo"
+    assert [c["max_tokens"] for c in provider.calls] == [300, 2000]
+    assert all(len(c["messages"]) == 0 for c in provider.calls)
+
+
+async def test_streamed_answer_cut_by_planning_budget_is_continued(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    provider = TruncatingProvider()
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=provider,
+        workspace=tmp_path,
+        generation=GenerationSettings(max_tokens=2000, planning_max_tokens=300),
+    )
+
+    events = [e async for e in agent.process_direct_streaming("hi")]
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Hel", "lo"]
+    assert not any(e["type"] == "retry" for e in events)
+    assert events[-1]["reply"] == "Hello"
+    assert [c["max_tokens"] for c in provider.calls] == [300, 1700]
+
+
+async def test_agent_loop_passes_generation_settings(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))  # Sessions and traces live under ~/.chasingclaw
+    provider = RecordingProvider()
+    agent = AgentLoop(
+        bus=MessageBus(),
+        provider=provider,
+        workspace=tmp_path,
+        generation=GenerationSettings(max_tokens=1234, temperature=0.1),
+    )
+
+    await agent.process_direct("hi", metadata={"generation": {"temperature": 0.5}})
+
+    assert provider.calls == [{"max_tokens": 1234, "temperature": 0.5, "tools": True}]
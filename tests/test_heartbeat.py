@@ -0,0 +1,75 @@
+import asyncio
+import time
+from pathlib import Path
+
+from chasingclaw.heartbeat.service import HeartbeatService
+
+
+def _service(tmp_path: Path, replies: list[str], **kwargs) -> tuple[HeartbeatService, list[str]]:
+    prompts: list[str] = []
+
+    async def on_heartbeat(prompt: str) -> str:
+        prompts.append(prompt)
+        return replies.pop(0) if replies else "HEARTBEAT_OK"
+
+    return HeartbeatService(tmp_path, on_heartbeat=on_heartbeat, **kwargs), prompts
+
+
+async def test_unchanged_file_after_ok_is_skipped(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- check the inbox\n")
+    service, prompts = _service(tmp_path, ["HEARTBEAT_OK"])
+
+    await service._tick()
+    await service._tick()
+    assert len(prompts) == 1
+
+    # A new time window re-checks the same instructions.
+    service._last_window = -1
+    await service._tick()
+    assert len(prompts) == 2
+
+    (tmp_path / "HEARTBEAT.md").write_text("- check the inbox\n- water the plants\n")
+    await service._tick()
+    assert len(prompts) == 3
+
+
+async def test_non_ok_reply_is_checked_again(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- send the weekly report\n")
+    service, prompts = _service(tmp_path, ["Sent the report."])
+
+    await service._tick()
+    await service._tick()
+    assert len(prompts) == 2
+
+
+async def test_interval_backs_off_after_ok_and_resets_on_edit(tmp_path: Path) -> None:
+    (tmp_path / "HEARTBEAT.md").write_text("- check the inbox\n")
+    service, _ = _service(tmp_path, [], interval_s=60, max_interval_s=300, window_s=0)
+    service._last_window = None
+
+    intervals = []
+    for _ in range(4):
+        service._last_ok = False  # force a call each time
+        await service._tick()
+        intervals.append(service.current_interval_s)
+    assert intervals == [120, 240, 300, 300]
+
+    (tmp_path / "HEARTBEAT.md").write_text("- something new\n")
+    service._ok_streak = 3
+    await service._tick()
+    assert service.current_interval_s == 120
+
+
+async def test_edit_wakes_the_wait_early(tmp_path: Path) -> None:
+    path = tmp_path / "HEARTBEAT.md"
+    path.write_text("- a\n")
+    service, _ = _service(tmp_path, [], poll_s=0.01)
+    service._file_stat = service._stat_heartbeat_file()
+
+    async def edit() -> None:
+        await asyncio.sleep(0.03)
+        path.write_text("- a\n- b\n")
+
+    start = time.monotonic()
+    await asyncio.gather(service._wait(5), edit())
+    assert time.monotonic() - start < 1
@@ -0,0 +1,107 @@
+import json
+
+import httpx
+
+from chasingclaw.providers.factory import create_provider
+from chasingclaw.providers.http_provider import OpenAICompatProvider
+
+
+def _provider(handler) -> OpenAICompatProvider:
+    return OpenAICompatProvider(
+        api_key="sk-test",
+        api_base="http://llm.internal/v1",
+        default_model="openai/qwen-72b",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+async def test_chat_parses_tool_calls_and_strips_prefix() -> None:
+    seen: dict = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["url"] = str(request.url)
+        seen["auth"] = request.headers["authorization"]
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json={
+            "choices": [{
+                "finish_reason": "tool_calls",
+                "message": {
+                    "content": None,
+                    "tool_calls": [{
+                        "id": "call_1",
+                        "type": "function",
+                        "function": {"name": "read_file", "arguments": "{\"path\": \"a.txt\"}"},
+                    }],
+                },
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        })
+
+    response = await _provider(handler).chat(
+        [{"role": "user", "content": "hi"}],
+        tools=[{"type": "function", "function": {"name": "read_file", "parameters": {}}}],
+    )
+
+    assert seen["url"] == "http://llm.internal/v1/chat/completions"
+    assert seen["auth"] == "Bearer sk-test"
+    assert seen["body"]["model"] == "qwen-72b"
+    assert seen["body"]["tool_choice"] == "auto"
+    assert response.tool_calls[0].name == "read_file"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
+    assert response.usage["total_tokens"] == 15
+
+
+async def test_stream_yields_tokens_then_assembled_tool_calls() -> None:
+    chunks = [
+        {"choices": [{"delta": {"content": "Hel"}}]},
+        {"choices": [{"delta": {"content": "lo"}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "c1", "function": {"name": "exec", "arguments": "{\"cmd\":"}}]}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": " \"ls\"}"}}]}, "finish_reason": "tool_calls"}]},
+    ]
+    sse = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+
+    items = [item async for item in _provider(handler).chat_stream([{"role": "user", "content": "hi"}])]
+
+    assert items[:2] == ["Hel", "lo"]
+    final = items[-1]
+    assert final.content == "Hello"
+    assert final.finish_reason == "tool_calls"
+    assert (final.tool_calls[0].name, final.tool_calls[0].arguments) == ("exec", {"cmd": "ls"})
+
+
+async def test_400_with_tools_retries_without_tools() -> None:
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if "tools" in body:
+            return httpx.Response(400, json={"error": "tools not supported"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}]})
+
+    response = await _provider(handler).chat(
+        [{"role": "user", "content": "hi"}],
+        tools=[{"type": "function", "function": {"name": "x", "parameters": {}}}],
+    )
+
+    assert response.content == "ok"
+    assert len(bodies) == 2
+
+
+async def test_server_error_is_returned_as_error_response() -> None:
+    provider = _provider(lambda request: httpx.Response(500, text="boom"))
+
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+
+    assert response.finish_reason == "error"
+    assert "500" in response.content
+    assert "sk-test" not in response.content
+
+
+def test_factory_selects_backend() -> None:
+    assert isinstance(create_provider(api_key="k", api_base="http://x/v1", backend="http"), OpenAICompatProvider)
+    assert type(create_provider(api_key="k")).__name__ == "LiteLLMProvider"
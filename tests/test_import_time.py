@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+# Modules that take seconds to import and must only load when actually used.
+HEAVY_MODULES = ("litellm", "telegram", "lark_oapi", "slack_sdk", "botpy", "dingtalk_stream", "socketio")
+
+
+def _imported_modules(code: str) -> set[str]:
+    """Run code in a fresh interpreter and return the modules it imported (via -X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def _heavy(modules: set[str]) -> set[str]:
+    return {m for m in modules if m.split(".")[0] in HEAVY_MODULES}
+
+
+def test_cli_entry_point_does_not_import_heavy_sdks() -> None:
+    modules = _imported_modules("import chasingclaw.cli.commands")
+
+    assert "chasingclaw.cli.commands" in modules
+    assert _heavy(modules) == set()
+
+
+def test_agent_and_channels_defer_heavy_imports() -> None:
+    code = (
+        "from chasingclaw.config.schema import Config\n"
+        "from chasingclaw.bus.queue import MessageBus\n"
+        "from chasingclaw.channels.manager import ChannelManager\n"
+        "from chasingclaw.providers.litellm_provider import LiteLLMProvider\n"
+        "import chasingclaw.agent.loop, chasingclaw.cron.service, chasingclaw.heartbeat.service\n"
+        "ChannelManager(Config(), MessageBus())\n"
+        "LiteLLMProvider(api_key='k', default_model='openai/gpt-4o')\n"
+    )
+    assert _heavy(_imported_modules(code)) == set()
@@ -0,0 +1,100 @@
+import threading
+from pathlib import Path
+
+from chasingclaw.agent.loop import AgentLoop
+from chasingclaw.agent.memory import MemoryStore
+from chasingclaw.agent.memory_index import MemoryIndex, chunk_markdown
+from chasingclaw.agent.tools.memory import MemorySearchTool
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.config.schema import MemoryConfig
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+
+def _write_notes(memory_dir: Path) -> None:
+    memory_dir.mkdir(parents=True, exist_ok=True)
+    (memory_dir / "MEMORY.md").write_text(
+        "# Long-term Memory\n\n"
+        "## Preferences\n- Drinks oolong tea, no coffee\n\n"
+        "## Projects\n- The billing migration is due on March 3\n"
+    )
+    (memory_dir / "2024-01-05.md").write_text("# 2024-01-05\n\n用户的猫叫小白，喜欢吃鱼\n")
+    (memory_dir / "2024-01-06.md").write_text("# 2024-01-06\n\nReviewed the billing dashboard with Sam\n")
+
+
+def test_chunks_follow_headings() -> None:
+    text = "# Title\n\n## A\nfirst\n\n## B\nsecond\nthird\n"
+    assert chunk_markdown(text) == [(3, "## A\nfirst"), (6, "## B\nsecond\nthird")]
+    assert len(chunk_markdown("line\n" * 100, max_chars=50)) == 10
+
+
+def test_bm25_ranks_relevant_chunks(tmp_path: Path) -> None:
+    _write_notes(tmp_path)
+    index = MemoryIndex(tmp_path)
+    index.refresh()
+
+    hits = index.search("when is the billing migration due?", k=2)
+    assert hits[0].source == "MEMORY.md" and "March 3" in hits[0].text
+    assert hits[1].source == "2024-01-06.md"
+
+    assert index.search("猫的名字", k=1)[0].source == "2024-01-05.md"
+    assert index.search("quantum chromodynamics") == []
+
+
+def test_refresh_only_rereads_changed_files(tmp_path: Path) -> None:
+    _write_notes(tmp_path)
+    index = MemoryIndex(tmp_path)
+
+    assert index.refresh() == 3
+    assert index.refresh() == 0
+
+    (tmp_path / "2024-01-06.md").write_text("# 2024-01-06\n\nBought a new kettle\n")
+    (tmp_path / "2024-01-05.md").unlink()
+    assert index.refresh() == 2
+    assert index.search("kettle")[0].source == "2024-01-06.md"
+    assert index.search("billing")[0].source == "MEMORY.md"
+    assert index.search("小白") == []
+
+
+async def test_large_memory_injects_only_relevant_chunks(tmp_path: Path) -> None:
+    _write_notes(tmp_path / "memory")
+    store = MemoryStore(tmp_path, MemoryConfig(inline_max_chars=10_000))
+    assert "oolong" in store.get_memory_context("billing status?")
+
+    store = MemoryStore(tmp_path, MemoryConfig(inline_max_chars=50, top_k=1))
+    context = store.get_memory_context("billing migration")
+    assert "Relevant Memories" in context
+    assert "March 3" in context and "oolong" not in context
+
+    result = await MemorySearchTool(store).execute(query="tea")
+    assert result.startswith("[MEMORY.md:") and "oolong" in result
+
+
+def test_inline_limit_counts_characters_not_bytes(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path, MemoryConfig(inline_max_chars=100))
+    store.write_long_term("用户喜欢喝乌龙茶。" * 8)  # 72 characters, 216 bytes in UTF-8
+
+    assert "Long-term Memory" in store.get_memory_context("茶")
+
+
+async def test_memory_retrieval_runs_off_the_event_loop(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    class EchoProvider(LLMProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+            return LLMResponse(content="ok")
+
+        def get_default_model(self) -> str:
+            return "test-model"
+
+    agent = AgentLoop(bus=MessageBus(), provider=EchoProvider(None, None), workspace=tmp_path)
+    threads = []
+    get_context = agent.context.memory.get_memory_context
+    monkeypatch.setattr(
+        agent.context.memory,
+        "get_memory_context",
+        lambda query=None: threads.append(threading.current_thread()) or get_context(query),
+    )
+
+    await agent.process_direct("hi")
+
+    assert threads and threading.main_thread() not in threads
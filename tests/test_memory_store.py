@@ -0,0 +1,104 @@
+import threading
+from pathlib import Path
+
+from chasingclaw.agent.memory import MemoryStore
+from chasingclaw.agent.tools.filesystem import EditFileTool, WriteFileTool
+from chasingclaw.agent.tools.memory import MemoryWriteTool
+
+
+def _run_threads(target, count: int = 8) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_daily_appends_keep_every_note(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+
+    def write() -> None:
+        for i in range(50):
+            store.append_today(f"note {i}", session="cli:direct", tags=["test"])
+
+    _run_threads(write)
+
+    entries = store.read_entries()
+    assert len(entries) == 400
+    assert entries[0].session == "cli:direct" and entries[0].tags == ["test"]
+    lines = store.read_today().splitlines()
+    assert lines[0].startswith("# ") and sum(line.startswith("- ") for line in lines) == 400
+
+
+def test_append_after_hand_edit_starts_a_new_line(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.get_today_file().write_text("# today\n\nwritten by hand")
+
+    store.append_today("remembered")
+
+    assert store.read_today().splitlines()[-2:] == ["written by hand", store.read_entries()[0].to_markdown()]
+
+
+def test_long_term_updates_do_not_lose_writes(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term("0")
+
+    def bump() -> None:
+        for _ in range(20):
+            MemoryStore(tmp_path).update_long_term(lambda text: str(int(text) + 1))
+
+    _run_threads(bump)
+
+    assert store.read_long_term() == "160"
+    assert [p.name for p in store.memory_dir.iterdir() if p.name.endswith(".tmp")] == []
+
+
+def test_structured_entries_are_indexed_once(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.get_today_file().write_text("# today\n\nMet Alice about the garden plan\n")
+    store.append_today("Alice prefers tulips over roses", session="telegram:42", tags=["garden"])
+
+    hits = store.search("alice garden tulips")
+    assert [h.source.rsplit(".", 1)[1] for h in hits] == ["jsonl", "md"]
+    assert hits[0].ts and hits[0].tags == ["garden"]
+    assert "tulips" not in hits[1].text
+
+
+async def test_agent_tools_write_memory_through_the_store(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    tool = MemoryWriteTool(store)
+    tool.set_context("telegram", "42")
+
+    await tool.execute(content="Prefers morning meetings", tags=["prefs"])
+    assert store.read_entries()[0].session == "telegram:42"
+    assert store.read_entries()[0].tags == ["prefs"]
+
+    await tool.execute(content="- Lives in Hangzhou", target="long_term")
+    await tool.execute(content="- Lives in Shanghai", target="long_term", old_text="- Lives in Hangzhou")
+    assert store.read_long_term() == "- Lives in Shanghai\n"
+    assert (await tool.execute(content="x", target="long_term", old_text="nowhere")).startswith("Error")
+
+    # edit_file on MEMORY.md takes the same lock as the store
+    edit = EditFileTool(memory=store)
+    locked = []
+    update_long_term = store.update_long_term
+    store.update_long_term = lambda update: locked.append(True) or update_long_term(update)
+    await edit.execute(path=str(store.memory_file), old_text="Shanghai", new_text="Suzhou")
+    assert locked and store.read_long_term() == "- Lives in Suzhou\n"
+
+
+async def test_memory_writes_run_off_the_event_loop(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    threads = []
+    for name in ("append_today", "write_long_term", "update_long_term"):
+        method = getattr(store, name)
+        setattr(store, name, lambda *a, _m=method, **kw: threads.append(threading.current_thread()) or _m(*a, **kw))
+
+    tool = MemoryWriteTool(store)
+    await tool.execute(content="Prefers tea")
+    await tool.execute(content="- Lives in Hangzhou", target="long_term")
+    await WriteFileTool(memory=store).execute(path=str(store.memory_file), content="- Lives in Hangzhou\n")
+    await EditFileTool(memory=store).execute(path=str(store.memory_file), old_text="Hangzhou", new_text="Suzhou")
+
+    assert len(threads) == 4 and threading.main_thread() not in threads
+    assert store.read_long_term() == "- Lives in Suzhou\n"
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from chasingclaw.bus.events import InboundMessage, OutboundMessage
+from chasingclaw.bus.queue import LaneQueue, MessageBus, QueueClosedError, QueueFullError
+from chasingclaw.config.schema import BusConfig
+
+
+def _msg(channel: str, chat_id: str, content: str = "hi", **metadata) -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id=chat_id, content=content, metadata=metadata)
+
+
+async def test_interactive_lane_is_served_before_background() -> None:
+    bus = MessageBus()
+    await bus.publish_inbound(_msg("cron", "job1"))
+    await bus.publish_inbound(_msg("system", "telegram:1"))
+    await bus.publish_inbound(_msg("telegram", "1"))
+
+    order = [(await bus.consume_inbound()).channel for _ in range(3)]
+
+    assert order == ["telegram", "system", "cron"]
+
+
+async def test_round_robin_between_chats_in_same_lane() -> None:
+    bus = MessageBus()
+    for i in range(3):
+        await bus.publish_inbound(_msg("telegram", "noisy", content=f"n{i}"))
+    await bus.publish_inbound(_msg("telegram", "quiet", content="q0"))
+
+    order = [(await bus.consume_inbound()).content for _ in range(4)]
+
+    assert order == ["n0", "q0", "n1", "n2"]
+
+
+async def test_drop_oldest_evicts_lowest_priority_first() -> None:
+    queue: LaneQueue[str] = LaneQueue(maxsize=2, overflow="drop_oldest")
+    await queue.put("bg", lane="background")
+    await queue.put("a", lane="interactive")
+
+    dropped = await queue.put("b", lane="interactive")
+
+    assert dropped == "bg"
+    assert [await queue.get(), await queue.get()] == ["a", "b"]
+    assert queue.stats["background"].dropped == 1
+
+
+async def test_reject_policy_sends_notice_to_channel() -> None:
+    bus = MessageBus(BusConfig(inbound_maxsize=1, overflow_policy="reject", reject_notice="busy"))
+    await bus.publish_inbound(_msg("telegram", "1"))
+    await bus.publish_inbound(_msg("telegram", "2"))
+
+    assert bus.inbound_size == 1
+    notice = await bus.consume_outbound()
+    assert (notice.chat_id, notice.content) == ("2", "busy")
+    assert bus.metrics()["inbound"]["lanes"]["interactive"]["rejected"] == 1
+
+    queue: LaneQueue[str] = LaneQueue(maxsize=1, overflow="reject")
+    await queue.put("x")
+    with pytest.raises(QueueFullError):
+        await queue.put("y")
+
+
+async def test_block_policy_waits_for_space() -> None:
+    queue: LaneQueue[str] = LaneQueue(maxsize=1, overflow="block")
+    await queue.put("first")
+
+    pending = asyncio.create_task(queue.put("second"))
+    await asyncio.sleep(0.01)
+    assert not pending.done()
+
+    assert await queue.get() == "first"
+    await asyncio.wait_for(pending, timeout=1.0)
+    assert await queue.get() == "second"
+
+
+async def test_close_drains_pending_items_then_raises() -> None:
+    queue: LaneQueue[str] = LaneQueue()
+    await queue.put("a")
+    queue.close()
+
+    assert await queue.get() == "a"
+    with pytest.raises(QueueClosedError):
+        await queue.get()
+    with pytest.raises(QueueClosedError):
+        await queue.put("b")
+
+
+async def test_close_wakes_idle_consumer() -> None:
+    queue: LaneQueue[str] = LaneQueue()
+    waiter = asyncio.create_task(queue.get())
+    await asyncio.sleep(0)
+
+    queue.close()
+
+    with pytest.raises(QueueClosedError):
+        await asyncio.wait_for(waiter, timeout=1.0)
+
+
+async def test_dispatch_outbound_flushes_before_stopping() -> None:
+    bus = MessageBus()
+    delivered: list[str] = []
+
+    async def _deliver(msg: OutboundMessage) -> None:
+        delivered.append(msg.content)
+
+    bus.subscribe_outbound("telegram", _deliver)
+    dispatcher = asyncio.create_task(bus.dispatch_outbound())
+    for i in range(3):
+        await bus.publish_outbound(OutboundMessage(channel="telegram", chat_id="1", content=str(i)))
+    bus.stop()
+
+    await asyncio.wait_for(dispatcher, timeout=1.0)
+    assert delivered == ["0", "1", "2"]
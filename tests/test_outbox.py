@@ -0,0 +1,138 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from chasingclaw.bus.events import OutboundMessage
+from chasingclaw.bus.outbox import Outbox
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.channels.base import BaseChannel
+from chasingclaw.channels.delivery import DeliveryDispatcher
+from chasingclaw.channels.telegram import TelegramChannel
+from chasingclaw.config.schema import BusConfig, DeliveryConfig, RetryPolicyConfig, TelegramConfig
+
+
+def _out(content: str) -> OutboundMessage:
+    return OutboundMessage(channel="telegram", chat_id="1", content=content, metadata={"k": "v"})
+
+
+def test_unacked_messages_are_replayed_after_restart(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path)
+    first, second = _out("first"), _out("second")
+    outbox.record(first)
+    outbox.record(second)
+    outbox.ack(first.idempotency_key)
+
+    replayed = Outbox(tmp_path).replay()
+
+    assert [m.content for m in replayed] == ["second"]
+    assert replayed[0].idempotency_key == second.idempotency_key
+    assert replayed[0].metadata == {"k": "v"}
+
+
+def test_record_is_idempotent_and_replays_are_capped(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path, max_replays=2)
+    msg = _out("hello")
+    outbox.record(msg)
+    outbox.record(msg)
+
+    assert len(Outbox(tmp_path, max_replays=2).replay()) == 1
+    assert len(Outbox(tmp_path, max_replays=2).replay()) == 1
+    assert Outbox(tmp_path, max_replays=2).replay() == []
+    assert Outbox(tmp_path).pending_count == 0
+
+
+def test_compaction_keeps_only_pending(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path)
+    messages = [_out(str(i)) for i in range(5)]
+    for msg in messages:
+        outbox.record(msg)
+    for msg in messages[:4]:
+        outbox.ack(msg.idempotency_key)
+
+    assert outbox.compact() == 8
+    assert len(outbox.path.read_text(encoding="utf-8").splitlines()) == 1
+    assert [m.content for m in Outbox(tmp_path).replay()] == ["4"]
+
+
+async def test_bus_acks_after_delivery(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path)
+    bus = MessageBus(outbox=outbox)
+    delivered: list[str] = []
+
+    async def _deliver(msg: OutboundMessage) -> None:
+        delivered.append(msg.content)
+
+    bus.subscribe_outbound("telegram", _deliver)
+    await bus.publish_outbound(_out("hi"))
+    assert outbox.pending_count == 1
+
+    bus.stop()
+    await bus.dispatch_outbound()
+
+    assert delivered == ["hi"]
+    assert outbox.pending_count == 0
+
+
+async def test_failed_or_rejected_sends_stay_in_the_outbox(tmp_path: Path) -> None:
+    class _DownChannel(BaseChannel):
+        name = "telegram"
+
+        async def start(self) -> None:
+            pass
+
+        async def stop(self) -> None:
+            pass
+
+        async def send(self, msg: OutboundMessage) -> None:
+            raise ConnectionError("network unreachable")
+
+    outbox = Outbox(tmp_path)
+    channel = _DownChannel(config=None, bus=MessageBus())
+    channel._running = True
+    config = DeliveryConfig(channel_retry={"telegram": RetryPolicyConfig(max_attempts=2, base_delay_s=0.001)})
+    dispatcher = DeliveryDispatcher({"telegram": channel}, config, outbox=outbox)
+    msg = _out("lost?")
+    outbox.record(msg)
+    await dispatcher.submit(msg)
+    await dispatcher.close(timeout=1.0)
+    assert dispatcher.metrics()["telegram"]["failed"] == 1
+
+    bus = MessageBus(BusConfig(outbound_maxsize=1, overflow_policy="reject"), outbox=outbox)
+    await bus.publish_outbound(_out("queued"))
+    await bus.publish_outbound(_out("rejected"))
+
+    assert sorted(m.content for m in Outbox(tmp_path).replay()) == ["lost?", "queued", "rejected"]
+
+
+async def test_messages_for_unknown_channels_are_acked(tmp_path: Path) -> None:
+    outbox = Outbox(tmp_path)
+    dispatcher = DeliveryDispatcher({}, outbox=outbox)
+    msg = _out("nowhere")
+    outbox.record(msg)
+
+    assert await dispatcher.submit(msg) is False
+    assert Outbox(tmp_path).replay() == []
+
+
+async def test_permanent_send_errors_are_not_retried(tmp_path: Path) -> None:
+    sent: list[int] = []
+
+    async def send_message(chat_id, **kwargs) -> None:
+        sent.append(chat_id)
+
+    outbox = Outbox(tmp_path)
+    channel = TelegramChannel(TelegramConfig(), MessageBus())
+    channel._running = True
+    channel._app = SimpleNamespace(bot=SimpleNamespace(send_message=send_message))
+    config = DeliveryConfig(channel_retry={"telegram": RetryPolicyConfig(max_attempts=3, base_delay_s=0.001)})
+    dispatcher = DeliveryDispatcher({"telegram": channel}, config, outbox=outbox)
+    bad = OutboundMessage(channel="telegram", chat_id="@not-a-number", content="hello")
+    outbox.record(bad)
+
+    await dispatcher.submit(bad)
+    await dispatcher.submit(_out("hi"))
+    await dispatcher.close(timeout=1.0)
+
+    assert sent == [1]
+    stats = dispatcher.metrics()["telegram"]
+    assert (stats["sent"], stats["retries"], stats["failed"]) == (1, 0, 1)
+    assert Outbox(tmp_path).replay() == []
@@ -0,0 +1,127 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+
+from chasingclaw.providers.http_provider import OpenAICompatProvider
+from chasingclaw.providers.litellm_provider import LiteLLMProvider
+from chasingclaw.providers.ratelimit import RateLimiter, parse_duration, retry_after_seconds
+
+OK_BODY = {"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}]}
+
+
+def test_parse_rate_limit_headers() -> None:
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("1.5") == 1.5
+    assert retry_after_seconds({"Retry-After": "2"}) == 2.0
+    assert retry_after_seconds({"retry-after-ms": "150"}) == 0.15
+    assert retry_after_seconds({"llm_provider-retry-after": "3"}) == 3.0
+
+
+async def test_remaining_zero_header_delays_next_request() -> None:
+    limiter = RateLimiter()
+    limiter.observe_headers("m", {
+        "x-ratelimit-limit-requests": "600",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "100ms",
+    })
+
+    async with limiter.acquire("m") as ticket:
+        pass
+
+    assert ticket.wait_s >= 0.09
+
+
+async def test_concurrency_cap_serializes_calls() -> None:
+    limiter = RateLimiter(max_concurrency=1)
+    active = 0
+    peak = 0
+
+    async def _call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    await asyncio.gather(*(
+        limiter.execute("m", 0, _call, status_of=lambda e: None, headers_of=lambda r: None)
+        for _ in range(3)
+    ))
+
+    assert peak == 1
+
+
+async def test_http_provider_retries_429_honoring_retry_after() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "50"}, json={"error": "slow down"})
+        return httpx.Response(200, json=OK_BODY)
+
+    provider = OpenAICompatProvider(
+        api_key="k",
+        api_base="http://llm.internal/v1",
+        transport=httpx.MockTransport(handler),
+        rate_limiter=RateLimiter(),
+    )
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+
+    assert response.content == "ok"
+    assert calls == 2
+    assert response.queue_wait_s >= 0.05
+
+
+async def test_exhausted_retries_return_friendly_message() -> None:
+    provider = OpenAICompatProvider(
+        api_key="k",
+        api_base="http://llm.internal/v1",
+        transport=httpx.MockTransport(lambda r: httpx.Response(429, headers={"retry-after": "0"})),
+        rate_limiter=RateLimiter(max_retries=1),
+    )
+    response = await provider.chat([{"role": "user", "content": "hi"}])
+
+    assert response.finish_reason == "error"
+    assert "rate limiting" in response.content
+    assert "Error calling LLM" not in response.content
+
+
+async def test_streams_settle_the_token_estimate_with_actual_usage() -> None:
+    usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    chunks = [{"choices": [{"delta": {"content": "ok"}, "finish_reason": "stop"}]}, {"choices": [], "usage": usage}]
+    sse = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+    limiter = RateLimiter(tokens_per_minute=100_000)
+    provider = OpenAICompatProvider(
+        api_key="k",
+        api_base="http://llm.internal/v1",
+        default_model="m",
+        transport=httpx.MockTransport(lambda r: httpx.Response(200, text=sse)),
+        rate_limiter=limiter,
+    )
+    items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+    assert items[-1].usage["total_tokens"] == 15
+    # Only the 15 tokens used are charged, not the max_tokens-based estimate
+    assert limiter._tokens("m").tokens > 100_000 - 100
+
+    async def _stream():
+        yield SimpleNamespace(usage=None, choices=[
+            SimpleNamespace(finish_reason="stop", delta=SimpleNamespace(content="ok", tool_calls=None))
+        ])
+        yield SimpleNamespace(usage=usage, choices=[])
+
+    async def _acompletion(**kwargs):
+        return _stream()
+
+    limiter = RateLimiter(tokens_per_minute=100_000)
+    provider = LiteLLMProvider(api_key="k", default_model="gpt-4o", rate_limiter=limiter)
+    provider._acompletion = _acompletion
+    items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+    assert items[-1].content == "ok"
+    (bucket,) = limiter._token_buckets.values()
+    assert bucket.tokens > 100_000 - 100
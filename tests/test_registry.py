@@ -0,0 +1,68 @@
+import os
+import types
+
+from chasingclaw.providers import litellm_provider
+from chasingclaw.providers.litellm_provider import LiteLLMProvider
+from chasingclaw.providers.registry import (
+    OPENAI_COMPAT_PREFIXES,
+    PROVIDERS,
+    find_by_model,
+    find_by_name,
+    find_model_overrides,
+)
+
+
+def test_lookup_tables_match_registry_order() -> None:
+    for spec in PROVIDERS:
+        assert find_by_name(spec.name) is spec
+        if spec.is_gateway or spec.is_local:
+            continue
+        for kw in spec.keywords:
+            match = find_by_model(f"some-{kw}-model".upper())
+            # The first spec (in registry order) owning a matching keyword wins.
+            first = next(
+                s for s in PROVIDERS
+                if not (s.is_gateway or s.is_local) and any(k in f"some-{kw}-model" for k in s.keywords)
+            )
+            assert match is first
+    assert find_by_model("unknown-local-model") is None
+    assert {"hosted_vllm", "zhipu", "openai"} <= OPENAI_COMPAT_PREFIXES
+
+
+def test_model_overrides_are_memoized_and_read_only() -> None:
+    model = "moonshot/kimi-k2.5"
+    expected = dict(find_by_name("moonshot").model_overrides)["kimi-k2.5"]
+
+    result = find_model_overrides(model)
+
+    assert dict(result) == expected
+    assert find_model_overrides(model) is result
+    assert dict(find_model_overrides("unknown-local-model")) == {}
+
+
+def test_resolved_model_is_memoized_per_provider() -> None:
+    provider = LiteLLMProvider(api_base="http://llm.internal/v1", provider_name="openai")
+
+    assert provider._resolve_model("deepseek/deepseek-chat") == "openai/deepseek-chat"
+    assert provider._resolved_models == {"deepseek/deepseek-chat": "openai/deepseek-chat"}
+
+
+async def test_api_base_stays_per_provider(monkeypatch) -> None:
+    calls = []
+
+    async def acompletion(**kwargs):
+        calls.append(kwargs)
+        raise RuntimeError("offline")
+
+    fake = types.SimpleNamespace(acompletion=acompletion)
+    monkeypatch.setattr(litellm_provider, "_litellm", fake)
+    monkeypatch.setattr(os, "environ", os.environ.copy())  # keys set up by the providers
+    primary = LiteLLMProvider(api_key="k", api_base="http://llm.internal/v1", provider_name="openai")
+    fallback = LiteLLMProvider(api_key="k", default_model="deepseek/deepseek-chat")
+
+    await primary.chat([{"role": "user", "content": "hi"}])
+    await fallback.chat([{"role": "user", "content": "hi"}])
+
+    assert calls[0]["api_base"] == "http://llm.internal/v1"
+    assert "api_base" not in calls[1]
+    assert not hasattr(fake, "api_base")
@@ -0,0 +1,121 @@
+from chasingclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from chasingclaw.providers.cache import CachingProvider, ResponseCache, cache_key, response_cache
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self, tool_call: bool = False):
+        super().__init__(None, None)
+        self.calls = 0
+        self.tool_call = tool_call
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.calls += 1
+        if self.tool_call:
+            return LLMResponse(
+                content=None,
+                tool_calls=[ToolCallRequest(id="t1", name="exec", arguments={"command": "ls"})],
+                finish_reason="tool_calls",
+            )
+        return LLMResponse(content=f"reply {self.calls}", usage={"prompt_tokens": 10, "completion_tokens": 2})
+
+    async def chat_stream(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        response = await self.chat(messages, tools, model, max_tokens, temperature)
+        yield response.content or ""
+        yield response
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _messages(clock: str = "2026-10-19 09:00 (Monday)") -> list[dict]:
+    return [
+        {"role": "system", "content": f"## Current Time\n{clock}"},
+        {"role": "user", "content": "daily summary"},
+    ]
+
+
+async def test_cache_only_used_when_opted_in() -> None:
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache())
+
+    await provider.chat(_messages())
+    await provider.chat(_messages())
+    assert inner.calls == 2
+
+    with response_cache():
+        first = await provider.chat(_messages())
+        second = await provider.chat(_messages("2026-10-19 09:30 (Monday)"))
+    assert inner.calls == 3
+    assert second.content == first.content
+    assert second.usage == {}
+    assert provider.cache.hits == 1
+
+
+async def test_tool_turns_are_never_cached() -> None:
+    inner = CountingProvider(tool_call=True)
+    provider = CachingProvider(inner, ResponseCache())
+    with response_cache():
+        await provider.chat(_messages())
+        await provider.chat(_messages())
+    assert inner.calls == 2
+    assert len(provider.cache) == 0
+
+    # Follow-up calls carrying tool results are not even looked up.
+    inner.tool_call = False
+    messages = _messages() + [
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "t1"}]},
+        {"role": "tool", "tool_call_id": "t1", "content": "ok"},
+    ]
+    with response_cache():
+        await provider.chat(messages)
+        await provider.chat(messages)
+    assert inner.calls == 4
+
+
+async def test_stream_hit_replays_content() -> None:
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache())
+    with response_cache():
+        [item async for item in provider.chat_stream(_messages())]
+        items = [item async for item in provider.chat_stream(_messages())]
+    assert inner.calls == 1
+    assert items[0] == "reply 1"
+    assert isinstance(items[-1], LLMResponse) and items[-1].content == "reply 1"
+
+
+async def test_repeated_cron_run_hits_despite_growing_history(tmp_path, monkeypatch) -> None:
+    from chasingclaw.agent.loop import AgentLoop
+    from chasingclaw.bus.queue import MessageBus
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    inner = CountingProvider()
+    provider = CachingProvider(inner, ResponseCache())
+    loop = AgentLoop(MessageBus(), provider, tmp_path)
+
+    with response_cache():
+        first = await loop.process_direct("daily summary", session_key="cron:job1")
+        second = await loop.process_direct("daily summary", session_key="cron:job1")
+
+    assert inner.calls == 1
+    assert second == first
+    assert (provider.cache.hits, provider.cache.misses) == (1, 1)
+
+
+def test_cache_evicts_and_expires() -> None:
+    cache = ResponseCache(max_entries=2, ttl_s=60)
+    for key in ("a", "b", "c"):
+        cache.put(key, LLMResponse(content=key))
+    assert cache.get("a") is None
+    assert cache.get("c").content == "c"
+
+    expired = ResponseCache(ttl_s=-1)
+    expired.put("a", LLMResponse(content="a"))
+    assert expired.get("a") is None
+
+
+def test_key_depends_on_model_and_tools() -> None:
+    base = cache_key("m", _messages(), None, 100, 0.7)
+    assert base == cache_key("m", _messages("2026-10-19 23:59 (Monday)"), None, 100, 0.7)
+    assert base != cache_key("m", _messages("2026-10-20 09:00 (Tuesday)"), None, 100, 0.7)
+    assert base != cache_key("other", _messages(), None, 100, 0.7)
+    assert base != cache_key("m", _messages(), [{"type": "function", "function": {"name": "x"}}], 100, 0.7)
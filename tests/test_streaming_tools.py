@@ -0,0 +1,144 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from chasingclaw.agent.loop import AgentLoop
+from chasingclaw.agent.tools.base import Tool
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.providers.base import (
+    LLMProvider,
+    LLMResponse,
+    ToolCallAccumulator,
+    ToolCallRequest,
+)
+from chasingclaw.providers.http_provider import OpenAICompatProvider
+
+
+def test_accumulator_emits_call_when_next_index_starts() -> None:
+    acc = ToolCallAccumulator()
+    assert acc.add(0, "c1", "read_file", '{"path":') == []
+    assert acc.add(0, None, None, ' "a"}') == []
+
+    completed = acc.add(1, "c2", "list_dir", "{}")
+
+    assert completed == [ToolCallRequest(id="c1", name="read_file", arguments={"path": "a"})]
+    assert [c.id for c in acc.finish()] == ["c1", "c2"]
+
+
+async def test_http_stream_yields_completed_tool_calls_early() -> None:
+    chunks = [
+        {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "c1", "function": {"name": "a", "arguments": "{}"}}]}}]},
+        {"choices": [{"delta": {"tool_calls": [{"index": 1, "id": "c2", "function": {"name": "b", "arguments": "{}"}}]}}]},
+        {"choices": [{"delta": {}, "finish_reason": "tool_calls"}]},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    provider = OpenAICompatProvider(api_base="http://llm.internal/v1", transport=httpx.MockTransport(handler))
+    items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+
+    assert items[0] == ToolCallRequest(id="c1", name="a", arguments={})
+    assert [c.id for c in items[-1].tool_calls] == ["c1", "c2"]
+
+
+class LookupTool(Tool):
+    parallel_safe = True
+    name = "lookup"
+    description = "Look something up."
+    parameters = {"type": "object", "properties": {"key": {"type": "string"}}, "required": ["key"]}
+
+    def __init__(self, log: list[str]):
+        self.log = log
+
+    async def execute(self, key: str, **kwargs: Any) -> str:
+        self.log.append(f"start {key}")
+        return f"value of {key}"
+
+
+class StreamingProvider(LLMProvider):
+    def __init__(self, log: list[str]):
+        super().__init__(None, None)
+        self.log = log
+        self.rounds = 0
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        raise AssertionError("streaming path expected")
+
+    async def chat_stream(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+        self.rounds += 1
+        if self.rounds > 1:
+            yield LLMResponse(content="done")
+            return
+        calls = [
+            ToolCallRequest(id="c1", name="lookup", arguments={"key": "x"}),
+            ToolCallRequest(id="c2", name="lookup", arguments={"key": "y"}),
+        ]
+        yield calls[0]
+        await asyncio.sleep(0.05)  # Model still generating the second call
+        self.log.append("stream end")
+        yield LLMResponse(content=None, tool_calls=calls, finish_reason="tool_calls")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+async def test_parallel_safe_tool_starts_before_stream_ends(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))  # Sessions and traces live under ~/.chasingclaw
+    log: list[str] = []
+    agent = AgentLoop(bus=MessageBus(), provider=StreamingProvider(log), workspace=tmp_path)
+    agent.tools.register(LookupTool(log))
+
+    events = [event async for event in agent.process_direct_streaming("hi", session_key="webui:t")]
+
+    assert log == ["start x", "stream end", "start y"]
+    results = [e["result"] for e in events if e["type"] == "tool_result"]
+    assert results == ["value of x", "value of y"]
+    assert events[-1]["reply"] == "done"
+
+
+class WriteTool(Tool):
+    name = "write"
+    description = "Write something."
+    parameters = {"type": "object", "properties": {"key": {"type": "string"}}, "required": ["key"]}
+
+    def __init__(self, log: list[str]):
+        self.log = log
+
+    async def execute(self, key: str, **kwargs: Any) -> str:
+        self.log.append(f"write {key}")
+        return "written"
+
+
+async def test_calls_after_an_unsafe_call_do_not_start_early(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    log: list[str] = []
+
+    class WriteThenReadProvider(StreamingProvider):
+        async def chat_stream(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+            self.rounds += 1
+            if self.rounds > 1:
+                yield LLMResponse(content="done")
+                return
+            calls = [
+                ToolCallRequest(id="c1", name="write", arguments={"key": "x"}),
+                ToolCallRequest(id="c2", name="lookup", arguments={"key": "x"}),
+            ]
+            for call in calls:
+                yield call
+            await asyncio.sleep(0.05)
+            self.log.append("stream end")
+            yield LLMResponse(content=None, tool_calls=calls, finish_reason="tool_calls")
+
+    agent = AgentLoop(bus=MessageBus(), provider=WriteThenReadProvider(log), workspace=tmp_path)
+    agent.tools.register(LookupTool(log))
+    agent.tools.register(WriteTool(log))
+
+    [event async for event in agent.process_direct_streaming("hi", session_key="webui:t")]
+
+    # The lookup reads what the write produced, so it must not run first.
+    assert log == ["stream end", "write x", "start x"]
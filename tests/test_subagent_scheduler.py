@@ -0,0 +1,167 @@
+import asyncio
+from pathlib import Path
+
+from chasingclaw.agent.subagent import SubagentManager
+from chasingclaw.agent.tools.spawn import SpawnTool
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.config.schema import SubagentsConfig
+from chasingclaw.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+class GatedProvider(LLMProvider):
+    """Replies once the gate opens; optionally keeps asking for a tool call."""
+
+    def __init__(self, tool_calls: bool = False):
+        super().__init__(None, None)
+        self.gate = asyncio.Event()
+        self.tool_calls = tool_calls
+        self.prompts: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        self.prompts.append(messages[1]["content"])
+        await self.gate.wait()
+        usage = {"prompt_tokens": 100, "completion_tokens": 10}
+        if self.tool_calls:
+            call = ToolCallRequest(id="c1", name="list_dir", arguments={"path": "."})
+            return LLMResponse(content="looking", tool_calls=[call], finish_reason="tool_calls", usage=usage)
+        return LLMResponse(content="all done", usage=usage)
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def _manager(tmp_path: Path, provider: LLMProvider, **limits) -> SubagentManager:
+    return SubagentManager(provider, tmp_path, MessageBus(), config=SubagentsConfig(**limits))
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_caps_and_priority_order(tmp_path: Path) -> None:
+    provider = GatedProvider()
+    manager = _manager(tmp_path, provider, max_concurrent=2, max_per_origin=1, announce_window_s=0)
+
+    await manager.spawn("a1", origin_chat_id="a")
+    await manager.spawn("a2", origin_chat_id="a")
+    await manager.spawn("b1", origin_chat_id="b")
+    result = await manager.spawn("c-urgent", origin_chat_id="c", priority=5)
+    await _settle()
+
+    assert "queued" in result
+    assert manager.get_running_count() == 2
+    assert sorted(provider.prompts) == ["a1", "b1"]
+
+    provider.gate.set()
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+        if all(t.finished for t in manager.list_tasks()):
+            break
+    # The high-priority task takes the first free slot, ahead of a2.
+    assert provider.prompts[2] == "c-urgent"
+    assert [t.status for t in manager.list_tasks()] == ["ok"] * 4
+    assert manager.bus.inbound_size == 4
+
+
+async def test_cancel_queued_and_running(tmp_path: Path) -> None:
+    provider = GatedProvider()
+    manager = _manager(tmp_path, provider, max_concurrent=1)
+    await manager.spawn("first")
+    await manager.spawn("second")
+    await _settle()
+    running, queued = manager.list_tasks()
+
+    assert "Cancelled" in manager.cancel(queued.id)
+    assert queued.status == "cancelled"
+    manager.cancel(running.id)
+    await _settle()
+
+    assert running.status == "cancelled"
+    assert manager.get_running_count() == 0
+    assert provider.prompts == ["first"]
+    assert manager.bus.inbound_size == 0
+
+
+async def test_token_budget_stops_the_loop(tmp_path: Path) -> None:
+    provider = GatedProvider(tool_calls=True)
+    provider.gate.set()
+    manager = _manager(tmp_path, provider)
+    await manager.spawn("explore", token_budget=250)
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+        if manager.get_running_count() == 0:
+            break
+
+    task = manager.list_tasks()[0]
+    assert task.status == "budget"
+    assert task.iteration == 3
+    assert [e["type"] for e in manager.status(task.id, since=1)[0]["events"]][:3] == ["status", "iteration", "tool"]
+
+
+async def test_spawn_tool_status_is_scoped_to_origin(tmp_path: Path) -> None:
+    provider = GatedProvider()
+    manager = _manager(tmp_path, provider)
+    other = await manager.spawn("other chat", origin_chat_id="x")
+    tool = SpawnTool(manager)
+    tool.set_context("telegram", "42")
+
+    assert "started" in await tool.execute(task="mine", label="mine")
+    status = await tool.execute(action="status")
+    assert "mine" in status and "other chat" not in status
+
+    other_id = other.split("id: ")[1][:8]
+    assert "not found" in await tool.execute(action="cancel", task_id=other_id)
+    assert await tool.execute() == "Error: task is required for spawn"
+    for task in manager.list_tasks():
+        manager.cancel(task.id)
+    await _settle()
+
+
+async def test_results_of_one_chat_are_announced_together(tmp_path: Path) -> None:
+    provider = GatedProvider()
+    manager = _manager(tmp_path, provider, announce_window_s=5)
+    await manager.spawn("first", label="first")
+    await manager.spawn("second", label="second")
+    await manager.spawn("elsewhere", origin_chat_id="other")
+    await _settle()
+    provider.gate.set()
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+        if manager.get_running_count() == 0:
+            break
+
+    # Both results of cli:direct arrive in one message, sent as soon as the last one finished.
+    assert manager.bus.inbound_size == 2
+    messages = [await manager.bus.consume_inbound() for _ in range(2)]
+    batch = next(m for m in messages if m.chat_id == "cli:direct")
+    assert batch.content.startswith("[2 subagents finished]")
+    assert "'first'" in batch.content and "'second'" in batch.content
+    assert len(batch.metadata["subagent_ids"]) == 2
+
+
+async def test_announce_model_summarizes_without_tools(tmp_path: Path, monkeypatch) -> None:
+    from chasingclaw.agent.loop import AgentLoop
+    from chasingclaw.bus.events import InboundMessage
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    calls: list[dict] = []
+
+    class RecordingProvider(GatedProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7):
+            calls.append({"model": model, "tools": tools})
+            return LLMResponse(content="Both tasks are done.")
+
+    loop = AgentLoop(
+        MessageBus(),
+        RecordingProvider(),
+        tmp_path,
+        subagent_config=SubagentsConfig(announce_model="small-model"),
+    )
+    reply = await loop._process_message(
+        InboundMessage(channel="system", sender_id="subagent", chat_id="telegram:42", content="[2 subagents finished]")
+    )
+
+    assert reply.content == "Both tasks are done."
+    assert (reply.channel, reply.chat_id) == ("telegram", "42")
+    assert calls == [{"model": "small-model", "tools": None}]
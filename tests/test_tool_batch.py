@@ -0,0 +1,94 @@
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from chasingclaw.agent.loop import AgentLoop
+from chasingclaw.agent.subagent import SubagentManager
+from chasingclaw.agent.tools.base import Tool
+from chasingclaw.agent.tools.registry import ToolRegistry
+from chasingclaw.agent.tools.web import get_http_client
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+
+
+class SlowTool(Tool):
+    def __init__(self, name: str, parallel_safe: bool, log: list[str]):
+        self._name = name
+        self.parallel_safe = parallel_safe
+        self.log = log
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._name
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"n": {"type": "integer"}}}
+
+    async def execute(self, n: int = 0, **kwargs: Any) -> str:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.log.append(f"start {self._name}{n}")
+        await asyncio.sleep(0.01)
+        self.log.append(f"end {self._name}{n}")
+        self.active -= 1
+        return f"{self._name}{n}"
+
+
+async def test_execute_many_runs_safe_calls_concurrently_in_order() -> None:
+    log: list[str] = []
+    registry = ToolRegistry()
+    fetch = SlowTool("fetch", True, log)
+    write = SlowTool("write", False, log)
+    registry.register(fetch)
+    registry.register(write)
+
+    calls = [("fetch", {"n": 1}), ("fetch", {"n": 2}), ("fetch", {"n": 3}), ("write", {"n": 4}), ("fetch", {"n": 5})]
+    results = await registry.execute_many(calls, max_parallel=2)
+
+    assert results == ["fetch1", "fetch2", "fetch3", "write4", "fetch5"]
+    assert fetch.max_active == 2
+    # The unsafe call is a barrier: it starts after the batch ends and finishes before fetch5.
+    assert log.index("start write4") > log.index("end fetch3")
+    assert log.index("start fetch5") > log.index("end write4")
+
+
+class _Provider(LLMProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        return LLMResponse(content="ok")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def test_subagents_share_tool_registry(tmp_path: Path) -> None:
+    first = SubagentManager(_Provider(None, None), tmp_path, MessageBus())
+    second = SubagentManager(_Provider(None, None), tmp_path, MessageBus())
+    assert first._get_tools() is second._get_tools()
+    assert "exec" in first._get_tools()
+
+
+async def test_http_client_is_shared_per_loop() -> None:
+    client = get_http_client()
+    assert get_http_client() is client
+    await client.aclose()
+    assert get_http_client() is not client
+    await get_http_client().aclose()
+
+
+async def test_agent_close_releases_the_shared_http_client(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    agent = AgentLoop(bus=MessageBus(), provider=_Provider(None, None), workspace=tmp_path)
+    client = get_http_client()
+
+    await agent.close()
+
+    assert client.is_closed
+    assert get_http_client() is not client
+    await agent.close()
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from chasingclaw.config.schema import TracesConfig
+from chasingclaw.session.manager import SessionManager
+from chasingclaw.session.traces import TraceStore
+
+
+def _events(n: int = 2) -> list[dict]:
+    return [{"type": "tool_call", "tool": "exec", "arguments": "x" * 100} for _ in range(n)]
+
+
+def test_append_and_load_by_message_id(tmp_path: Path) -> None:
+    store = TraceStore(tmp_path)
+    store.append("webui:abc", "m1", _events(1))
+    store.append("webui:abc", "m2", _events(3))
+
+    traces = store.load("webui:abc")
+    assert set(traces) == {"m1", "m2"}
+    assert len(store.get("webui:abc", "m2")) == 3
+    assert store.get("webui:abc", "missing") == []
+
+
+def test_compaction_keeps_most_recent(tmp_path: Path) -> None:
+    store = TraceStore(tmp_path, max_per_session=3)
+    for i in range(7):
+        store.append("cli:x", f"m{i}", _events(1))
+
+    # Append compacts once the file holds more than twice the limit.
+    assert set(store.load("cli:x")) == {"m4", "m5", "m6"}
+    assert store.compact("cli:x") == 0
+
+
+def test_compaction_drops_expired(tmp_path: Path) -> None:
+    store = TraceStore(tmp_path, max_age_days=1, max_per_session=0)
+    path = tmp_path / "cli_x.jsonl"
+    path.write_text(
+        json.dumps({"id": "old", "timestamp": "2000-01-01T00:00:00", "events": []}) + "\n"
+    )
+    store.append("cli:x", "new", _events(1))
+
+    assert store.compact_all() == 1
+    assert set(store.load("cli:x")) == {"new"}
+
+
+def test_session_file_keeps_only_reference(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    manager = SessionManager(tmp_path / "workspace")
+    session = manager.get_or_create("webui:s1")
+    trace_ref = manager.save_trace(session.key, _events(2))
+    session.add_message("user", "hi")
+    session.add_message("assistant", "done", trace_ref=trace_ref)
+    # Legacy inline traces are moved out on save as well.
+    session.add_message("assistant", "legacy", trace=_events(1))
+    manager.save(session)
+
+    raw = manager._get_session_path("webui:s1").read_text()
+    assert '"trace"' not in raw
+    reloaded = SessionManager(tmp_path / "workspace")._load("webui:s1")
+    assert reloaded is not None
+    assert [len(manager.get_trace("webui:s1", m)) for m in reloaded.messages] == [0, 2, 1]
+
+    manager.delete("webui:s1")
+    assert manager.traces.load("webui:s1") == {}
+
+
+def test_disabled_traces_are_not_stored(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    manager = SessionManager(tmp_path / "workspace", trace_config=TracesConfig(enabled=False))
+    assert manager.save_trace("cli:x", _events(1)) is None
+
+    # Legacy inline traces stay in the history when they cannot be moved out.
+    session = manager.get_or_create("cli:x")
+    session.add_message("assistant", "legacy", trace=_events(1))
+    manager.save(session)
+    reloaded = SessionManager(tmp_path / "workspace", trace_config=TracesConfig(enabled=False))._load("cli:x")
+    assert manager.get_trace("cli:x", reloaded.messages[0]) == _events(1)
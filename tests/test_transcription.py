@@ -0,0 +1,68 @@
+import asyncio
+from pathlib import Path
+
+from chasingclaw.providers.transcription import TranscriptionError, TranscriptionService
+
+
+class FakeBackend:
+    wants_preprocessed = False
+
+    def __init__(self, name: str, fail: bool = False, delay: float = 0.0):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def transcribe_file(self, path: Path) -> str:
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.fail:
+            raise TranscriptionError(f"{self.name} down")
+        return f"{self.name}:{path.read_bytes().decode()}"
+
+
+def _audio(tmp_path: Path, name: str, data: str) -> Path:
+    path = tmp_path / name
+    path.write_text(data)
+    return path
+
+
+async def test_same_audio_is_transcribed_once(tmp_path: Path) -> None:
+    backend = FakeBackend("groq", delay=0.02)
+    service = TranscriptionService([backend], preprocess=False)
+    first = _audio(tmp_path, "a.ogg", "hello")
+    forwarded = _audio(tmp_path, "b.ogg", "hello")
+
+    results = await asyncio.gather(service.transcribe(first), service.transcribe(forwarded))
+    assert results == ["groq:hello", "groq:hello"]
+    assert await service.transcribe(first) == "groq:hello"
+    assert backend.calls == 1
+
+
+async def test_falls_back_to_next_backend(tmp_path: Path) -> None:
+    remote = FakeBackend("groq", fail=True)
+    local = FakeBackend("local")
+    service = TranscriptionService([remote, local], preprocess=False)
+
+    assert await service.transcribe(_audio(tmp_path, "a.ogg", "hi")) == "local:hi"
+
+    local.fail = True
+    assert await service.transcribe(_audio(tmp_path, "b.ogg", "again")) == ""
+    assert await service.transcribe(tmp_path / "missing.ogg") == ""
+
+
+async def test_worker_pool_is_bounded(tmp_path: Path) -> None:
+    backend = FakeBackend("groq", delay=0.02)
+    service = TranscriptionService([backend], max_concurrency=2, preprocess=False)
+    files = [_audio(tmp_path, f"{i}.ogg", str(i)) for i in range(6)]
+
+    await asyncio.gather(*(service.transcribe(f) for f in files))
+    assert backend.calls == 6
+    assert backend.max_active == 2
@@ -0,0 +1,160 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+
+from chasingclaw.agent.loop import AgentLoop
+from chasingclaw.bus.queue import MessageBus
+from chasingclaw.providers.base import LLMProvider, LLMResponse
+from chasingclaw.providers.fallback import FallbackProvider
+from chasingclaw.providers.http_provider import OpenAICompatProvider
+from chasingclaw.providers.litellm_provider import LiteLLMProvider
+from chasingclaw.session.usage import UsageLedger, UsageTurn
+
+
+class UsageProvider(LLMProvider):
+    def __init__(self):
+        super().__init__(None, None)
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        return LLMResponse(content="ok", usage={"prompt_tokens": 100, "completion_tokens": 20, "cached_tokens": 60})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+def test_parse_usage_reads_cached_and_reasoning_tokens() -> None:
+    usage = LLMProvider._parse_usage({
+        "prompt_tokens": 50,
+        "completion_tokens": 30,
+        "total_tokens": 80,
+        "prompt_tokens_details": {"cached_tokens": 40},
+        "completion_tokens_details": {"reasoning_tokens": 12},
+    })
+    assert usage == {
+        "prompt_tokens": 50,
+        "completion_tokens": 30,
+        "total_tokens": 80,
+        "cached_tokens": 40,
+        "reasoning_tokens": 12,
+    }
+    assert LLMProvider._parse_usage({"prompt_tokens": 5, "cache_read_input_tokens": 3})["cached_tokens"] == 3
+
+
+async def test_stream_requests_and_reports_usage() -> None:
+    seen: dict = {}
+    chunks = [
+        {"choices": [{"delta": {"content": "hi"}, "finish_reason": "stop"}]},
+        {"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 1, "total_tokens": 8}},
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["body"] = json.loads(request.content)
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    provider = OpenAICompatProvider(api_base="http://llm.internal/v1", transport=httpx.MockTransport(handler))
+    items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+
+    assert seen["body"]["stream_options"] == {"include_usage": True}
+    assert items[-1].usage["total_tokens"] == 8
+
+
+async def test_stream_drops_rejected_stream_options_and_remembers() -> None:
+    bodies: list[dict] = []
+    sse = f"data: {json.dumps({'choices': [{'delta': {'content': 'ok'}}]})}\n\ndata: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if "stream_options" in body:
+            return httpx.Response(400, json={"error": "unknown field stream_options"})
+        return httpx.Response(200, text=sse, headers={"content-type": "text/event-stream"})
+
+    provider = OpenAICompatProvider(api_base="http://llm.internal/v1", transport=httpx.MockTransport(handler))
+    for _ in range(2):
+        items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+        assert items[-1].content == "ok"
+    assert ["stream_options" in body for body in bodies] == [True, False, False]
+
+    calls: list[dict] = []
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    async def _stream():
+        yield SimpleNamespace(usage=None, model="gpt-4o", choices=[
+            SimpleNamespace(finish_reason="stop", delta=SimpleNamespace(content="ok", tool_calls=None))
+        ])
+
+    async def _acompletion(**kwargs):
+        calls.append(kwargs)
+        if "stream_options" in kwargs:
+            raise BadRequestError("unknown field stream_options")
+        return _stream()
+
+    provider = LiteLLMProvider(api_key="k", default_model="gpt-4o")
+    provider._acompletion = _acompletion
+    for _ in range(2):
+        items = [item async for item in provider.chat_stream([{"role": "user", "content": "hi"}])]
+        assert items[-1].content == "ok"
+    assert ["stream_options" in kwargs for kwargs in calls] == [True, False, False]
+
+
+def test_ledger_summarizes_by_group(tmp_path: Path) -> None:
+    ledger = UsageLedger(tmp_path)
+    turn = UsageTurn(ledger, "telegram:1", "telegram", "m1")
+    turn.add(1, {"prompt_tokens": 100, "completion_tokens": 10}, 0.5)
+    turn.add(2, {"prompt_tokens": 200, "completion_tokens": 20, "cached_tokens": 150}, 1.5)
+    UsageTurn(ledger, "cli:direct", "cli", "m2").add(1, {"prompt_tokens": 5, "completion_tokens": 5}, 0.1)
+
+    by_session = ledger.summarize(group_by="session")
+    assert by_session[0] == {
+        "session": "telegram:1",
+        "calls": 2,
+        "turns": 1,
+        "prompt": 300,
+        "completion": 30,
+        "cached": 150,
+        "reasoning": 0,
+        "total": 330,
+        "avg_latency_ms": 1000,
+    }
+    assert [row["model"] for row in ledger.summarize(group_by="model")] == ["m1", "m2"]
+    assert turn.summary()["total"] == 330
+
+
+async def test_agent_loop_writes_usage_per_iteration(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))  # Sessions and traces live under ~/.chasingclaw
+    ledger = UsageLedger(tmp_path / "usage")
+    agent = AgentLoop(bus=MessageBus(), provider=UsageProvider(), workspace=tmp_path, usage_ledger=ledger)
+
+    outbound = await agent.process_direct_with_result("hi", session_key="cli:usage")
+
+    records = list(ledger.iter_records())
+    assert len(records) == 1
+    assert records[0]["session"] == "cli:usage"
+    assert records[0]["prompt"] == 100 and records[0]["cached"] == 60
+    assert outbound.metadata["usage"]["total"] == 120
+
+
+async def test_usage_records_the_model_that_served_each_call(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    served = {"choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}], "model": "qwen-72b-0601"}
+    http = OpenAICompatProvider(
+        api_base="http://llm.internal/v1", transport=httpx.MockTransport(lambda r: httpx.Response(200, json=served))
+    )
+    assert (await http.chat([{"role": "user", "content": "hi"}])).model == "qwen-72b-0601"
+
+    class DownProvider(UsageProvider):
+        async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+            return LLMResponse(content="Error calling LLM", finish_reason="error", error_kind="rate_limit")
+
+    ledger = UsageLedger(tmp_path / "usage")
+    provider = FallbackProvider(DownProvider(), [(UsageProvider(), "backup-model")])
+    agent = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path, model="test-model", usage_ledger=ledger)
+
+    await agent.process_direct("hi", session_key="cli:usage")
+
+    assert [r["model"] for r in ledger.iter_records()] == ["backup-model"]